@@ -3,6 +3,7 @@ from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from app.core.config import get_settings
 from backend.app.models.user_model import User
+from app.services.principal_cache import principal_cache
 from datetime import datetime
 
 settings = get_settings()
@@ -27,7 +28,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     except JWTError:
         raise credentials_exception
         
-    user = await User.get(user_id)
+    user = await principal_cache.get(user_id, User.get)
     if user is None:
         raise credentials_exception
         
@@ -1,73 +1,44 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
-from datetime import datetime
+from fastapi import APIRouter, HTTPException, status
 
-from app.models.analysis_model import (
-    ClinicalAnalysis, DiagnosisAnalysis, KeyFinding,
-    SafetyCheck, RiskFactor, RecommendedAction,
-    DifferentialDiagnosis, VitalSign, Medication, LabResult
-)
-from app.schemas.analysis_schema import (
-    ClinicalAnalysisRequestSchema,
-    ClinicalAnalysisResponseSchema
-)
-from app.services.ml.gemini_services import GeminiService
+from app.schemas.analysis_schema import ClinicalAnalysisResponseSchema
+from app.services.db.analysis_service import AnalysisService
+from app.services.db.checkpoint_service import CheckpointService
+from app.services.analysis_queue import analysis_queue
 
+# Analyses live on their clinical case (see AnalysisService); these endpoints
+# read and manage those case fields, never a separate analysis document.
 router = APIRouter()
-gemini_service = GeminiService()
 
-@router.post("/{case_id}", response_model=ClinicalAnalysisResponseSchema)
+@router.post("/{case_id}", response_model=ClinicalAnalysisResponseSchema, status_code=status.HTTP_202_ACCEPTED)
 async def create_analysis(case_id: str):
-    """Create a new analysis for a clinical case"""
+    """
+    Queue a new analysis of a clinical case.
+
+    Stages whose inputs are unchanged since the last run are reused; delete
+    the analysis first to run every stage again.
+    """
+    case, job_id = await AnalysisService.restart(case_id)
+    if not case:
+        raise HTTPException(status_code=404, detail="Clinical case not found")
     try:
-        # Create new analysis document
-        analysis = ClinicalAnalysis(
-            case_id=case_id,
-            progress=0.0,
-            time_remaining="estimating...",
-            diagnoses=[],
-            key_findings=[],
-            safety_checks=[],
-            risk_factors=[],
-            recommended_actions=[],
-            differential_diagnoses=[],
-            vital_signs=[],
-            medications=[],
-            lab_results=[],
-            recommendations=[],
-            created_at=datetime.now(),
-            updated_at=datetime.now()
-        )
-        await analysis.save()
-        return analysis
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        await analysis_queue.enqueue(case, job_id=job_id)
+    except Exception:
+        await AnalysisService.mark_failed(case_id, job_id)
+        raise
+    return await AnalysisService.get_analysis_by_case_id(case_id)
 
 @router.get("/{case_id}", response_model=ClinicalAnalysisResponseSchema)
 async def get_analysis(case_id: str):
-    """Get analysis for a specific case"""
-    analysis = await ClinicalAnalysis.find_one({"case_id": case_id})
+    """Get analysis for a specific case, as stored on the case itself"""
+    analysis = await AnalysisService.get_analysis_by_case_id(case_id)
     if not analysis:
         raise HTTPException(status_code=404, detail="Analysis not found")
     return analysis
 
-@router.put("/{case_id}", response_model=ClinicalAnalysisResponseSchema)
-async def update_analysis(case_id: str, analysis_data: ClinicalAnalysisRequestSchema):
-    """Update analysis for a specific case"""
-    analysis = await ClinicalAnalysis.find_one({"case_id": case_id})
-    if not analysis:
-        raise HTTPException(status_code=404, detail="Analysis not found")
-    
-    analysis.updated_at = datetime.now()
-    # Update other fields as needed
-    await analysis.save()
-    return analysis
-
 @router.delete("/{case_id}")
 async def delete_analysis(case_id: str):
-    """Delete analysis for a specific case"""
-    analysis = await ClinicalAnalysis.find_one({"case_id": case_id})
-    if not analysis:
-        raise HTTPException(status_code=404, detail="Analysis not found")
-    await analysis.delete()
-    return {"message": "Analysis deleted successfully"} 
\ No newline at end of file
+    """Clear the analysis of a case, including the stage outputs kept for reuse"""
+    if not await AnalysisService.clear(case_id):
+        raise HTTPException(status_code=404, detail="Clinical case not found")
+    await CheckpointService.delete_for_case(case_id)
+    return {"message": "Analysis deleted successfully"}
@@ -0,0 +1,52 @@
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from backend.app.schemas.bulk_schema import BulkImportReport, ConflictPolicy, ImportFormat
+from app.services import bulk_import
+from app.services.bulk_export import case_export_query, export_cases
+from app.api.deps import get_current_user
+
+router = APIRouter()
+
+@router.post("/patients", response_model=BulkImportReport)
+async def import_patients(
+    request: Request,
+    format: ImportFormat = Query(ImportFormat.NDJSON),
+    on_conflict: ConflictPolicy = Query(ConflictPolicy.SKIP),
+    current_user = Depends(get_current_user)
+):
+    """
+    Import patients from the raw request body: NDJSON with one patient per
+    line, or a FHIR Bundle of Patient resources. The body is parsed as it
+    arrives, so uploads of any size are imported in bounded memory.
+    """
+    return await bulk_import.import_patients(request.stream(), format, on_conflict)
+
+@router.post("/cases", response_model=BulkImportReport)
+async def import_cases(
+    request: Request,
+    analyze: bool = Query(False, description="Queue AI analysis for every imported case"),
+    current_user = Depends(get_current_user)
+):
+    """Import clinical cases from an NDJSON request body, one case per line"""
+    return await bulk_import.import_cases(request.stream(), analyze)
+
+@router.get("/cases/export")
+async def export_clinical_cases(
+    patient_id: Optional[str] = None,
+    created_from: Optional[datetime] = Query(None, description="Only cases created at or after this time"),
+    created_to: Optional[datetime] = Query(None, description="Only cases created before this time"),
+    diagnosis: Optional[str] = Query(None, description="Only cases with a diagnosis of this name (case-insensitive)"),
+    include_analysis: bool = Query(True, description="Include the embedded analysis documents"),
+    gzip: bool = Query(False, description="Download as cases.ndjson.gz"),
+    current_user = Depends(get_current_user)
+):
+    """Stream matching clinical cases as NDJSON, oldest first, in constant memory"""
+    query = case_export_query(patient_id, created_from, created_to, diagnosis)
+    filename = "cases.ndjson.gz" if gzip else "cases.ndjson"
+    return StreamingResponse(
+        export_cases(query, include_analysis=include_analysis, compress=gzip),
+        media_type="application/gzip" if gzip else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
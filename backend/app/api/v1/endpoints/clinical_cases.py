@@ -1,9 +1,19 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Query, Response, status, Request, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, List, Optional
+import asyncio
+from beanie import PydanticObjectId
 from backend.app.models.case_model import ClinicalCase
-from backend.app.schemas.case_schema import ClinicalCaseCreate, ClinicalCaseUpdate, ClinicalCaseResponse
-from app.services.db.case_service import CaseService
-from app.core.agents.autogen_medical_system import AutoGenMedicalSystem
+from backend.app.schemas.case_schema import ClinicalCaseCreate, ClinicalCaseUpdate, ClinicalCaseResponse, ClinicalCaseSummary
+from backend.app.schemas.job_schema import AnalysisJobStatusResponse
+from backend.app.schemas.pagination_schema import Page
+from app.services.db.case_service import CaseService, build_case_data
+from app.services.db.analysis_service import AnalysisService
+from app.services.db.checkpoint_service import CheckpointService
+from app.services.analysis_queue import analysis_queue
+from app.services.progress_broker import progress_broker, TERMINAL_EVENTS
+from app.core.config import get_settings
 from backend.app.schemas.analysis_schema import ClinicalAnalysisResponseSchema
 from pydantic import ValidationError
 from typing import Dict, Any
@@ -17,110 +27,35 @@ from backend.app.models.analysis_model import ClinicalAnalysis
 
 router = APIRouter()
 case_service = CaseService()
-autogen_system = AutoGenMedicalSystem()
 
-@router.post("/", response_model=ClinicalCaseResponse)
+@router.post("/", response_model=ClinicalCaseResponse, status_code=status.HTTP_202_ACCEPTED)
 async def create_case(case: ClinicalCaseCreate):
     """
-    Create a new clinical case with AI-powered analysis.
+    Create a new clinical case and queue its AI-powered analysis.
+    
+    Returns as soon as the case is stored; follow the analysis with
+    `GET /cases/{case_id}/analysis/status` using the returned `analysis_job_id`.
     """
     try:
-        # Transform the case data into the correct format for database storage
-        case_data = case.model_dump()
-        
-        # Create vital signs structure
-        vital_signs = case_data["vital_signs"]
-        vital_signs_measurements = transform_vital_signs(vital_signs)
-        case_data["vital_signs"] = {
-            "blood_pressure": vital_signs.blood_pressure,
-            "heart_rate": vital_signs.heart_rate,
-            "temperature": vital_signs.temperature,
-            "oxygen_saturation": vital_signs.oxygen_saturation,
-            "respiratory_rate": vital_signs.respiratory_rate,
-            "measurements": vital_signs_measurements
-        }
-        
-        # Transform medications and lab results
-        case_data["current_medications"] = [
-            med.model_dump() for med in case.current_medications
-        ]
-        case_data["lab_results"] = [
-            lab.model_dump() for lab in case.lab_results
-        ]
-        
-        # Initialize analysis fields
-        case_data.update({
-            "analysis": [],
-            "analysis_progress": 0.0,
-            "analysis_time_remaining": "pending",
-            "diagnoses": [],
-            "differential_diagnoses": [],
-            "key_findings": [],
-            "risk_factors": [],
-            "safety_checks": [],
-            "recommended_actions": [],
-            "recommendations": []
-        })
+        job_id = PydanticObjectId()
+        case_data = build_case_data(case, analysis_job_id=str(job_id))
         
         # Create the case
         created_case = await ClinicalCase(**case_data).save()
         
-        # Run analysis
-        # analysis_data = prepare_analysis_data(created_case)
-        analysis_result = await autogen_system.analyze_case(created_case)
-        
-        # Update case with analysis results
-        update_data = {
-            "analysis_progress": 100.0,
-            "analysis_time_remaining": "0",
-            "diagnoses": analysis_result.diagnoses,
-            "differential_diagnoses": analysis_result.differential_diagnoses,
-            "key_findings": analysis_result.key_findings,
-            "risk_factors": analysis_result.risk_factors,
-            "safety_checks": analysis_result.safety_checks,
-            "recommended_actions": analysis_result.recommended_actions,
-            "recommendations": analysis_result.recommendations
-        }
-        
-        await created_case.update({"$set": update_data})
-        await created_case.save()
-        
-        # Fetch updated case
-        updated_case = await ClinicalCase.get(created_case.id)
-        return updated_case
+        # Queue analysis; workers update progress and results on the case
+        try:
+            await analysis_queue.enqueue(created_case, job_id=job_id)
+        except Exception:
+            # Without a job the case would stay pending forever; the client is
+            # told creation failed, so the case must not exist either
+            await created_case.delete()
+            raise
+        return created_case
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-def get_unit_for_vital(vital_name: str) -> str:
-    """Return the appropriate unit for each vital sign"""
-    units = {
-        "blood_pressure": "mmHg",
-        "heart_rate": "bpm",
-        "temperature": "°C",
-        "oxygen_saturation": "%",
-        "respiratory_rate": "breaths/min",
-        "weight": "kg",
-        "height": "cm",
-        "bmi": "kg/m²"
-    }
-    return units.get(vital_name, "")
-
-def transform_vital_signs(vital_signs_data: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """Transform vital signs into the expected list format"""
-    measurements = []
-    for name, value in vital_signs_data.items():
-        if value is not None:
-            measurement = {
-                "name": name,
-                "value": str(value),
-                "unit": get_unit_for_vital(name),
-                "timestamp": datetime.now().isoformat(),
-                "status": "normal"  # You might want to add logic to determine status
-            }
-            measurements.append(measurement)
-    return measurements
-
 @router.get("/{case_id}", response_model=ClinicalCase)
 async def get_case(case_id: str):
     case = await case_service.get_by_id(case_id)
@@ -128,19 +63,75 @@ async def get_case(case_id: str):
         raise HTTPException(status_code=404, detail="Clinical case not found")
     return case
 
-@router.get("/patient/{patient_id}", response_model=List[ClinicalCase])
-async def get_patient_cases(patient_id: str):
-    return await case_service.get_cases_by_patient(patient_id)
+async def list_cases_page(
+    patient_id: Optional[str],
+    limit: int,
+    cursor: Optional[str],
+    view: str,
+    fields: Optional[str]
+) -> Response:
+    """
+    Serialize a page of cases straight to JSON.
+    
+    The page has already been validated in the shape the caller asked for, so
+    FastAPI's response-model pass (which would re-validate every item) is skipped.
+    """
+    selected = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+    try:
+        cases, next_cursor = await case_service.list_cases(
+            patient_id, limit=limit, cursor=cursor, view=view, fields=selected
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    page = Page(items=cases, next_cursor=next_cursor)
+    return Response(content=page.model_dump_json(by_alias=True), media_type="application/json")
+
+CASE_LIST_RESPONSES = {
+    200: {
+        "description": "`Page[ClinicalCase]` by default, `Page[ClinicalCaseSummary]` with `view=summary`, "
+                       "or pages of partial cases with `fields=`",
+        "model": Page[ClinicalCaseSummary]
+    }
+}
 
-@router.get("/", response_model=List[ClinicalCase])
-async def get_cases(skip: int = 0, limit: int = 10):
-    return await case_service.get_all(skip=skip, limit=limit)
+@router.get("/patient/{patient_id}", response_class=Response, responses=CASE_LIST_RESPONSES)
+async def get_patient_cases(
+    patient_id: str,
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
+    view: str = Query("full", description="full or summary"),
+    fields: Optional[str] = Query(None, description="Comma-separated case fields to return; overrides view")
+):
+    return await list_cases_page(patient_id, limit, cursor, view, fields)
+
+@router.get("/", response_class=Response, responses=CASE_LIST_RESPONSES)
+async def get_cases(
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
+    view: str = Query("full", description="full or summary"),
+    fields: Optional[str] = Query(None, description="Comma-separated case fields to return; overrides view")
+):
+    return await list_cases_page(None, limit, cursor, view, fields)
 
 @router.put("/{case_id}", response_model=ClinicalCase)
 async def update_case(case_id: str, case_update: ClinicalCaseUpdate):
-    updated_case = await case_service.update(case_id, case_update)
+    """
+    Update a clinical case.
+    
+    If an analysis input changed, a new analysis is queued under the returned
+    `analysis_job_id`; it re-runs only the stages whose inputs changed and
+    reuses the previous outputs of all the others.
+    """
+    updated_case, job_id = await case_service.update_case(case_id, case_update)
     if not updated_case:
         raise HTTPException(status_code=404, detail="Clinical case not found")
+    if job_id is not None:
+        try:
+            await analysis_queue.enqueue(updated_case, job_id=job_id)
+        except Exception:
+            # The edit is saved, but no job will ever finish its analysis
+            await AnalysisService.mark_failed(case_id, job_id)
+            raise
     return updated_case
 
 @router.delete("/{case_id}")
@@ -148,27 +139,115 @@ async def delete_case(case_id: str):
     success = await case_service.delete(case_id)
     if not success:
         raise HTTPException(status_code=404, detail="Clinical case not found")
+    await CheckpointService.delete_for_case(case_id)
     return {"message": "Case deleted successfully"}
 
+@router.get("/{case_id}/analysis/status", response_model=AnalysisJobStatusResponse)
+async def get_case_analysis_status(case_id: str):
+    """Report the state of the background analysis job for a case"""
+    job = await analysis_queue.get_job_for_case(case_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="No analysis job found for this case")
+    return AnalysisJobStatusResponse(
+        job_id=str(job.id),
+        case_id=job.case_id,
+        status=job.status,
+        attempts=job.attempts,
+        max_attempts=job.max_attempts,
+        current_stage=job.current_stage,
+        progress=job.progress,
+        time_remaining=job.time_remaining,
+        error=job.error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at
+    )
+
 @router.get("/{case_id}/analysis", response_model=ClinicalAnalysisResponseSchema)
 async def get_case_analysis(case_id: str):
+    # Only the analysis fields are fetched; the case document is never loaded whole
+    analysis = await AnalysisService.get_analysis_by_case_id(case_id)
+    if not analysis:
+        raise HTTPException(status_code=404, detail="Clinical case not found")
+    return analysis
+
+def _analysis_snapshot(case: ClinicalCase) -> Dict[str, Any]:
+    """Current persisted analysis state, sent once to each new watcher"""
+    return {
+        "event": "snapshot",
+        "case_id": str(case.id),
+        "progress": case.analysis_progress,
+        "time_remaining": case.analysis_time_remaining
+    }
+
+def _encode_event(event: Dict[str, Any]) -> str:
+    try:
+        return json.dumps(jsonable_encoder(event))
+    except (TypeError, ValueError):
+        # Partial results may carry objects FastAPI cannot encode
+        return json.dumps(event, default=str)
+
+def _analysis_finished(case: ClinicalCase) -> bool:
+    return case.analysis_time_remaining in ("0", "failed")
+
+async def _analysis_events(case: ClinicalCase) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yield progress events for a case until its analysis finishes.
+
+    Events come from the in-process broker, so any number of watchers
+    cost one MongoDB read each (the initial snapshot) and no polling.
+    """
+    case_id = str(case.id)
+    keepalive = get_settings().PROGRESS_KEEPALIVE_SECONDS
+    async with progress_broker.subscribe(case_id) as queue:
+        if not progress_broker.has_history(case_id):
+            yield _analysis_snapshot(case)
+            if _analysis_finished(case):
+                return
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=keepalive)
+            except asyncio.TimeoutError:
+                yield {"event": "keepalive", "case_id": case_id}
+                continue
+            yield event
+            if event["event"] in TERMINAL_EVENTS:
+                return
+
+@router.get("/{case_id}/analysis/stream")
+async def stream_case_analysis(case_id: str, request: Request):
+    """Server-Sent Events stream of stage progress and partial analysis results"""
     case = await case_service.get_by_id(case_id)
     if not case:
         raise HTTPException(status_code=404, detail="Clinical case not found")
-        
-    # Construct analysis response from case fields
-    analysis = ClinicalAnalysisResponseSchema(
-        progress=case.analysis_progress,
-        time_remaining=case.analysis_time_remaining,
-        diagnoses=case.diagnoses,
-        key_findings=case.key_findings,
-        safety_checks=case.safety_checks,
-        risk_factors=case.risk_factors,
-        recommended_actions=case.recommended_actions,
-        differential_diagnoses=case.differential_diagnoses,
-        vital_signs=case.vital_signs,
-        medications=case.medications,
-        lab_results=case.lab_results,
-        recommendations=case.recommendations
+
+    async def event_stream():
+        async for event in _analysis_events(case):
+            if await request.is_disconnected():
+                break
+            if event["event"] == "keepalive":
+                yield ": keepalive\n\n"
+                continue
+            yield f"event: {event['event']}\ndata: {_encode_event(event)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
-    return analysis
+
+@router.websocket("/{case_id}/analysis/ws")
+async def watch_case_analysis(websocket: WebSocket, case_id: str):
+    """WebSocket feed of stage progress and partial analysis results"""
+    case = await case_service.get_by_id(case_id)
+    if not case:
+        await websocket.close(code=4404, reason="Clinical case not found")
+        return
+
+    await websocket.accept()
+    try:
+        async for event in _analysis_events(case):
+            await websocket.send_text(_encode_event(event))
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
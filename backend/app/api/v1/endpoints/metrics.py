@@ -0,0 +1,31 @@
+from fastapi import APIRouter
+from app.core.analysis_context import tool_call_totals
+from app.services.ml.knowledge_cache import knowledge_cache_stats
+from app.services.ml.llm_cache import llm_cache
+from app.services.ml.llm_limiter import llm_limiter
+from backend.app.services.db.index_report import explain_queries
+
+router = APIRouter()
+
+@router.get("/cache")
+async def get_cache_metrics():
+    """Hit/miss counters for the knowledge and LLM caches and per-analysis tool memoization"""
+    return {
+        "knowledge": knowledge_cache_stats(),
+        "llm": llm_cache.stats(),
+        "tool_memoization": tool_call_totals
+    }
+
+@router.get("/llm")
+async def get_llm_metrics():
+    """Adaptive concurrency limit, queue depth and wait times of the shared Gemini limiter"""
+    return llm_limiter.stats()
+
+@router.get("/indexes")
+async def get_index_report():
+    """Explain the application's query shapes and flag any that still scan a collection"""
+    report = await explain_queries()
+    return {
+        "collection_scans": [entry["query"] for entry in report if entry.get("collection_scan")],
+        "queries": report
+    }
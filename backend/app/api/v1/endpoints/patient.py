@@ -1,6 +1,7 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, Query, status, Depends
+from typing import List, Optional
 from backend.app.schemas.patient_schema import PatientCreate, PatientUpdate, PatientResponse
+from backend.app.schemas.pagination_schema import Page
 from app.services.db.patient_service import PatientService
 from app.api.deps import get_current_user
 
@@ -28,14 +29,20 @@ async def get_patient(patient_id: str, current_user = Depends(get_current_user))
         )
     return patient
 
-@router.get("/", response_model=List[PatientResponse])
+@router.get("/", response_model=Page[PatientResponse])
 async def get_patients(
-    skip: int = 0, 
-    limit: int = 10,
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
     current_user = Depends(get_current_user)
 ):
-    patients = await patient_service.get_patients(skip, limit)
-    return patients
+    try:
+        patients, next_cursor = await patient_service.get_patients(limit, cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return Page(items=patients, next_cursor=next_cursor)
 
 @router.put("/{patient_id}", response_model=PatientResponse)
 async def update_patient(
@@ -61,12 +68,18 @@ async def delete_patient(patient_id: str, current_user = Depends(get_current_use
         )
     return {"message": "Patient deleted successfully"}
 
-@router.get("/search/{query}", response_model=List[PatientResponse])
+@router.get("/search/{query}", response_model=Page[PatientResponse])
 async def search_patients(
     query: str,
-    skip: int = 0,
-    limit: int = 10,
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
     current_user = Depends(get_current_user)
 ):
-    patients = await patient_service.search_patients(query, skip, limit)
-    return patients
+    try:
+        patients, next_cursor = await patient_service.search_patients(query, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return Page(items=patients, next_cursor=next_cursor)
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import patient, clinical_cases, auth, analysis
+from app.api.v1.endpoints import patient, clinical_cases, auth, analysis, metrics, bulk
 
 api_router = APIRouter()
 
@@ -8,4 +8,6 @@ api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(patient.router, prefix="/patients", tags=["patients"])
 api_router.include_router(clinical_cases.router, prefix="/cases", tags=["cases"])
 api_router.include_router(analysis.router, prefix="/analysis", tags=["analysis"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
+api_router.include_router(bulk.router, prefix="/bulk", tags=["bulk"])
 
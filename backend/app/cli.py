@@ -0,0 +1,97 @@
+"""
+Command-line maintenance tasks, run from the backend directory:
+
+    python -m app.cli import-patients patients.ndjson
+    python -m app.cli import-patients bundle.json --format fhir --on-conflict update
+    python -m app.cli import-cases cases.ndjson.gz --analyze
+    python -m app.cli export-cases cases.ndjson.gz --from 2024-01-01 --diagnosis "Pneumonia"
+"""
+import argparse
+import asyncio
+import gzip
+from datetime import datetime
+from typing import AsyncIterator
+from backend.app.schemas.bulk_schema import BulkImportReport, ConflictPolicy, ImportFormat
+from backend.app.utils.db import init_mongodb, close_mongodb_connection
+from app.services import bulk_import
+from app.services.bulk_export import case_export_query, export_cases
+
+READ_CHUNK_SIZE = 1024 * 1024
+
+async def read_chunks(path: str) -> AsyncIterator[bytes]:
+    """Stream a (optionally gzipped) file without blocking the event loop"""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as f:
+        while True:
+            chunk = await asyncio.to_thread(f.read, READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+async def write_export(args: argparse.Namespace):
+    # Compression happens in export_cases, so the file is written as raw bytes
+    query = case_export_query(args.patient_id, args.created_from, args.created_to, args.diagnosis)
+    written = 0
+    with open(args.path, "wb") as f:
+        async for chunk in export_cases(query, include_analysis=not args.no_analysis, compress=args.path.endswith(".gz")):
+            await asyncio.to_thread(f.write, chunk)
+            written += len(chunk)
+    print(f"Wrote {written} bytes to {args.path}")
+
+def print_report(report: BulkImportReport):
+    print(
+        f"received={report.received} inserted={report.inserted} updated={report.updated} "
+        f"skipped={report.skipped} failed={report.failed} enqueued={report.enqueued}"
+    )
+    for error in report.errors:
+        print(f"  record {error.record}: {error.error}")
+    if report.errors_truncated:
+        print("  (further errors not shown)")
+
+async def run(args: argparse.Namespace):
+    await init_mongodb()
+    try:
+        if args.command == "export-cases":
+            await write_export(args)
+        elif args.command == "import-patients":
+            print_report(await bulk_import.import_patients(
+                read_chunks(args.path), ImportFormat(args.format), ConflictPolicy(args.on_conflict)
+            ))
+        else:
+            print_report(await bulk_import.import_cases(read_chunks(args.path), analyze=args.analyze))
+    finally:
+        await close_mongodb_connection()
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Iatrikos maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    patients = commands.add_parser("import-patients", help="Bulk import patients from NDJSON or a FHIR Bundle")
+    patients.add_argument("path", help="Input file; .gz files are decompressed on the fly")
+    patients.add_argument("--format", choices=[f.value for f in ImportFormat], default=ImportFormat.NDJSON.value)
+    patients.add_argument(
+        "--on-conflict", choices=[p.value for p in ConflictPolicy], default=ConflictPolicy.SKIP.value,
+        help="Report existing emails as errors (skip) or update those patients (update)"
+    )
+
+    cases = commands.add_parser("import-cases", help="Bulk import clinical cases from NDJSON")
+    cases.add_argument("path", help="Input file; .gz files are decompressed on the fly")
+    cases.add_argument(
+        "--analyze", action="store_true",
+        help="Queue AI analysis jobs; the API's workers pick them up when they next start"
+    )
+
+    export = commands.add_parser("export-cases", help="Export clinical cases as NDJSON")
+    export.add_argument("path", help="Output file; gzip-compressed if it ends in .gz")
+    export.add_argument("--patient-id", help="Only this patient's cases")
+    export.add_argument("--from", dest="created_from", type=datetime.fromisoformat, help="Created at or after (ISO date/time)")
+    export.add_argument("--to", dest="created_to", type=datetime.fromisoformat, help="Created before (ISO date/time)")
+    export.add_argument("--diagnosis", help="Only cases with a diagnosis of this name (case-insensitive)")
+    export.add_argument("--no-analysis", action="store_true", help="Leave out the embedded analysis documents")
+    return parser
+
+def main():
+    asyncio.run(run(build_parser().parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,46 @@
-from typing import Dict, List, Any
+from typing import Any, Callable, Dict, List, Optional
 import autogen
 import google.generativeai as genai
-from langchain_google_genai import ChatGoogleGenerativeAI
 from app.core.config import get_settings
-from app.services.ml.medical_knowledge import MedicalKnowledgeService
 from app.models.analysis_model import ClinicalAnalysis
 import json
 from app.core.agents.medical_agent import MedicalAgent
 from app.core.agents.orchestrator import MedicalAgentOrchestrator
-from app.core.models.analysis_types import AnalysisResult
-import asyncio
+from app.core.models.analysis_types import AnalysisResult, StructuredAnalysis
+from app.utils.json_repair import extract_json_object
+from app.core.prompt_budget import PromptSection, build_prompt
+from app.services.ml.evidence_compaction import compact_evidence, interleave_evidence
+from app.core.analysis_context import analysis_scope
+from app.core.degradation import report_degraded
+from app.core.agents.pipeline import Stage, StageCache, StageFailedError, StagePipeline
+from app.services.ml.llm_limiter import llm_limiter
 
 settings = get_settings()
 
+# Case fields in the group chat prompt
+CHAT_CASE_FIELDS = ("chief_complaint", "symptoms", "vital_signs", "current_medications", "allergies")
+# Group chat speakers, in the order the case prompt assigns their parts
+CHAT_SPEAKER_ORDER = ("diagnostician", "safety_expert", "researcher", "treatment_planner")
+
+def _case_fields(case: Dict[str, Any], fields) -> Dict[str, Any]:
+    return {field: case.get(field) for field in fields}
+
+def _diagnosis_names(diagnoses: List[Dict[str, Any]]) -> List[str]:
+    return sorted(d["name"] for d in diagnoses if isinstance(d, dict) and d.get("name"))
+
+async def _limited_oai_reply(
+    agent: autogen.ConversableAgent,
+    messages: Optional[List[Dict]] = None,
+    sender: Optional[autogen.Agent] = None,
+    config: Optional[Any] = None
+):
+    """An agent's LLM reply, run through the shared limiter as one call"""
+    return await llm_limiter.run(
+        lambda: autogen.ConversableAgent.a_generate_oai_reply(agent, messages, sender, config)
+    )
+
 class AutoGenMedicalSystem:
-    def __init__(self):
+    def __init__(self, medical_agent: Optional[MedicalAgent] = None):
         # Initialize Gemini
         genai.configure(api_key=settings.GEMINI_API_KEY)
         
@@ -28,17 +54,6 @@ class AutoGenMedicalSystem:
             "top_p": 0.95,
         }]
 
-        # Initialize LangChain LLM for direct Gemini calls
-        self.llm = ChatGoogleGenerativeAI(
-            model="gemini-1.5-pro-002",
-            google_api_key=settings.GEMINI_API_KEY,
-            temperature=0.3,
-            convert_system_message_to_human=True
-        )
-        
-        # Initialize knowledge service
-        self.knowledge_service = MedicalKnowledgeService()
-        
         # Create specialized agents
         self.agents = self._create_agents()
         self.group_chat = self._create_group_chat()
@@ -53,9 +68,11 @@ class AutoGenMedicalSystem:
             }
         )
         
-        # Initialize medical agents and orchestrator
-        self.medical_agent = MedicalAgent()
-        self.orchestrator = MedicalAgentOrchestrator()
+        # Initialize medical agents and orchestrator (sharing one MedicalAgent,
+        # normally the registry's shared instance)
+        self.medical_agent = medical_agent or MedicalAgent()
+        self.orchestrator = MedicalAgentOrchestrator(medical_agent=self.medical_agent)
+        self.pipeline = self._build_pipeline()
 
     def _create_agents(self) -> Dict[str, autogen.AssistantAgent]:
         # Primary Diagnostic Agent
@@ -113,6 +130,10 @@ class AutoGenMedicalSystem:
             system_message="Execute API calls and coordinate information gathering."
         )
 
+        # Each model call goes through the shared LLM limiter on its own
+        for agent in (diagnostician, safety_expert, researcher, treatment_planner):
+            agent.replace_reply_func(autogen.ConversableAgent.a_generate_oai_reply, _limited_oai_reply)
+
         return {
             "diagnostician": diagnostician,
             "safety_expert": safety_expert,
@@ -125,65 +146,192 @@ class AutoGenMedicalSystem:
         return autogen.GroupChat(
             agents=list(self.agents.values()),
             messages=[],
-            max_round=10
+            max_round=10,
+            speaker_selection_method=self._select_speaker
         )
 
+    def _select_speaker(self, last_speaker: autogen.Agent, groupchat: autogen.GroupChat) -> Optional[autogen.Agent]:
+        """
+        Let each specialist speak once, in CHAT_SPEAKER_ORDER, then end the chat.
+
+        The case prompt already fixes who speaks when, so this replaces the
+        "auto" selector's extra model call per round, which could not be
+        routed through the LLM limiter.
+        """
+        speakers = [self.agents[name] for name in CHAT_SPEAKER_ORDER]
+        if last_speaker not in speakers:
+            return speakers[0]
+        position = speakers.index(last_speaker) + 1
+        return speakers[position] if position < len(speakers) else None
+
     # 1. Entry Point: Case Analysis Request
     # When a case analysis is requested, it starts in AutoGenMedicalSystem:
 
-    async def analyze_case(self, case_data: Dict[str, Any]) -> ClinicalAnalysis:
+    async def analyze_case(
+        self,
+        case_data: Dict[str, Any],
+        on_stage_complete: Optional[Callable[[str, Any, int, int], Any]] = None,
+        stage_cache: Optional[StageCache] = None
+    ) -> ClinicalAnalysis:
+        # Deduplicate identical tool calls across every agent in this analysis
+        with analysis_scope() as context:
+            result = await self._run_analysis(case_data, on_stage_complete, stage_cache)
+        print(f"Analysis tool calls: {context.report()}")
+        return result
+
+    async def _run_analysis(
+        self,
+        case_data: Dict[str, Any],
+        on_stage_complete: Optional[Callable[[str, Any, int, int], Any]] = None,
+        stage_cache: Optional[StageCache] = None
+    ) -> ClinicalAnalysis:
+        """
+        Run the pipeline. A stage failure propagates as StageFailedError so the
+        job can be retried; with a checkpointing `stage_cache` the retry
+        resumes from the stages that already completed.
+        """
         try:
-            # Step 1: Get initial analysis from MedicalAgent
-            agent_analysis = await self.medical_agent.analyze_case(case_data)
-            
-            # Step 2: Get orchestrated analysis with additional evidence
-            orchestrated_analysis = await self.orchestrator.analyze_case(case_data)
-            
-            # Step 3: Run group chat analysis with retry logic
-            max_retries = 3
-            for attempt in range(max_retries):
-                try:
-                    case_prompt = self._format_case_prompt(case_data)
-                    chat_result = await self.manager.arun(
-                        message=case_prompt,
-                        sender=self.agents["api_proxy"]
-                    )
-                    chat_analysis = await self._parse_chat_results(chat_result)
-                    break
-                except Exception as e:
-                    if "429" in str(e) and attempt < max_retries - 1:
-                        await asyncio.sleep(2 ** attempt)  # Exponential backoff
-                        continue
-                    chat_analysis = self.medical_agent._create_empty_analysis()
-                    break
-            
-            # Step 4: Combine and validate results
-            combined_analysis = self._merge_analyses(
-                agent_analysis,
-                orchestrated_analysis,
-                chat_analysis
-            )
-            
-            # Step 5: Final safety validation
-            safety_validation = await self._validate_safety(combined_analysis)
-            
-            return await self._compile_analysis(
-                case_data,
-                combined_analysis,
-                safety_validation
-            )
-        except Exception as e:
+            result = await self.pipeline.run({"case": case_data}, on_stage_complete, stage_cache)
+        except StageFailedError as e:
             print(f"Error in analysis: {str(e)}")
-            return ClinicalAnalysis(
-                case_id=case_data.get("case_id", "unknown"),
-                progress=0.0,
-                time_remaining="failed",
-                diagnoses=[],
-                safety_checks=[],
-                key_findings=[],
-                risk_factors=[],
-                recommendations=[]
+            raise
+        print(f"Analysis stage timings: {result.timings}")
+        return result.outputs["clinical_analysis"]
+
+    def _build_pipeline(self) -> StagePipeline:
+        """
+        Declare the analysis as a DAG of stages.
+
+        The MedicalAgent branch and the group chat only share the case, so they
+        run concurrently, as do the evidence, treatment and safety stages that
+        hang off the initial diagnosis. Every stage runs exactly once.
+
+        LLM and evidence stages are reusable: each is fingerprinted on the case
+        fields and upstream outputs it actually reads (evidence lookups only on
+        diagnosis names), so re-analysing an edited case re-runs only what the
+        edit affects. The joins are cheap and always recomputed.
+        """
+        agent = self.medical_agent
+        orchestrator = self.orchestrator
+        return StagePipeline([
+            # MedicalAgent branch
+            Stage(
+                "initial_analysis",
+                lambda case: agent._diagnose(case, on_diagnosis=agent._prefetch_evidence),
+                requires=("case",),
+                fallback=agent._create_empty_analysis,
+                reusable=True
+            ),
+            Stage(
+                "evidence",
+                lambda initial_analysis: agent._gather_evidence(initial_analysis["diagnoses"]),
+                requires=("initial_analysis",),
+                reusable=True,
+                fingerprint=lambda initial_analysis: _diagnosis_names(initial_analysis["diagnoses"])
+            ),
+            Stage(
+                "treatment_plan",
+                lambda initial_analysis: agent._generate_treatment_plan(initial_analysis),
+                requires=("initial_analysis",),
+                fallback=list,
+                reusable=True,
+                fingerprint=lambda initial_analysis: _diagnosis_names(initial_analysis["diagnoses"])
+            ),
+            Stage(
+                "recommendations",
+                lambda case, initial_analysis, evidence: agent._generate_recommendations(
+                    case, initial_analysis, evidence
+                ),
+                requires=("case", "initial_analysis", "evidence"),
+                fallback=list,
+                reusable=True
+            ),
+            Stage(
+                "agent_analysis",
+                lambda initial_analysis, evidence, treatment_plan, recommendations: {
+                    **initial_analysis,
+                    "evidence": evidence,
+                    "treatment_plan": treatment_plan,
+                    "recommendations": recommendations
+                },
+                requires=("initial_analysis", "evidence", "treatment_plan", "recommendations")
+            ),
+            # Orchestrator enrichment of the same initial analysis
+            Stage(
+                "orchestrator_safety",
+                lambda case, initial_analysis: orchestrator._validate_safety(
+                    case, initial_analysis["diagnoses"]
+                ),
+                requires=("case", "initial_analysis"),
+                fallback=list,
+                reusable=True,
+                fingerprint=lambda case, initial_analysis: {
+                    "case": _case_fields(case, ("allergies", "current_medications")),
+                    "diagnoses": initial_analysis["diagnoses"]
+                }
+            ),
+            Stage(
+                "additional_evidence",
+                lambda case, initial_analysis: orchestrator._gather_additional_evidence(
+                    case, initial_analysis["diagnoses"]
+                ),
+                requires=("case", "initial_analysis"),
+                fallback=dict,
+                reusable=True,
+                fingerprint=lambda case, initial_analysis: {
+                    "case": _case_fields(case, ("chief_complaint",)),
+                    "diagnoses": _diagnosis_names(initial_analysis["diagnoses"])
+                }
+            ),
+            Stage(
+                "orchestrated_analysis",
+                lambda agent_analysis, orchestrator_safety, additional_evidence: orchestrator._combine(
+                    agent_analysis, orchestrator_safety, additional_evidence
+                ),
+                requires=("agent_analysis", "orchestrator_safety", "additional_evidence")
+            ),
+            # Group chat branch
+            Stage(
+                "chat_analysis",
+                self._run_group_chat,
+                requires=("case",),
+                fallback=self.medical_agent._create_empty_analysis,
+                reusable=True,
+                fingerprint=lambda case: _case_fields(case, CHAT_CASE_FIELDS)
+            ),
+            # Join, validate and compile
+            Stage(
+                "combined_analysis",
+                self._merge_analyses,
+                requires=("agent_analysis", "orchestrated_analysis", "chat_analysis")
+            ),
+            Stage(
+                "safety_validation",
+                lambda combined_analysis: self._validate_safety(combined_analysis),
+                requires=("combined_analysis",),
+                reusable=True
+            ),
+            Stage(
+                "clinical_analysis",
+                lambda case, combined_analysis, safety_validation: self._compile_analysis(
+                    case, combined_analysis, safety_validation
+                ),
+                requires=("case", "combined_analysis", "safety_validation")
             )
+        ])
+
+    async def _run_group_chat(self, case: Dict[str, Any]) -> AnalysisResult:
+        """
+        Run group chat analysis; each agent's model call (and its 429s) goes
+        through the shared LLM limiter. Errors propagate, so the stage falls
+        back to an empty analysis that is not kept for reuse.
+        """
+        case_prompt = self._format_case_prompt(case)
+        chat_result = await self.manager.arun(
+            message=case_prompt,
+            sender=self.agents["api_proxy"]
+        )
+        return self._parse_chat_results(chat_result)
 
     def _format_case_prompt(self, case_data: Dict) -> str:
         return f"""
@@ -203,13 +351,26 @@ class AutoGenMedicalSystem:
         4. TreatmentPlanner: Develop treatment recommendations
 
         Each agent should focus on their expertise and collaborate to reach consensus.
+
+        TreatmentPlanner: end the discussion with the consensus as a single JSON
+        object with exactly these keys: {', '.join(StructuredAnalysis.__annotations__)}.
+        "diagnoses" holds objects with name, confidence and evidence; "safety_checks"
+        holds objects with check_type, result and recommendations; "evidence" holds
+        literature, clinical_trials and drug_information lists; every other key is a
+        list of strings.
         """
 
     async def _validate_safety(self, analysis_results: Dict) -> Dict:
         """Additional safety validation step"""
-        safety_prompt = f"""
+        safety_template = """
         Perform final safety review of analysis results:
-        {json.dumps(analysis_results, indent=2)}
+        Diagnoses: {diagnoses}
+        Safety checks: {safety_checks}
+        Risk factors: {risk_factors}
+        Treatment plan: {treatment_plan}
+        Recommendations: {recommendations}
+        Key findings: {key_findings}
+        Evidence: {evidence}
         
         Verify:
         1. All safety checks completed
@@ -217,7 +378,22 @@ class AutoGenMedicalSystem:
         3. All risk factors addressed
         4. Monitoring protocols adequate
         """
+        safety_prompt = build_prompt(
+            safety_template,
+            [
+                PromptSection("diagnoses", analysis_results.get("diagnoses", []), priority=6, min_tokens=300),
+                PromptSection("safety_checks", analysis_results.get("safety_checks", []), priority=5, min_tokens=300),
+                PromptSection("risk_factors", analysis_results.get("risk_factors", []), priority=4),
+                PromptSection("treatment_plan", analysis_results.get("treatment_plan", []), priority=3),
+                PromptSection("recommendations", analysis_results.get("recommendations", []), priority=3),
+                PromptSection("key_findings", analysis_results.get("key_findings", []), priority=2),
+                PromptSection("evidence", interleave_evidence(compact_evidence(analysis_results.get("evidence", {}))), priority=1)
+            ],
+            budget=settings.PROMPT_BUDGET_SAFETY_REVIEW,
+            stage="safety review"
+        )
         
+        # The agent's model call is already gated by _limited_oai_reply
         return await self.agents["safety_expert"].arun(safety_prompt)
 
     async def _compile_analysis(
@@ -238,60 +414,55 @@ class AutoGenMedicalSystem:
             recommendations=analysis_results["recommendations"]
         ) 
 
-    async def _parse_chat_results(self, chat_result: str) -> Dict:
-        """Parse the chat results into structured data"""
-        try:
-            # Use Gemini to structure the chat results
-            parse_prompt = f"""
-            Parse the following medical discussion into structured data:
-            {chat_result}
-            
-            Extract and format as JSON with the following structure:
-            {{
-                "diagnoses": [
-                    {{"name": "diagnosis_name", "confidence": 0.9, "evidence": ["evidence1", "evidence2"]}}
-                ],
-                "safety_checks": [
-                    {{"check_type": "check_name", "result": "pass/fail", "recommendations": ["rec1", "rec2"]}}
-                ],
-                "evidence": {{
-                    "literature": ["lit1", "lit2"],
-                    "clinical_trials": ["trial1", "trial2"],
-                    "lab_references": ["ref1", "ref2"]
-                }},
-                "treatment_plan": ["step1", "step2"],
-                "recommendations": ["rec1", "rec2"],
-                "key_findings": ["finding1", "finding2"],
-                "risk_factors": ["risk1", "risk2"]
-            }}
-            """
-            
-            response = await self.llm.agenerate([parse_prompt])
-            parsed_text = response.generations[0][0].text
-            
-            try:
-                return json.loads(parsed_text)
-            except json.JSONDecodeError:
-                return {
-                    "diagnoses": [],
-                    "safety_checks": [],
-                    "evidence": {
-                        "literature": [],
-                        "clinical_trials": [],
-                        "lab_references": []
-                    },
-                    "treatment_plan": [],
-                    "recommendations": [],
-                    "key_findings": [],
-                    "risk_factors": [],
-                    "raw_response": parsed_text
-                }
-                
-        except Exception as e:
-            print(f"Error parsing chat results: {str(e)}")
-            return {} 
+    def _parse_chat_results(self, chat_result: Any) -> Dict:
+        """
+        Extract the consensus JSON the group chat ends with
+
+        Parsed locally, so no extra LLM round trip is spent reformatting the
+        transcript. The chat cannot be schema-constrained, so malformed or
+        truncated output is repaired as a last resort; that is logged and
+        reported as a degradation.
+        """
+        transcript = str(chat_result)
+        analysis = {
+            "diagnoses": [],
+            "safety_checks": [],
+            "evidence": {
+                "literature": [],
+                "clinical_trials": [],
+                "drug_information": []
+            },
+            "treatment_plan": [],
+            "recommendations": [],
+            "key_findings": [],
+            "risk_factors": []
+        }
+        parsed = extract_json_object(transcript, required_key="diagnoses", repair=False)
+        if parsed is None:
+            parsed = extract_json_object(transcript, required_key="diagnoses")
+            if parsed is not None:
+                print(f"Group chat consensus was malformed JSON, using the repaired object: {parsed}")
+                report_degraded("group chat consensus had to be repaired")
+        if parsed is None:
+            print("Group chat ended without a structured consensus")
+            report_degraded("group chat ended without a structured consensus")
+            return {**analysis, "raw_response": transcript}
         
-    
+        for key, default in analysis.items():
+            value = parsed.get(key)
+            if isinstance(value, type(default)):
+                analysis[key] = value
+        # Only well-formed diagnoses survive; the merge step indexes these fields
+        analysis["diagnoses"] = [
+            {
+                "name": diagnosis["name"],
+                "confidence": diagnosis.get("confidence", 0.0),
+                "evidence": diagnosis.get("evidence", [])
+            }
+            for diagnosis in analysis["diagnoses"]
+            if isinstance(diagnosis, dict) and diagnosis.get("name")
+        ]
+        return analysis
 
     def _merge_analyses(
         self,
@@ -1,17 +1,23 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator, Awaitable, Callable, Optional, Tuple
 import google.generativeai as genai
-from langchain.agents import Tool, AgentExecutor
+from langchain.agents import Tool
 from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.chains import LLMChain
 from langchain.prompts import PromptTemplate
-from Bio import Entrez
-import requests
 from app.core.config import get_settings
 from app.services.ml.medical_knowledge import MedicalKnowledgeService
 import asyncio
 import json
-from app.core.models.analysis_types import AnalysisResult
-from langchain.schema.runnable import RunnablePassthrough
+from app.core.models.analysis_types import AnalysisResult, InitialAnalysis
+from app.services.ml.llm_cache import llm_cache
+from app.services.ml.llm_limiter import llm_limiter
+from app.core.analysis_context import current_analysis
+from app.core.degradation import report_degraded
+from app.utils.json_stream import JSONArrayStreamParser
+from app.utils.json_repair import is_json_object, parse_json_object
+from app.core.prompt_budget import PromptSection, build_prompt
+from app.services.ml.evidence_compaction import (
+    compact_drug_label, compact_evidence, compact_lab_reference, compact_trial, interleave_evidence
+)
 
 settings = get_settings()
 
@@ -19,7 +25,6 @@ class MedicalAgent:
     def __init__(self):
         # Initialize Gemini
         genai.configure(api_key=settings.GEMINI_API_KEY)
-        self.model = genai.GenerativeModel('gemini-1.5-pro-002')
         
         # Initialize knowledge service
         self.knowledge_service = MedicalKnowledgeService()
@@ -30,6 +35,15 @@ class MedicalAgent:
             google_api_key=settings.GEMINI_API_KEY,
             temperature=0.3
         )
+        # The initial analysis is constrained to the InitialAnalysis JSON schema
+        self.analysis_model = genai.GenerativeModel(
+            'gemini-1.5-pro-002',
+            generation_config=genai.GenerationConfig(
+                temperature=0.3,
+                response_mime_type="application/json",
+                response_schema=InitialAnalysis
+            )
+        )
         
         # Create specialized tools
         self.tools = self._create_tools()
@@ -59,6 +73,41 @@ class MedicalAgent:
             )
         ]
     
+    async def _complete(
+        self,
+        prompt: str,
+        cacheable: bool = True,
+        store_if: Optional[Callable[[str], bool]] = None
+    ) -> str:
+        """Run a prompt through the LangChain LLM, reusing cached completions that pass `store_if`"""
+        return await llm_cache.get_or_generate(
+            model=self.llm.model,
+            params={"temperature": self.llm.temperature},
+            prompt=prompt,
+            generate=lambda: self._invoke_llm(prompt),
+            cacheable=cacheable,
+            store_if=store_if
+        )
+    
+    async def _invoke_llm(self, prompt: str) -> str:
+        message = await llm_limiter.run(lambda: self.llm.ainvoke(prompt))
+        return message.content if hasattr(message, 'content') else str(message)
+    
+    def _stream_analysis(self, prompt: str) -> AsyncIterator[str]:
+        """Stream a schema-constrained InitialAnalysis from the Gemini client, through the cache"""
+        return llm_cache.stream_or_generate(
+            model=self.analysis_model.model_name,
+            params={"temperature": 0.3, "response_schema": InitialAnalysis.__name__},
+            prompt=prompt,
+            stream=lambda: llm_limiter.stream(lambda: self._stream_analysis_model(prompt)),
+            store_if=is_json_object
+        )
+    
+    async def _stream_analysis_model(self, prompt: str) -> AsyncIterator[str]:
+        response = await self.analysis_model.generate_content_async(prompt, stream=True)
+        async for chunk in response:
+            yield chunk.text
+    
     def _create_empty_analysis(self) -> Dict[str, Any]:
         """Create empty analysis structure with default values"""
         return {
@@ -83,6 +132,41 @@ class MedicalAgent:
     
     async def analyze_case(self, case_data: Dict[str, Any]) -> AnalysisResult:
         """Perform comprehensive case analysis using LangChain"""
+        try:
+            parsed_analysis = await self._diagnose(case_data, on_diagnosis=self._prefetch_evidence)
+            
+            # Gather supporting evidence
+            evidence = await self._gather_evidence(parsed_analysis["diagnoses"])
+            
+            return {
+                **parsed_analysis,
+                "evidence": evidence,
+                "treatment_plan": await self._generate_treatment_plan(parsed_analysis),
+                "recommendations": await self._generate_recommendations(
+                    case_data,
+                    parsed_analysis,
+                    evidence
+                )
+            }
+            
+        except Exception as e:
+            print(f"Analysis error: {str(e)}")
+            return self._create_empty_analysis()
+    
+    async def _diagnose(
+        self,
+        case_data: Dict[str, Any],
+        on_diagnosis: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Run the initial structured LLM analysis (diagnoses, findings, safety checks)
+
+        The model is constrained to the InitialAnalysis schema, so its output
+        is parsed strictly; anything else is reported as a degradation rather
+        than repaired. The completion is streamed and scanned incrementally;
+        `on_diagnosis` is called with each entry of "diagnoses" as soon as the
+        model has finished writing it, while the rest is still being generated.
+        """
         
         analysis_prompt = PromptTemplate(
             input_variables=["case_data"],
@@ -142,71 +226,102 @@ class MedicalAgent:
             """
         )
         
-        # Create the chain using new syntax
-        chain = (
-            {"case_data": RunnablePassthrough()} 
-            | analysis_prompt 
-            | self.llm
-        )
+        # Execute analysis, surfacing diagnoses while the model is still writing
+        parser = JSONArrayStreamParser("diagnoses")
+        # Only a well-formed JSON object is cached; anything else is asked for again
+        async for chunk in self._stream_analysis(analysis_prompt.format(case_data=case_data)):
+            for diagnosis in parser.feed(chunk):
+                if on_diagnosis is not None and isinstance(diagnosis, dict):
+                    on_diagnosis(diagnosis)
+        print(f"Initial analysis: {parser.text}")
         
-        try:
-            # Execute analysis
-            initial_analysis = await chain.ainvoke(case_data)
-            print(f"Initial analysis: {initial_analysis}")
-            
-            # Extract content from AIMessage
-            content = initial_analysis.content if hasattr(initial_analysis, 'content') else str(initial_analysis)
-            
-            # Clean the response
-            cleaned_response = content.replace('```json', '').replace('```', '').strip()
-            
-            # Parse JSON response
-            try:
-                parsed_analysis = json.loads(cleaned_response)
-            except json.JSONDecodeError as e:
-                print(f"JSON decode error: {str(e)}")
-                print(f"Raw response: {cleaned_response}")
-                parsed_analysis = self._create_empty_analysis()
-                
-            # Gather supporting evidence
-            evidence = await self._gather_evidence(parsed_analysis["diagnoses"])
-            
-            return {
-                **parsed_analysis,
-                "evidence": evidence,
-                "treatment_plan": await self._generate_treatment_plan(parsed_analysis),
-                "recommendations": await self._generate_recommendations(
-                    case_data,
-                    parsed_analysis,
-                    evidence
-                )
-            }
-            
-        except Exception as e:
-            print(f"Analysis error: {str(e)}")
+        parsed = parse_json_object(parser.text)
+        if parsed is None:
+            # Schema-constrained output only breaks when cut off (e.g. at the token limit)
+            print(f"Initial analysis was not a well-formed JSON object: {parser.text}")
+            report_degraded("initial analysis was not a well-formed JSON object")
             return self._create_empty_analysis()
+        return {**self._create_empty_analysis(), **parsed}
+    
+    def _evidence_sources(self) -> List[Tuple[str, Callable[[str], Awaitable[Any]], float]]:
+        return [
+            ("literature", self.tools[0].func, settings.EVIDENCE_TIMEOUT_LITERATURE),  # Literature Search tool
+            ("clinical_trials", self.tools[2].func, settings.EVIDENCE_TIMEOUT_CLINICAL_TRIALS),  # Clinical Trials tool
+            ("drug_information", self.tools[1].func, settings.EVIDENCE_TIMEOUT_DRUG_INFORMATION)  # Drug Information tool
+        ]
+    
+    async def _evidence_lookup(
+        self,
+        source: str,
+        tool: Callable[[str], Awaitable[Any]],
+        timeout: float,
+        diagnosis_name: str,
+        semaphore: Optional[asyncio.Semaphore] = None
+    ) -> Any:
+        """
+        One evidence lookup, holding an EVIDENCE_MAX_CONCURRENCY slot and
+        bounded by its source timeout; None if it fails or times out.
+
+        Inside an analysis scope the slots are shared by the whole analysis;
+        the tools are memoized_tool methods, so a lookup that a prefetch has
+        already started joins that call instead of repeating it. Outside one,
+        the slots are those of `semaphore`.
+        """
+        context = current_analysis()
+        if context is not None:
+            semaphore = context.semaphore("evidence", settings.EVIDENCE_MAX_CONCURRENCY)
+        async with semaphore:
+            try:
+                return await asyncio.wait_for(tool(diagnosis_name), timeout)
+            except Exception as e:
+                print(f"Evidence lookup failed ({source}, {diagnosis_name}): {str(e) or type(e).__name__}")
+                report_degraded(f"{source} lookup for {diagnosis_name} failed")
+                return None
+    
+    def _prefetch_evidence(self, diagnosis: Dict[str, Any]):
+        """
+        Start the evidence lookups for one diagnosis in the background.
+
+        Only done inside an analysis scope, where the later _gather_evidence
+        calls join these in-flight lookups instead of repeating them.
+        """
+        context = current_analysis()
+        if context is None or not diagnosis.get("name"):
+            return
+        for source, tool, timeout in self._evidence_sources():
+            context.spawn(self._evidence_lookup(source, tool, timeout, diagnosis["name"]))
     
     
     async def _gather_evidence(self, analysis: List[Dict[str, Any]]) -> Dict[str, List[str]]:
-        """Gather supporting evidence using tools"""
+        """
+        Gather supporting evidence using tools
+
+        Every diagnosis x source lookup runs concurrently, bounded by
+        EVIDENCE_MAX_CONCURRENCY. A lookup that fails or exceeds its source
+        timeout is dropped and reported as a degradation, so the result holds
+        whatever evidence arrived.
+        """
         evidence = {
             "literature": [],
             "clinical_trials": [],
             "drug_information": []
         }
+        lookups = [
+            (source, tool, timeout, diagnosis["name"])
+            for diagnosis in analysis if diagnosis.get("name")
+            for source, tool, timeout in self._evidence_sources()
+        ]
+        semaphore = asyncio.Semaphore(settings.EVIDENCE_MAX_CONCURRENCY)
+        results = await asyncio.gather(*(self._evidence_lookup(*args, semaphore) for args in lookups))
         
-        for diagnosis in analysis:
-            # Use Literature Search tool
-            literature = await self.tools[0].func(diagnosis["name"])
-            evidence["literature"].extend(literature)
-            
-            # Use Clinical Trials tool
-            trials = await self.tools[2].func(diagnosis["name"])
-            evidence["clinical_trials"].extend(trials)
-            
-            # Use Drug Information tool
-            drug_info = await self.tools[1].func(diagnosis["name"])
-            evidence["drug_information"].extend(drug_info)
+        for (source, _, _, _), result in zip(lookups, results):
+            if not result:
+                continue
+            if isinstance(result, list):
+                evidence[source].extend(result)
+            else:
+                # OpenFDA returns a single label document per query
+                evidence[source].append(result)
         
         return evidence
     
@@ -236,18 +351,20 @@ class MedicalAgent:
             """
         )
         
-        # TODO: Update to use RunnableSequence when stable
-        # Current implementation uses deprecated LLMChain for stability
-        recommendation_chain = LLMChain(
-            llm=self.llm,
-            prompt=recommendation_prompt
-        )
-        
-        recommendations = await recommendation_chain.arun(
-            case_data=case_data,
-            analysis=analysis,
-            evidence=evidence
+        prompt = build_prompt(
+            recommendation_prompt,
+            [
+                PromptSection("case_data", case_data, priority=3, min_tokens=500),
+                PromptSection("analysis", {
+                    key: analysis.get(key, [])
+                    for key in ("diagnoses", "differential_diagnoses", "key_findings", "risk_factors", "safety_checks")
+                }, priority=2, min_tokens=500),
+                PromptSection("evidence", interleave_evidence(compact_evidence(evidence)), priority=1)
+            ],
+            budget=settings.PROMPT_BUDGET_RECOMMENDATIONS,
+            stage="recommendations"
         )
+        recommendations = await self._complete(prompt)
         
         return recommendations.split("\n")
     
@@ -269,12 +386,7 @@ class MedicalAgent:
             """
         )
         
-        safety_chain = LLMChain(
-            llm=self.llm,
-            prompt=safety_prompt
-        )
-        
-        return await safety_chain.arun(treatment_plan=treatment_plan)
+        return await self._complete(safety_prompt.format(treatment_plan=treatment_plan))
 
     async def _generate_treatment_plan(self, analysis: Dict[str, Any]) -> List[str]:
         """
@@ -312,17 +424,19 @@ class MedicalAgent:
                 """
             )
             
-            treatment_chain = LLMChain(llm=self.llm, prompt=treatment_prompt)
-            steps = await treatment_chain.arun(
-                diagnosis=diagnosis["name"],
-                drug_info=drug_info,
-                trials=trials,
-                lab_refs=lab_refs
+            prompt = build_prompt(
+                treatment_prompt,
+                [
+                    PromptSection("diagnosis", diagnosis["name"], priority=4),
+                    PromptSection("drug_info", compact_drug_label(drug_info), priority=3, min_tokens=300),
+                    PromptSection("trials", [compact_trial(trial) for trial in trials], priority=2),
+                    PromptSection("lab_refs", compact_lab_reference(lab_refs), priority=1)
+                ],
+                budget=settings.PROMPT_BUDGET_TREATMENT_PLAN,
+                stage="treatment plan"
             )
+            steps = await self._complete(prompt)
             
             treatment_plan.extend(steps.split("\n"))
         
         return treatment_plan
-
-# Create singleton instance
-medical_agent = MedicalAgent()
\ No newline at end of file
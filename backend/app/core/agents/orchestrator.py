@@ -1,24 +1,36 @@
-from typing import Dict, List
+from typing import Dict, List, Optional
 import google.generativeai as genai
 from app.core.config import get_settings
-from app.services.ml.medical_knowledge import MedicalKnowledgeService
 from app.models.analysis_model import (
     ClinicalAnalysis, DiagnosisAnalysis, KeyFinding,
     SafetyCheck, RiskFactor
 )
-from app.core.models.analysis_types import AnalysisResult, DiagnosisResult
+from app.core.models.analysis_types import AnalysisResult, DiagnosisResult, SafetyValidation
 from app.core.agents.medical_agent import MedicalAgent
+from app.services.ml.llm_cache import llm_cache
+from app.services.ml.llm_limiter import llm_limiter
+from app.utils.json_repair import is_json_object, parse_json_object
+from app.core.degradation import report_degraded
 import json
 
 class MedicalAgentOrchestrator: 
-    def __init__(self):
+    def __init__(self, medical_agent: Optional[MedicalAgent] = None):
         settings = get_settings()
         genai.configure(api_key=settings.GEMINI_API_KEY)
         
         # Initialize Gemini model
         self.model = genai.GenerativeModel('gemini-1.5-pro-002')
-        self.medical_knowledge = MedicalKnowledgeService()
-        self.medical_agent = MedicalAgent()
+        # Same model constrained to the SafetyValidation JSON schema
+        self.safety_model = genai.GenerativeModel(
+            'gemini-1.5-pro-002',
+            generation_config=genai.GenerationConfig(
+                response_mime_type="application/json",
+                response_schema=SafetyValidation
+            )
+        )
+        # Share the caller's agent when given so its clients are not built twice
+        self.medical_agent = medical_agent or MedicalAgent()
+        self.medical_knowledge = self.medical_agent.knowledge_service
         
     async def analyze_case(self, case_data: Dict) -> AnalysisResult:
         """
@@ -45,6 +57,15 @@ class MedicalAgentOrchestrator:
             agent_analysis["diagnoses"]
         )
         
+        return self._combine(agent_analysis, safety_validation, enhanced_evidence)
+
+    def _combine(
+        self,
+        agent_analysis: AnalysisResult,
+        safety_validation: List[SafetyCheck],
+        enhanced_evidence: Dict
+    ) -> AnalysisResult:
+        """Layer the orchestrator's safety checks and evidence onto the agent analysis"""
         return {
             **agent_analysis,
             "safety_checks": [*agent_analysis["safety_checks"], *safety_validation],
@@ -59,24 +80,28 @@ class MedicalAgentOrchestrator:
         Current Medications: {case_data.get('current_medications', [])}
         Proposed Diagnoses: {json.dumps(diagnoses)}
         
-        Provide results in JSON format with exactly this structure:
-        {{
-            "safety_checks": [
-                {{
-                    "check_type": "drug_interaction",
-                    "result": "pass/fail",
-                    "recommendations": ["recommendation1", "recommendation2"]
-                }}
-            ]
-        }}
+        Report each check with its check_type (e.g. drug_interaction), a
+        result of pass or fail, and recommendations.
         """
         
-        response = await self.model.generate_content_async(safety_prompt)
-        try:
-            result = json.loads(response.text)
-            return result.get("safety_checks", [])
-        except json.JSONDecodeError:
+        response_text = await llm_cache.get_or_generate(
+            model=self.safety_model.model_name,
+            params={"response_schema": SafetyValidation.__name__},
+            prompt=safety_prompt,
+            generate=lambda: self._generate(safety_prompt, self.safety_model),
+            store_if=is_json_object
+        )
+        result = parse_json_object(response_text)
+        if result is None:
+            print(f"Safety validation was not a well-formed JSON object: {response_text}")
+            report_degraded("safety validation was not a well-formed JSON object")
             return []
+        return result.get("safety_checks", [])
+
+    async def _generate(self, prompt: str, model: Optional[genai.GenerativeModel] = None) -> str:
+        model = model or self.model
+        response = await llm_limiter.run(lambda: model.generate_content_async(prompt))
+        return response.text
 
     async def _gather_additional_evidence(self, case_data: Dict, diagnoses: List[DiagnosisResult]) -> Dict:
         """Gather additional evidence beyond what MedicalAgent provided"""
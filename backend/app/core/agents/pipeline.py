@@ -0,0 +1,188 @@
+import asyncio
+import hashlib
+import inspect
+import json
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from app.core.degradation import collect_degradations
+
+class Stage:
+    """
+    A named step of the analysis pipeline.
+
+    `run` receives one keyword argument per name in `requires` (pipeline
+    inputs or upstream stage outputs) and its result is published under the
+    stage's own name. If `fallback` is given, a failing stage yields
+    `fallback()` instead of aborting the pipeline.
+
+    A `reusable` stage may be skipped when its inputs are unchanged since a
+    previous run, reusing that run's output. `fingerprint` receives the same
+    keyword arguments as `run` and returns the part of them the stage really
+    depends on (all of them by default); bump `version` when the stage's
+    logic or prompt changes so earlier outputs stop matching. Outputs of a
+    run that reported itself degraded (see app.core.degradation) are passed
+    on but never offered for reuse.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        run: Callable[..., Any],
+        requires: Iterable[str] = (),
+        fallback: Optional[Callable[[], Any]] = None,
+        reusable: bool = False,
+        fingerprint: Optional[Callable[..., Any]] = None,
+        version: int = 1
+    ):
+        self.name = name
+        self.run = run
+        self.requires = tuple(requires)
+        self.fallback = fallback
+        self.reusable = reusable
+        self.fingerprint = fingerprint
+        self.version = version
+
+    def input_hash(self, inputs: Dict[str, Any]) -> str:
+        relevant = self.fingerprint(**inputs) if self.fingerprint else inputs
+        payload = json.dumps(
+            {"stage": self.name, "version": self.version, "inputs": relevant},
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class StageCache:
+    """
+    Outputs of reusable stages from an earlier run, keyed by stage name and
+    input hash, plus the outputs this run produced or reused.
+    """
+
+    def __init__(self, previous: Optional[Dict[str, Tuple[str, Any]]] = None):
+        self.previous = previous or {}
+        self.completed: Dict[str, Tuple[str, Any]] = {}
+
+    def lookup(self, stage: str, input_hash: str) -> Tuple[bool, Any]:
+        entry = self.previous.get(stage)
+        if entry is not None and entry[0] == input_hash:
+            return True, entry[1]
+        return False, None
+
+    async def record(self, stage: str, input_hash: str, output: Any):
+        self.completed[stage] = (input_hash, output)
+
+class StageFailedError(Exception):
+    def __init__(self, stage: str, error: Exception):
+        super().__init__(f"Stage '{stage}' failed: {str(error)}")
+        self.stage = stage
+        self.error = error
+
+class PipelineResult:
+    def __init__(self, outputs: Dict[str, Any], timings: Dict[str, Dict[str, Any]]):
+        self.outputs = outputs
+        self.timings = timings
+
+class StagePipeline:
+    """
+    Executes a DAG of stages, each exactly once.
+
+    A stage starts as soon as everything it requires is available, so
+    independent branches run concurrently. Per-stage timings are recorded
+    on the returned PipelineResult. Given a StageCache, reusable stages
+    whose input hash matches a cached output are not run again.
+    """
+
+    def __init__(self, stages: List[Stage]):
+        self.stages = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate stage name: {stage.name}")
+            self.stages[stage.name] = stage
+
+    async def run(
+        self,
+        inputs: Dict[str, Any],
+        on_stage_complete: Optional[Callable[[str, Any, int, int], Any]] = None,
+        cache: Optional[StageCache] = None
+    ) -> PipelineResult:
+        """
+        Run every stage. `on_stage_complete(name, output, completed, total)`
+        is called (and awaited if async) as each stage finishes.
+        """
+        outputs = dict(inputs)
+        timings: Dict[str, Dict[str, Any]] = {}
+        pending = dict(self.stages)
+        running: Dict[asyncio.Task, Stage] = {}
+        completed = 0
+
+        try:
+            while pending or running:
+                for name, stage in list(pending.items()):
+                    if all(dep in outputs for dep in stage.requires):
+                        del pending[name]
+                        task = asyncio.create_task(self._execute(stage, outputs, timings, cache))
+                        running[task] = stage
+
+                if not running:
+                    missing = {
+                        name: [dep for dep in stage.requires if dep not in outputs]
+                        for name, stage in pending.items()
+                    }
+                    raise ValueError(f"Unsatisfiable stage dependencies: {missing}")
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    stage = running.pop(task)
+                    outputs[stage.name] = task.result()
+                    completed += 1
+                    if on_stage_complete is not None:
+                        notified = on_stage_complete(stage.name, outputs[stage.name], completed, len(self.stages))
+                        if inspect.isawaitable(notified):
+                            await notified
+        finally:
+            for task in running:
+                task.cancel()
+
+        return PipelineResult(outputs, timings)
+
+    async def _execute(
+        self,
+        stage: Stage,
+        outputs: Dict[str, Any],
+        timings: Dict[str, Dict[str, Any]],
+        cache: Optional[StageCache] = None
+    ) -> Any:
+        started = time.perf_counter()
+        timing = {"started_at": datetime.now().isoformat(), "status": "running"}
+        timings[stage.name] = timing
+        kwargs = {dep: outputs[dep] for dep in stage.requires}
+        input_hash = stage.input_hash(kwargs) if cache is not None and stage.reusable else None
+        try:
+            if input_hash is not None:
+                found, result = cache.lookup(stage.name, input_hash)
+                if found:
+                    timing["status"] = "reused"
+                    await cache.record(stage.name, input_hash, result)
+                    return result
+            with collect_degradations() as degradations:
+                result = stage.run(**kwargs)
+                if inspect.isawaitable(result):
+                    result = await result
+            # Degraded and fallback outputs are never recorded, so the stage is retried next run
+            if degradations:
+                print(f"Stage '{stage.name}' degraded: {'; '.join(degradations)}")
+                timing["status"] = "degraded"
+            else:
+                timing["status"] = "completed"
+                if input_hash is not None:
+                    await cache.record(stage.name, input_hash, result)
+            return result
+        except Exception as e:
+            if stage.fallback is None:
+                timing["status"] = "failed"
+                raise StageFailedError(stage.name, e) from e
+            print(f"Stage '{stage.name}' failed, using fallback: {str(e)}")
+            timing["status"] = "fallback"
+            return stage.fallback()
+        finally:
+            timing["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
@@ -0,0 +1,99 @@
+import asyncio
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Set, Tuple
+from app.core.degradation import collect_degradations, report_degraded
+from app.services.cache import make_cache_key
+
+_current_analysis: ContextVar[Optional["AnalysisContext"]] = ContextVar("current_analysis", default=None)
+
+# Process-wide totals across every analysis scope that has finished
+tool_call_totals = {"tool_calls": 0, "saved_calls": 0}
+
+async def _collecting_degradations(coro: Awaitable[Any]) -> Tuple[Any, List[str]]:
+    with collect_degradations() as reasons:
+        result = await coro
+    return result, reasons
+
+class AnalysisContext:
+    """
+    Per-analysis registry of tool invocations.
+
+    Identical (tool, arguments) pairs share one underlying call for the whole
+    analysis, including calls that are still in flight, so each pair reaches
+    the network at most once.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Future] = {}
+        self._background: Set[asyncio.Task] = set()
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.tool_calls = 0
+        self.saved_calls = 0
+
+    async def memoize(self, tool: str, arguments: Any, call: Callable[[], Awaitable[Any]]) -> Any:
+        key = make_cache_key(f"tool:{tool}", arguments)
+        self.tool_calls += 1
+        if key in self._calls:
+            self.saved_calls += 1
+        else:
+            self._calls[key] = asyncio.ensure_future(_collecting_degradations(call()))
+        # Shield so one caller timing out does not cancel the call for the others
+        result, reasons = await asyncio.shield(self._calls[key])
+        # Every caller that shares a degraded result is degraded too, not just the first
+        for reason in reasons:
+            report_degraded(reason)
+        return result
+
+    def spawn(self, coro: Awaitable[Any]) -> asyncio.Task:
+        """Start `coro` in the background, e.g. to warm calls a later stage will join"""
+        # Detached from the caller's degradations; whoever joins the calls reports them
+        task = asyncio.ensure_future(_collecting_degradations(coro))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        return task
+
+    def semaphore(self, name: str, limit: int) -> asyncio.Semaphore:
+        """One semaphore per `name` for the whole analysis, shared by every stage"""
+        if name not in self._semaphores:
+            self._semaphores[name] = asyncio.Semaphore(limit)
+        return self._semaphores[name]
+
+    def report(self) -> Dict[str, int]:
+        return {
+            "tool_calls": self.tool_calls,
+            "unique_calls": len(self._calls),
+            "saved_calls": self.saved_calls
+        }
+
+def current_analysis() -> Optional[AnalysisContext]:
+    return _current_analysis.get()
+
+@contextmanager
+def analysis_scope() -> Iterator[AnalysisContext]:
+    """Open a memoization scope for one case analysis"""
+    context = AnalysisContext()
+    token = _current_analysis.set(context)
+    try:
+        yield context
+    finally:
+        _current_analysis.reset(token)
+        tool_call_totals["tool_calls"] += context.tool_calls
+        tool_call_totals["saved_calls"] += context.saved_calls
+
+def memoized_tool(tool: str):
+    """Deduplicate calls to an async method within the active analysis scope"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            context = current_analysis()
+            if context is None:
+                return await func(self, *args, **kwargs)
+            return await context.memoize(
+                tool,
+                {"args": list(args), "kwargs": kwargs},
+                lambda: func(self, *args, **kwargs)
+            )
+        return wrapper
+    return decorator
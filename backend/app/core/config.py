@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
-from typing import Optional
+from typing import List, Optional
 
 class Settings(BaseSettings):
     # Base
@@ -25,6 +25,95 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     ALGORITHM: str = "HS256"
     
+    # Password hashing (workers default to one per available core)
+    PASSWORD_HASH_WORKERS: Optional[int] = None
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_REHASH_ON_LOGIN: bool = True
+    
+    # Users resolved from access tokens, cached per process (0 disables)
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+    
+    # Outbound HTTP (OpenFDA, ClinicalTrials.gov, LOINC)
+    HTTP_TIMEOUT_SECONDS: float = 10.0
+    HTTP_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = 10
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    HTTP2_ENABLED: bool = True
+    
+    # NCBI E-utilities (PubMed); NCBI_EMAIL is this deployment's contact for NCBI
+    NCBI_EMAIL: Optional[str] = None
+    NCBI_TOOL: str = "iatrikos"
+    NCBI_API_KEY: Optional[str] = None
+    
+    # Caching ("memory", "disk" or "redis" for the shared tier)
+    CACHE_BACKEND: str = "disk"
+    CACHE_DIR: str = ".cache/iatrikos"
+    CACHE_DISK_SIZE_LIMIT_MB: int = 512
+    REDIS_URL: str = "redis://localhost:6379/0"
+    
+    # External knowledge cache TTLs (seconds)
+    KNOWLEDGE_CACHE_TTL_PUBMED: int = 60 * 60 * 24
+    KNOWLEDGE_CACHE_TTL_OPENFDA: int = 60 * 60 * 24 * 7
+    KNOWLEDGE_CACHE_TTL_CLINICALTRIALS: int = 60 * 60 * 12
+    KNOWLEDGE_CACHE_TTL_LOINC: int = 60 * 60 * 24 * 30
+    KNOWLEDGE_CACHE_STALE_FACTOR: float = 1.0
+    KNOWLEDGE_CACHE_MAX_ENTRIES: int = 2048
+    
+    # Evidence gathering
+    EVIDENCE_MAX_CONCURRENCY: int = 8
+    EVIDENCE_TIMEOUT_LITERATURE: float = 20.0
+    EVIDENCE_TIMEOUT_CLINICAL_TRIALS: float = 15.0
+    EVIDENCE_TIMEOUT_DRUG_INFORMATION: float = 15.0
+    
+    # Background analysis jobs
+    ANALYSIS_WORKER_CONCURRENCY: int = 2
+    ANALYSIS_JOB_MAX_ATTEMPTS: int = 3
+    ANALYSIS_JOB_RETRY_BACKOFF_SECONDS: float = 5.0
+    ANALYSIS_JOB_STALE_SECONDS: int = 900
+    
+    # Live progress streaming
+    PROGRESS_EVENTS_PER_CASE: int = 64
+    PROGRESS_HISTORY_CASES: int = 1000
+    PROGRESS_KEEPALIVE_SECONDS: float = 15.0
+    
+    # LLM response cache
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_TTL_SECONDS: int = 60 * 60 * 24
+    LLM_CACHE_MAX_ENTRIES: int = 1024
+    LLM_CACHE_SHARED: bool = True
+    
+    # LLM concurrency limiter (shared by every Gemini call in the process)
+    LLM_RATE_LIMIT_PER_MINUTE: int = 60
+    LLM_INITIAL_CONCURRENCY: int = 4
+    LLM_MIN_CONCURRENCY: int = 1
+    LLM_MAX_CONCURRENCY: int = 16
+    LLM_LATENCY_TARGET_SECONDS: float = 30.0
+    LLM_MAX_ATTEMPTS: int = 4
+    LLM_RETRY_BACKOFF_SECONDS: float = 2.0
+    
+    # Prompt assembly: evidence compaction and per-stage token budgets
+    EVIDENCE_MAX_ITEMS_PER_SOURCE: int = 5
+    EVIDENCE_FIELD_MAX_CHARS: int = 600
+    PROMPT_BUDGET_TREATMENT_PLAN: int = 3000
+    PROMPT_BUDGET_RECOMMENDATIONS: int = 6000
+    PROMPT_BUDGET_SAFETY_REVIEW: int = 6000
+    
+    # MongoDB index reconciliation at startup
+    MONGODB_DROP_UNDECLARED_INDEXES: bool = False
+    MONGODB_INDEX_REPORT: bool = False
+    
+    # Components built in the background after startup (empty list: build on first use)
+    PREWARM_COMPONENTS: List[str] = ["medical_agent", "analysis_system"]
+    
+    # Bulk import and export
+    BULK_IMPORT_BATCH_SIZE: int = 1000
+    BULK_IMPORT_MAX_REPORTED_ERRORS: int = 1000
+    EXPORT_CURSOR_BATCH_SIZE: int = 500
+    EXPORT_CHUNK_BYTES: int = 256 * 1024
+    
     class Config:
         env_file = ".env"
 
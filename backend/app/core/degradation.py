@@ -0,0 +1,25 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+
+_degradations: ContextVar[Optional[List[str]]] = ContextVar("degradations", default=None)
+
+def report_degraded(reason: str):
+    """
+    Flag the result being computed as incomplete (a lookup failed, a response
+    could not be parsed) even though one is still returned. The flag goes to
+    the innermost collect_degradations() block; outside one it is dropped.
+    """
+    reasons = _degradations.get()
+    if reasons is not None:
+        reasons.append(reason)
+
+@contextmanager
+def collect_degradations() -> Iterator[List[str]]:
+    """Collect the report_degraded() reasons of the code run inside the block"""
+    reasons: List[str] = []
+    token = _degradations.set(reasons)
+    try:
+        yield reasons
+    finally:
+        _degradations.reset(token)
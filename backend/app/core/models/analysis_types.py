@@ -18,4 +18,57 @@ class AnalysisResult(TypedDict):
     recommendations: List[str]
     key_findings: List[str]
     risk_factors: List[str]
-    raw_response: Optional[str] 
\ No newline at end of file
+    raw_response: Optional[str]
+
+class EvidenceSummary(TypedDict):
+    literature: List[str]
+    clinical_trials: List[str]
+    drug_information: List[str]
+
+# Response schemas for structured (JSON mode) Gemini output. These mirror the
+# types above without the free-form fields a response schema cannot express.
+
+class SafetyValidation(TypedDict):
+    safety_checks: List[SafetyCheck]
+
+class StructuredAnalysis(TypedDict):
+    diagnoses: List[DiagnosisResult]
+    safety_checks: List[SafetyCheck]
+    evidence: EvidenceSummary
+    treatment_plan: List[str]
+    recommendations: List[str]
+    key_findings: List[str]
+    risk_factors: List[str]
+
+class DifferentialDiagnosis(TypedDict):
+    name: str
+    likelihood: str
+    reasoning: List[str]
+
+class VitalSignReading(TypedDict):
+    name: str
+    value: str
+    unit: str
+
+class MedicationEntry(TypedDict):
+    name: str
+    dosage: str
+    unit: str
+    frequency: str
+    route: str
+    duration: str
+
+class LabResultEntry(TypedDict):
+    name: str
+    value: str
+    unit: str
+    reference_range: str
+    interpretation: str
+
+# StructuredAnalysis plus the case details the initial MedicalAgent analysis extracts
+class InitialAnalysis(StructuredAnalysis):
+    differential_diagnoses: List[DifferentialDiagnosis]
+    recommended_actions: List[str]
+    vital_signs: List[VitalSignReading]
+    medications: List[MedicationEntry]
+    lab_results: List[LabResultEntry]
@@ -0,0 +1,60 @@
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, List
+from app.utils.tokens import count_tokens, truncate_to_tokens
+
+@dataclass
+class PromptSection:
+    """
+    One variable of a prompt template.
+
+    When the prompt is over budget, sections are shrunk lowest `priority`
+    first, never below `min_tokens`. List content loses trailing items before
+    any item is cut mid-text.
+    """
+    name: str
+    content: Any
+    priority: int = 0
+    min_tokens: int = 0
+
+def render(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    return json.dumps(content, separators=(",", ":"), ensure_ascii=False, default=str)
+
+def _shrink(content: Any, max_tokens: int) -> str:
+    if isinstance(content, list) and content:
+        kept: List[Any] = []
+        for item in content:
+            if count_tokens(render(kept + [item])) > max_tokens:
+                break
+            kept.append(item)
+        omitted = len(content) - len(kept)
+        if kept:
+            return render(kept) + (f" (+{omitted} more omitted)" if omitted else "")
+    return truncate_to_tokens(render(content), max_tokens)
+
+def build_prompt(template: Any, sections: List[PromptSection], budget: int, stage: str = "") -> str:
+    """
+    Format `template` (a str or PromptTemplate) with `sections`, shrinking
+    them by priority so the whole prompt stays within `budget` tokens.
+    """
+    texts: Dict[str, str] = {section.name: render(section.content) for section in sections}
+    fixed = count_tokens(template.format(**{name: "" for name in texts}))
+    sizes = {name: count_tokens(text) for name, text in texts.items()}
+    over = fixed + sum(sizes.values()) - budget
+
+    for section in sorted(sections, key=lambda s: s.priority):
+        if over <= 0:
+            break
+        target = max(section.min_tokens, sizes[section.name] - over)
+        if target >= sizes[section.name]:
+            continue
+        texts[section.name] = _shrink(section.content, target)
+        shrunk = count_tokens(texts[section.name])
+        over -= sizes[section.name] - shrunk
+        sizes[section.name] = shrunk
+
+    if over > 0:
+        print(f"Prompt for {stage or 'LLM call'} exceeds its {budget}-token budget by {over} tokens")
+    return template.format(**texts)
@@ -0,0 +1,87 @@
+import asyncio
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional
+
+class ComponentRegistry:
+    """
+    Lazily built, process-wide shared components (agents, LLM clients).
+
+    Nothing is constructed at import time: each component is built once, on
+    first use or by a background prewarm started after the server is up.
+    Builds run in a worker thread so they never block the event loop, and
+    concurrent requests for the same component wait for the single build.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._prewarm_task: Optional[asyncio.Task] = None
+
+    def register(self, name: str, factory: Callable[[], Any]):
+        self._factories[name] = factory
+        self._locks[name] = threading.Lock()
+
+    def get(self, name: str) -> Any:
+        """Return the component, building it in the calling thread if needed"""
+        if name in self._instances:
+            return self._instances[name]
+        with self._locks[name]:
+            if name not in self._instances:
+                self._instances[name] = self._factories[name]()
+        return self._instances[name]
+
+    async def aget(self, name: str) -> Any:
+        """Return the component, building it in a worker thread if needed"""
+        if name in self._instances:
+            return self._instances[name]
+        return await asyncio.to_thread(self.get, name)
+
+    def is_ready(self, name: str) -> bool:
+        return name in self._instances
+
+    def start_prewarm(self, names: Optional[Iterable[str]] = None):
+        """Build components in the background without delaying startup"""
+        self._prewarm_task = asyncio.create_task(self._prewarm(list(names or self._factories)))
+
+    async def stop_prewarm(self):
+        if self._prewarm_task is not None:
+            self._prewarm_task.cancel()
+            await asyncio.gather(self._prewarm_task, return_exceptions=True)
+            self._prewarm_task = None
+
+    async def _prewarm(self, names: Iterable[str]):
+        for name in names:
+            try:
+                await self.aget(name)
+            except Exception as e:
+                print(f"Prewarming {name} failed: {str(e)}")
+
+    def status(self) -> Dict[str, bool]:
+        return {name: name in self._instances for name in self._factories}
+
+# Factories import their modules on demand so autogen, langchain and the
+# Gemini SDK are only loaded when a component is first built.
+
+def _build_medical_agent():
+    from app.core.agents.medical_agent import MedicalAgent
+    return MedicalAgent()
+
+def _build_analysis_system():
+    from app.core.agents.autogen_medical_system import AutoGenMedicalSystem
+    return AutoGenMedicalSystem(medical_agent=components.get("medical_agent"))
+
+def _build_gemini_service():
+    from app.services.ml.gemini_services import GeminiService
+    return GeminiService()
+
+components = ComponentRegistry()
+components.register("medical_agent", _build_medical_agent)
+components.register("analysis_system", _build_analysis_system)
+components.register("gemini_service", _build_gemini_service)
+
+async def get_analysis_system():
+    return await components.aget("analysis_system")
+
+async def get_gemini_service():
+    return await components.aget("gemini_service")
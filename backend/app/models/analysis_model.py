@@ -3,6 +3,7 @@ from typing import List, Optional
 from datetime import datetime
 from pydantic import BaseModel
 from enum import Enum
+from pymongo import ASCENDING, DESCENDING, IndexModel
 # from backend.app.utils.analysis_enums import SeverityLevel, FindingCategory, PriorityLevel, ActionType, ActionPriority, ActionStatus, VitalStatus, TrendDirection
 
 class SeverityLevel(str, Enum):
@@ -50,6 +51,10 @@ class TrendDirection(str, Enum):
     INCREASING = "increasing"
     DECREASING = "decreasing"
     STABLE = "stable"
+
+# Per-analysis documents are always fetched by the case they belong to
+CASE_ID_INDEX = IndexModel([("case_id", ASCENDING)], name="case_id")
+
 class DiagnosisAnalysis(Document):
     name: str
     confidence: float
@@ -63,6 +68,7 @@ class DiagnosisAnalysis(Document):
     
     class Settings:
         name = "diagnosis_analyses"
+        indexes = [CASE_ID_INDEX]
         
     class Config:
         json_encoders = {
@@ -79,6 +85,7 @@ class KeyFinding(Document):
     
     class Settings:
         name = "key_findings"
+        indexes = [CASE_ID_INDEX]
         
     class Config:
         json_encoders = {
@@ -100,6 +107,7 @@ class SafetyCheck(Document):
     
     class Settings:
         name = "safety_checks"
+        indexes = [CASE_ID_INDEX]
         
     class Config:
         json_encoders = {
@@ -117,6 +125,7 @@ class RiskFactor(Document):
     
     class Settings:
         name = "risk_factors"
+        indexes = [CASE_ID_INDEX]
         
     class Config:
         use_enum_values = True
@@ -137,6 +146,7 @@ class RecommendedAction(Document):
 
     class Settings:
         name = "recommended_actions"
+        indexes = [CASE_ID_INDEX]
 
 class DifferentialDiagnosis(Document):
     """Differential diagnosis evaluation"""
@@ -149,6 +159,7 @@ class DifferentialDiagnosis(Document):
 
     class Settings:
         name = "differential_diagnoses"
+        indexes = [CASE_ID_INDEX]
 
 class VitalTrend(BaseModel):
     """Vital sign measurement at a point in time"""
@@ -167,6 +178,7 @@ class VitalSign(Document):
 
     class Settings:
         name = "vital_signs"
+        indexes = [CASE_ID_INDEX]
 
 class Medication(Document):
     """Medication analysis"""
@@ -180,6 +192,7 @@ class Medication(Document):
 
     class Settings:
         name = "medications"
+        indexes = [CASE_ID_INDEX]
 
 class LabResult(Document):
     """Laboratory test results"""
@@ -194,6 +207,7 @@ class LabResult(Document):
 
     class Settings:
         name = "lab_results"
+        indexes = [CASE_ID_INDEX]
         
     class Config:
         json_encoders = {
@@ -225,6 +239,9 @@ class ClinicalAnalysis(Document):
 
     class Settings:
         name = "clinical_analyses"
+        indexes = [
+            IndexModel([("case_id", ASCENDING), ("created_at", DESCENDING)], name="case_id_created_at")
+        ]
         
     class Config:
         json_encoders = {
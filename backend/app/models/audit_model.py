@@ -1,4 +1,5 @@
 # backend/app/models/audit.py
+from pymongo import ASCENDING, DESCENDING, IndexModel
 from backend.app.models.base_model import BaseDocument
 
 class AuditLog(BaseDocument):
@@ -9,4 +10,8 @@ class AuditLog(BaseDocument):
     changes: dict
     
     class Settings:
-        name = "audit_logs"
\ No newline at end of file
+        name = "audit_logs"
+        indexes = [
+            IndexModel([("collection", ASCENDING), ("document_id", ASCENDING)], name="collection_document_id"),
+            IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)], name="user_id_created_at")
+        ]
\ No newline at end of file
@@ -2,6 +2,7 @@ from beanie import Document, Indexed
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from pydantic import BaseModel, Field, ConfigDict
+from pymongo import ASCENDING, DESCENDING, IndexModel
 
 from backend.app.models.analysis_model import ClinicalAnalysis
 
@@ -98,6 +99,7 @@ class ClinicalCase(Document):
     
     analysis_progress: float = Field(default=0.0)
     analysis_time_remaining: str = Field(default="pending")
+    analysis_job_id: Optional[str] = None
     diagnoses: List[Dict[str, Any]] = Field(default_factory=list)
     differential_diagnoses: List[Dict[str, Any]] = Field(default_factory=list)
     key_findings: List[str] = Field(default_factory=list)
@@ -107,4 +109,12 @@ class ClinicalCase(Document):
     recommendations: List[str] = Field(default_factory=list)
     
     class Settings:
-        name = "clinical_cases"
\ No newline at end of file
+        name = "clinical_cases"
+        indexes = [
+            # Case listings (keyset pagination): per patient and overall, newest first
+            IndexModel(
+                [("patient_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+                name="patient_id_created_at_id"
+            ),
+            IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_at_id")
+        ]
\ No newline at end of file
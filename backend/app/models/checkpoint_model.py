@@ -0,0 +1,21 @@
+from beanie import Document
+from typing import Any
+from datetime import datetime
+from pydantic import Field
+from pymongo import ASCENDING, IndexModel
+
+class AnalysisCheckpoint(Document):
+    """Output of one reusable analysis stage for a case, with the hash of the inputs that produced it"""
+    case_id: str
+    stage: str
+    input_hash: str
+    output: Any = None
+
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+    class Settings:
+        name = "analysis_checkpoints"
+        indexes = [
+            # One current checkpoint per stage of a case
+            IndexModel([("case_id", ASCENDING), ("stage", ASCENDING)], name="case_id_stage", unique=True)
+        ]
@@ -0,0 +1,39 @@
+from beanie import Document
+from typing import Optional
+from datetime import datetime
+from enum import Enum
+from pydantic import Field
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class AnalysisJob(Document):
+    """Persistent state of a background case analysis"""
+    case_id: str
+    status: JobStatus = JobStatus.QUEUED
+    attempts: int = 0
+    max_attempts: int = 3
+    current_stage: Optional[str] = None
+    progress: float = 0.0
+    time_remaining: str = "pending"
+    error: Optional[str] = None
+
+    created_at: datetime = Field(default_factory=datetime.now)
+    updated_at: datetime = Field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Settings:
+        name = "analysis_jobs"
+        indexes = [
+            # Latest job for a case
+            IndexModel([("case_id", ASCENDING), ("created_at", DESCENDING)], name="case_id_created_at"),
+            # Queue recovery: queued jobs in order, stale running jobs
+            IndexModel([("status", ASCENDING), ("created_at", ASCENDING)], name="status_created_at"),
+            IndexModel([("status", ASCENDING), ("updated_at", ASCENDING)], name="status_updated_at")
+        ]
+        use_enum_values = True
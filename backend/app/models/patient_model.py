@@ -1,7 +1,9 @@
 from typing import List, Optional
 from datetime import datetime
-from beanie import Document, Indexed
-from pydantic import BaseModel, EmailStr 
+from beanie import Document, Indexed, Insert, Replace, Save, SaveChanges, before_event
+from pydantic import BaseModel, EmailStr, Field
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from backend.app.utils.search import edge_ngrams, search_terms
 
 class PatientBase(BaseModel):
     first_name: str
@@ -20,11 +22,25 @@ class PatientBase(BaseModel):
     insurance_id: Optional[str] = None
 
 class Patient(Document, PatientBase):
-    created_at: datetime = datetime.now()
-    updated_at: datetime = datetime.now()
+    created_at: datetime = Field(default_factory=datetime.now)
+    updated_at: datetime = Field(default_factory=datetime.now)
+    # Derived from name and email on every write; not part of the API schemas
+    search_terms: List[str] = Field(default_factory=list)
+    search_keys: List[str] = Field(default_factory=list)
+    
+    @before_event(Insert, Replace, Save, SaveChanges)
+    def refresh_search_fields(self):
+        self.search_terms = search_terms(self.first_name, self.last_name, self.email)
+        self.search_keys = edge_ngrams(self.search_terms)
     
     class Settings:
         name = "patients"
+        indexes = [
+            IndexModel([("last_name", ASCENDING), ("first_name", ASCENDING)], name="last_name_first_name"),
+            IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_at_id"),
+            # Multikey index over name/email prefixes for search-as-you-type
+            IndexModel([("search_keys", ASCENDING)], name="search_keys")
+        ]
         
     class Config:
         schema_extra = {
@@ -2,6 +2,7 @@ from beanie import Document, Indexed
 from pydantic import EmailStr
 from typing import Optional
 from datetime import datetime
+from pymongo import ASCENDING, IndexModel
 
 class User(Document):
     email: Indexed(EmailStr, unique=True)
@@ -23,4 +24,19 @@ class User(Document):
     updated_at: datetime = datetime.now()
 
     class Settings:
-        name = "users" 
\ No newline at end of file
+        name = "users"
+        indexes = [
+            # Email verification and password reset look users up by token. The
+            # fields are stored as null once used, so only users with a pending
+            # token are indexed (sparse would still index every null).
+            IndexModel(
+                [("verification_code", ASCENDING)],
+                name="verification_code_pending",
+                partialFilterExpression={"verification_code": {"$type": "string"}}
+            ),
+            IndexModel(
+                [("reset_password_token", ASCENDING)],
+                name="reset_password_token_pending",
+                partialFilterExpression={"reset_password_token": {"$type": "string"}}
+            )
+        ] 
\ No newline at end of file
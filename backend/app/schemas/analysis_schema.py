@@ -184,6 +184,23 @@ class ClinicalAnalysisResponseSchema(BaseModel):
     recommendations: List[str] = Field(default_factory=list)
     
     # model_config = ConfigDict(from_attributes=True)
+    
+    class Settings:
+        # Used by Beanie's .project() to read the analysis straight off a ClinicalCase
+        projection = {
+            "progress": "$analysis_progress",
+            "time_remaining": "$analysis_time_remaining",
+            "diagnoses": 1,
+            "key_findings": 1,
+            "safety_checks": 1,
+            "risk_factors": 1,
+            "recommended_actions": 1,
+            "differential_diagnoses": 1,
+            "vital_signs": {"$ifNull": ["$vital_signs.measurements", []]},
+            "medications": "$current_medications",
+            "lab_results": 1,
+            "recommendations": 1
+        }
 
 # Optional: Create specific request schemas if needed
 class ClinicalAnalysisRequestSchema(BaseModel):
@@ -0,0 +1,30 @@
+from enum import Enum
+from pydantic import BaseModel, Field
+from typing import List
+
+class ImportFormat(str, Enum):
+    NDJSON = "ndjson"
+    FHIR = "fhir"
+
+class ConflictPolicy(str, Enum):
+    SKIP = "skip"
+    UPDATE = "update"
+
+class BulkRecordError(BaseModel):
+    """
+    A record that was not imported; `record` is its 1-based line (NDJSON) or
+    entry (FHIR) number, or 0 for a problem with the upload as a whole
+    """
+    record: int
+    error: str
+
+class BulkImportReport(BaseModel):
+    """Outcome of a bulk import"""
+    received: int = 0
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
+    failed: int = 0
+    enqueued: int = 0
+    errors: List[BulkRecordError] = Field(default_factory=list)
+    errors_truncated: bool = False
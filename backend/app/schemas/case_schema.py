@@ -2,6 +2,7 @@ from pydantic import BaseModel, Field, ConfigDict
 from typing import List, Optional, Dict, Any, Union
 from datetime import datetime
 from bson import ObjectId
+from beanie import PydanticObjectId
 
 class LabResult(BaseModel):
     name: str
@@ -90,6 +91,7 @@ class ClinicalCaseResponse(ClinicalCaseInDB):
     analysis: Optional[List[Dict[str, Any]]] = Field(default_factory=list)
     analysis_progress: float = Field(default=0.0)
     analysis_time_remaining: str = Field(default="pending")
+    analysis_job_id: Optional[str] = None
     diagnoses: List[Dict[str, Any]] = Field(default_factory=list)
     differential_diagnoses: List[Dict[str, Any]] = Field(default_factory=list)
     key_findings: List[str] = Field(default_factory=list)
@@ -103,4 +105,32 @@ class ClinicalCaseResponse(ClinicalCaseInDB):
             ObjectId: str
         }
     
-# model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+# model_config = ConfigDict(from_attributes=True)
+
+class ClinicalCaseSummary(BaseModel):
+    """Listing projection of a clinical case: identity, top diagnosis and progress only"""
+    id: PydanticObjectId = Field(alias="_id")
+    patient_id: Optional[str] = None
+    chief_complaint: str
+    top_diagnosis: Optional[Dict[str, Any]] = None
+    analysis_progress: float = 0.0
+    analysis_time_remaining: str = "pending"
+    analysis_job_id: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    class Settings:
+        # Used by Beanie's .project(); computed server-side so the diagnoses array never leaves MongoDB
+        projection = {
+            "_id": 1,
+            "patient_id": 1,
+            "chief_complaint": 1,
+            "top_diagnosis": {"$arrayElemAt": ["$diagnoses", 0]},
+            "analysis_progress": 1,
+            "analysis_time_remaining": 1,
+            "analysis_job_id": 1,
+            "created_at": 1,
+            "updated_at": 1
+        }
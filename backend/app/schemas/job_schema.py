@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+class AnalysisJobStatusResponse(BaseModel):
+    """Status of the background analysis job for a clinical case"""
+    job_id: str
+    case_id: str
+    status: str
+    attempts: int
+    max_attempts: int
+    current_stage: Optional[str] = None
+    progress: float
+    time_remaining: str
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+from typing import Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+class Page(BaseModel, Generic[T]):
+    """A page of results; pass `next_cursor` back as `cursor` to get the next page"""
+    items: List[T]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,260 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+from beanie import PydanticObjectId, UpdateResponse
+from app.core.config import get_settings
+from app.core.registry import get_analysis_system
+from backend.app.models.case_model import ClinicalCase
+from backend.app.models.job_model import AnalysisJob, JobStatus
+from app.services.progress_broker import progress_broker
+from app.services.db.analysis_service import AnalysisService, ANALYSIS_RESULT_FIELDS
+from app.services.db.checkpoint_service import CheckpointStageCache
+
+# Case fields the analysis pipeline reads; analysis outputs are never fed back in
+ANALYSIS_INPUT_FIELDS = {
+    "patient_id",
+    "chief_complaint",
+    "symptoms",
+    "symptoms_description",
+    "vital_signs",
+    "current_medications",
+    "allergies",
+    "physical_examination",
+    "lab_results",
+    "family_history",
+    "social_history"
+}
+
+# Stages whose outputs are streamed to watchers as partial results, in pipeline order:
+# diagnoses first, then evidence and treatment, then safety
+PARTIAL_RESULT_STAGES = {
+    "initial_analysis": ("diagnoses", "differential_diagnoses", "key_findings", "risk_factors"),
+    "evidence": None,
+    "additional_evidence": None,
+    "treatment_plan": None,
+    "recommendations": None,
+    "orchestrator_safety": None,
+    "safety_validation": None
+}
+
+def partial_result(stage: str, output: Any) -> Optional[Dict[str, Any]]:
+    if stage not in PARTIAL_RESULT_STAGES:
+        return None
+    fields = PARTIAL_RESULT_STAGES[stage]
+    if fields is None:
+        return {stage: output}
+    return {field: output.get(field, []) for field in fields}
+
+def case_to_analysis_input(case: ClinicalCase) -> Dict[str, Any]:
+    case_data = case.model_dump(mode="json", include=ANALYSIS_INPUT_FIELDS)
+    case_data["case_id"] = str(case.id)
+    return case_data
+
+class AnalysisJobQueue:
+    """
+    Runs case analyses in a bounded pool of background workers.
+
+    Job state lives in the `analysis_jobs` collection, so queued work and
+    jobs interrupted by a restart are picked up again on startup. Failed
+    attempts are retried with exponential backoff up to `max_attempts`.
+    """
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._retry_tasks: Set[asyncio.Task] = set()
+        self._active_jobs: Set[PydanticObjectId] = set()
+
+    async def start(self):
+        settings = get_settings()
+        self._queue = asyncio.Queue()
+        await self._recover_jobs()
+        self._workers = [
+            asyncio.create_task(self._worker())
+            for _ in range(settings.ANALYSIS_WORKER_CONCURRENCY)
+        ]
+
+    async def stop(self):
+        tasks = [*self._workers, *self._retry_tasks]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        # Hand interrupted jobs back to the queue for the next start
+        if self._active_jobs:
+            await AnalysisJob.find({"_id": {"$in": list(self._active_jobs)}}).update(
+                {"$set": {"status": JobStatus.QUEUED, "updated_at": datetime.now()}}
+            )
+            self._active_jobs.clear()
+
+    async def enqueue(self, case: ClinicalCase, job_id: Optional[PydanticObjectId] = None) -> AnalysisJob:
+        """Persist a new analysis job for `case` and hand it to the workers"""
+        job = AnalysisJob(
+            id=job_id,
+            case_id=str(case.id),
+            max_attempts=get_settings().ANALYSIS_JOB_MAX_ATTEMPTS
+        )
+        await job.insert()
+        self._queue.put_nowait(job.id)
+        return job
+
+    async def enqueue_many(self, jobs: List[Tuple[str, PydanticObjectId]]) -> int:
+        """
+        Persist analysis jobs for many cases at once, given (case_id, job_id)
+        pairs. Outside the API process (e.g. the CLI) the queue is not running,
+        so the jobs are only persisted and are picked up by the API's workers
+        when they next start.
+        """
+        if not jobs:
+            return 0
+        max_attempts = get_settings().ANALYSIS_JOB_MAX_ATTEMPTS
+        await AnalysisJob.insert_many([
+            AnalysisJob(id=job_id, case_id=case_id, max_attempts=max_attempts)
+            for case_id, job_id in jobs
+        ])
+        if self._queue is not None:
+            for _, job_id in jobs:
+                self._queue.put_nowait(job_id)
+        return len(jobs)
+
+    async def _recover_jobs(self):
+        settings = get_settings()
+        stale_before = datetime.now() - timedelta(seconds=settings.ANALYSIS_JOB_STALE_SECONDS)
+        await AnalysisJob.find(
+            {"status": JobStatus.RUNNING, "updated_at": {"$lt": stale_before}}
+        ).update({"$set": {"status": JobStatus.QUEUED}})
+        for job in await AnalysisJob.find({"status": JobStatus.QUEUED}).sort("created_at").to_list():
+            self._queue.put_nowait(job.id)
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._process(job_id)
+            except Exception as e:
+                print(f"Analysis worker error for job {job_id}: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    async def _claim(self, job_id: PydanticObjectId) -> Optional[AnalysisJob]:
+        # Atomic queued -> running transition so each job runs on one worker only
+        now = datetime.now()
+        return await AnalysisJob.find_one({"_id": job_id, "status": JobStatus.QUEUED}).update(
+            {
+                "$set": {"status": JobStatus.RUNNING, "started_at": now, "updated_at": now},
+                "$inc": {"attempts": 1}
+            },
+            response_type=UpdateResponse.NEW_DOCUMENT
+        )
+
+    async def _process(self, job_id: PydanticObjectId):
+        job = await self._claim(job_id)
+        if job is None:
+            return
+
+        case = await ClinicalCase.get(job.case_id)
+        if case is None:
+            await self._finish(job, JobStatus.FAILED, error="Clinical case not found")
+            return
+
+        self._active_jobs.add(job.id)
+        started = time.monotonic()
+        progress_broker.publish(job.case_id, "analysis_started", job_id=str(job.id), attempt=job.attempts)
+
+        async def on_stage_complete(stage: str, output: Any, completed: int, total: int):
+            elapsed = time.monotonic() - started
+            remaining = f"{int(elapsed / completed * (total - completed))}s"
+            progress = round(completed / total * 100, 1)
+            progress_broker.publish(
+                job.case_id,
+                "stage_completed",
+                stage=stage,
+                progress=progress,
+                time_remaining=remaining,
+                data=partial_result(stage, output)
+            )
+            await self._update_progress(job, case, stage, progress, remaining)
+
+        try:
+            # Stage outputs are checkpointed as they complete; stages whose inputs are
+            # unchanged since the last checkpoint (earlier attempt or analysis) are reused
+            stage_cache = await CheckpointStageCache.for_case(job.case_id, job.id)
+            system = await get_analysis_system()
+            result = await system.analyze_case(
+                case_to_analysis_input(case),
+                on_stage_complete=on_stage_complete,
+                stage_cache=stage_cache
+            )
+            saved = await AnalysisService.save_result(case, result, job_id=job.id)
+            await self._finish(job, JobStatus.COMPLETED)
+            progress_broker.publish(
+                job.case_id,
+                "analysis_completed",
+                job_id=str(job.id),
+                progress=100.0,
+                data=saved.model_dump(mode="json", include=set(ANALYSIS_RESULT_FIELDS)) if saved else None
+            )
+        except Exception as e:
+            await self._handle_failure(job, case, e)
+        finally:
+            self._active_jobs.discard(job.id)
+
+    async def _update_progress(self, job: AnalysisJob, case: ClinicalCase, stage: str, progress: float, remaining: str):
+        await asyncio.gather(
+            ClinicalCase.find_one({"_id": case.id}).update({"$set": {
+                "analysis_progress": progress,
+                "analysis_time_remaining": remaining
+            }}),
+            AnalysisJob.find_one({"_id": job.id}).update({"$set": {
+                "current_stage": stage,
+                "progress": progress,
+                "time_remaining": remaining,
+                "updated_at": datetime.now()
+            }})
+        )
+
+    async def _finish(self, job: AnalysisJob, status: JobStatus, error: Optional[str] = None):
+        now = datetime.now()
+        update = {"status": status, "error": error, "finished_at": now, "updated_at": now}
+        if status == JobStatus.COMPLETED:
+            update.update({"progress": 100.0, "time_remaining": "0"})
+        await AnalysisJob.find_one({"_id": job.id}).update({"$set": update})
+
+    async def _handle_failure(self, job: AnalysisJob, case: ClinicalCase, error: Exception):
+        print(f"Analysis job {job.id} attempt {job.attempts} failed: {str(error)}")
+        if job.attempts < job.max_attempts:
+            await AnalysisJob.find_one({"_id": job.id}).update({"$set": {
+                "status": JobStatus.QUEUED,
+                "error": str(error),
+                "updated_at": datetime.now()
+            }})
+            delay = get_settings().ANALYSIS_JOB_RETRY_BACKOFF_SECONDS * 2 ** (job.attempts - 1)
+            task = asyncio.create_task(self._requeue_after(job.id, delay))
+            self._retry_tasks.add(task)
+            task.add_done_callback(self._retry_tasks.discard)
+            progress_broker.publish(job.case_id, "retry_scheduled", error=str(error), retry_in_seconds=delay)
+            return
+
+        await self._finish(job, JobStatus.FAILED, error=str(error))
+        await ClinicalCase.find_one({"_id": case.id}).update({"$set": {
+            "analysis_time_remaining": "failed"
+        }})
+        progress_broker.publish(job.case_id, "analysis_failed", job_id=str(job.id), error=str(error))
+
+    async def _requeue_after(self, job_id: PydanticObjectId, delay: float):
+        await asyncio.sleep(delay)
+        self._queue.put_nowait(job_id)
+
+    async def get_job_for_case(self, case_id: str) -> Optional[AnalysisJob]:
+        """Most recent analysis job for a case"""
+        jobs = await AnalysisJob.find({"case_id": case_id}).sort("-created_at").limit(1).to_list()
+        return jobs[0] if jobs else None
+
+analysis_queue = AnalysisJobQueue()
+
+async def start_analysis_queue():
+    await analysis_queue.start()
+
+async def stop_analysis_queue():
+    await analysis_queue.stop()
@@ -1,15 +1,15 @@
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from backend.app.models.user_model import User
 from app.core.config import get_settings
+from app.services.password_hasher import password_hasher
+from app.services.principal_cache import principal_cache
 from app.utils.email import send_verification_email, send_reset_password_email
 import secrets
 import pyotp
 
 settings = get_settings()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 class AuthService:
     def __init__(self):
@@ -17,18 +17,38 @@ class AuthService:
         self.algorithm = settings.ALGORITHM
         self.access_token_expire_minutes = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 
-    def verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        return pwd_context.verify(plain_password, hashed_password)
+    async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        return await password_hasher.verify(plain_password, hashed_password)
 
-    def get_password_hash(self, password: str) -> str:
-        return pwd_context.hash(password)
+    async def get_password_hash(self, password: str) -> str:
+        return await password_hasher.hash(password)
 
     async def authenticate_user(self, email: str, password: str) -> Optional[User]:
         user = await User.find_one({"email": email})
-        if not user or not self.verify_password(password, user.hashed_password):
+        if not user:
+            return None
+        if not settings.PASSWORD_REHASH_ON_LOGIN:
+            return user if await self.verify_password(password, user.hashed_password) else None
+
+        valid, new_hash = await password_hasher.verify_and_update(password, user.hashed_password)
+        if not valid:
             return None
+        if new_hash:
+            await self._rehash(user, new_hash)
         return user
 
+    async def _rehash(self, user: User, new_hash: str):
+        """Store a hash at the current BCRYPT_ROUNDS, unless the password changed meanwhile"""
+        try:
+            await User.get_motor_collection().update_one(
+                {"_id": user.id, "hashed_password": user.hashed_password},
+                {"$set": {"hashed_password": new_hash}}
+            )
+            user.hashed_password = new_hash
+        except Exception as e:
+            # The old hash still verifies, so the next login retries
+            print(f"Error rehashing password for user {user.id}: {str(e)}")
+
     def create_access_token(self, data: dict) -> str:
         to_encode = data.copy()
         expire = datetime.utcnow() + timedelta(minutes=self.access_token_expire_minutes)
@@ -42,7 +62,7 @@ class AuthService:
             raise ValueError("Email already registered")
 
         # Hash the password
-        user_data["hashed_password"] = self.get_password_hash(user_data.pop("password"))
+        user_data["hashed_password"] = await self.get_password_hash(user_data.pop("password"))
         
         # Generate verification code
         verification_code = secrets.token_urlsafe(32)
@@ -72,6 +92,7 @@ class AuthService:
         user.verification_code = None
         user.verification_code_expires = None
         await user.save()
+        principal_cache.invalidate(user.id)
         return True
 
     async def initiate_password_reset(self, email: str) -> bool:
@@ -96,10 +117,21 @@ class AuthService:
         if not user:
             return False
             
-        user.hashed_password = self.get_password_hash(new_password)
+        user.hashed_password = await self.get_password_hash(new_password)
         user.reset_password_token = None
         user.reset_token_expires = None
         await user.save()
+        principal_cache.invalidate(user.id)
+        return True
+
+    async def deactivate_user(self, user_id: str) -> bool:
+        user = await User.get(user_id)
+        if not user:
+            raise ValueError("User not found")
+
+        user.is_active = False
+        await user.save()
+        principal_cache.invalidate(user.id)
         return True
 
     def generate_2fa_secret(self) -> str:
@@ -118,6 +150,7 @@ class AuthService:
         user.two_factor_secret = secret
         user.two_factor_enabled = True
         await user.save()
+        principal_cache.invalidate(user.id)
         return secret
 
     async def disable_2fa(self, user_id: str) -> bool:
@@ -128,4 +161,5 @@ class AuthService:
         user.two_factor_secret = None
         user.two_factor_enabled = False
         await user.save()
+        principal_cache.invalidate(user.id)
         return True
\ No newline at end of file
@@ -0,0 +1,76 @@
+import re
+import zlib
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Optional
+import orjson
+from bson import ObjectId
+from pymongo import ASCENDING
+from backend.app.models.case_model import ClinicalCase
+from app.core.config import get_settings
+
+# Oldest first, so an export taken while cases are being created ends with the newest ones
+EXPORT_SORT = [("created_at", ASCENDING), ("_id", ASCENDING)]
+
+def case_export_query(
+    patient_id: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    diagnosis: Optional[str] = None
+) -> Dict[str, Any]:
+    """MongoDB filter for the cases to export; `diagnosis` matches a diagnosis name, ignoring case"""
+    query: Dict[str, Any] = {}
+    if patient_id:
+        query["patient_id"] = patient_id
+    if created_from or created_to:
+        query["created_at"] = {}
+        if created_from:
+            query["created_at"]["$gte"] = created_from
+        if created_to:
+            query["created_at"]["$lt"] = created_to
+    if diagnosis:
+        query["diagnoses.name"] = {"$regex": f"^{re.escape(diagnosis)}$", "$options": "i"}
+    return query
+
+def _encode_default(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+async def export_cases(
+    query: Dict[str, Any],
+    include_analysis: bool = True,
+    compress: bool = False
+) -> AsyncIterator[bytes]:
+    """
+    Stream matching cases as NDJSON, one raw document per line.
+
+    Documents are read through a batched cursor and encoded with orjson
+    straight from BSON, without building models; output is yielded in
+    chunks of about EXPORT_CHUNK_BYTES (gzip-compressed if `compress`),
+    so memory use does not depend on the size of the export.
+    """
+    settings = get_settings()
+    projection = None if include_analysis else {"analysis": 0}
+    cursor = ClinicalCase.get_motor_collection().find(
+        query, projection, batch_size=settings.EXPORT_CURSOR_BATCH_SIZE
+    ).sort(EXPORT_SORT)
+    # wbits=31 writes a gzip header and trailer
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    buffer = bytearray()
+
+    def flush() -> bytes:
+        data = bytes(buffer)
+        buffer.clear()
+        return compressor.compress(data) if compressor else data
+
+    async for document in cursor:
+        buffer += orjson.dumps(document, default=_encode_default, option=orjson.OPT_APPEND_NEWLINE)
+        if len(buffer) >= settings.EXPORT_CHUNK_BYTES:
+            chunk = flush()
+            if chunk:
+                yield chunk
+    tail = flush()
+    if compressor:
+        tail += compressor.flush()
+    if tail:
+        yield tail
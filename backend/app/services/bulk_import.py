@@ -0,0 +1,246 @@
+import codecs
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+import orjson
+from beanie import PydanticObjectId
+from pydantic import ValidationError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from backend.app.models.case_model import ClinicalCase
+from backend.app.models.patient_model import Patient
+from backend.app.schemas.bulk_schema import BulkImportReport, BulkRecordError, ConflictPolicy, ImportFormat
+from backend.app.schemas.case_schema import ClinicalCaseCreate
+from backend.app.schemas.patient_schema import PatientCreate
+from app.core.config import get_settings
+from app.services.analysis_queue import analysis_queue
+from app.services.db.case_service import build_case_data
+from app.utils.json_stream import JSONArrayStreamParser
+from app.utils.search import edge_ngrams, search_terms
+
+DUPLICATE_KEY_ERROR = 11000
+
+# (record number, raw record or the exception raised while parsing it)
+Record = Tuple[int, Any]
+Batch = List[Tuple[int, Dict[str, Any]]]
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    """One record per non-blank line; only the current partial line is held in memory"""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    line_number = 0
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield line_number, _parse_line(line)
+    buffer += decoder.decode(b"", final=True)
+    if buffer.strip():
+        yield line_number + 1, _parse_line(buffer)
+
+def _parse_line(line: str) -> Any:
+    try:
+        return orjson.loads(line)
+    except orjson.JSONDecodeError as e:
+        return ValueError(f"Invalid JSON: {str(e)}")
+
+async def iter_fhir_bundle(chunks: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    """
+    The `resource` of each Bundle entry, decoded as soon as the entry is complete.
+
+    A body that is not a Bundle, has no `entry` array or is cut off yields
+    a failed record numbered 0, so it is never reported as an empty import.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    parser = JSONArrayStreamParser("entry", retain_text=False)
+    entry_number = 0
+    async for chunk in chunks:
+        for entry in parser.feed(decoder.decode(chunk)):
+            entry_number += 1
+            yield entry_number, entry.get("resource") if isinstance(entry, dict) else None
+        resource_type = parser.top_level_strings.get("resourceType", "Bundle")
+        if resource_type != "Bundle":
+            yield 0, ValueError(f"Expected a FHIR Bundle, got resourceType {resource_type!r}")
+            return
+    parser.feed(decoder.decode(b"", final=True))
+    if not parser.complete:
+        yield 0, ValueError("Request body is not a complete FHIR Bundle (truncated, or not a JSON object)")
+    elif "resourceType" not in parser.top_level_strings:
+        yield 0, ValueError("Not a FHIR Bundle: the resourceType is missing")
+    elif not parser.array_found:
+        yield 0, ValueError("FHIR Bundle has no entry array")
+
+def fhir_patient_to_record(resource: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a FHIR R4 Patient resource onto the PatientCreate fields"""
+    names = resource.get("name") or [{}]
+    name = next((n for n in names if n.get("use") == "official"), names[0])
+    telecom = resource.get("telecom") or []
+
+    def contact(system: str) -> Optional[str]:
+        return next((t.get("value") for t in telecom if t.get("system") == system and t.get("value")), None)
+
+    address = (resource.get("address") or [{}])[0]
+    address_text = address.get("text") or ", ".join(
+        part for part in [*address.get("line", []), address.get("city"), address.get("state"),
+                          address.get("postalCode"), address.get("country")] if part
+    )
+    return {
+        "first_name": " ".join(name.get("given", [])) or None,
+        "last_name": name.get("family"),
+        "email": contact("email"),
+        "date_of_birth": resource.get("birthDate"),
+        "gender": resource.get("gender"),
+        "phone_number": contact("phone"),
+        "address": address_text or None
+    }
+
+def _describe(error: Any) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in detail['loc']) or 'record'}: {detail['msg']}"
+            for detail in error.errors()
+        )
+    if isinstance(error, dict):
+        if error.get("code") == DUPLICATE_KEY_ERROR:
+            return f"Duplicate record: {error.get('keyValue') or 'unique index violation'}"
+        return error.get("errmsg", "Write failed")
+    return str(error)
+
+def _fail(report: BulkImportReport, record: int, error: Any):
+    report.failed += 1
+    if len(report.errors) < get_settings().BULK_IMPORT_MAX_REPORTED_ERRORS:
+        report.errors.append(BulkRecordError(record=record, error=_describe(error)))
+    else:
+        report.errors_truncated = True
+
+async def _import(
+    records: AsyncIterator[Record],
+    prepare: Callable[[Any], Optional[Dict[str, Any]]],
+    write: Callable[[Batch, BulkImportReport], Awaitable[None]],
+    report: BulkImportReport
+) -> BulkImportReport:
+    """
+    Validate records as they stream in and write them in batches of
+    BULK_IMPORT_BATCH_SIZE. `prepare` returns the document to store, or None
+    to skip the record; a failing record never affects the rest of its batch.
+    """
+    batch_size = get_settings().BULK_IMPORT_BATCH_SIZE
+    batch: Batch = []
+    async for number, raw in records:
+        report.received += 1
+        if isinstance(raw, Exception):
+            _fail(report, number, raw)
+            continue
+        try:
+            document = prepare(raw)
+        except (ValidationError, ValueError, TypeError, AttributeError) as e:
+            _fail(report, number, e)
+            continue
+        if document is None:
+            report.skipped += 1
+            continue
+        batch.append((number, document))
+        if len(batch) >= batch_size:
+            await write(batch, report)
+            batch = []
+    if batch:
+        await write(batch, report)
+    return report
+
+async def _insert_unordered(collection, batch: Batch, report: BulkImportReport) -> List[int]:
+    """insert_many without stopping at the first error; returns the batch positions that failed"""
+    try:
+        result = await collection.insert_many([document for _, document in batch], ordered=False)
+        report.inserted += len(result.inserted_ids)
+        return []
+    except BulkWriteError as e:
+        report.inserted += e.details.get("nInserted", 0)
+        failed = []
+        for error in e.details.get("writeErrors", []):
+            failed.append(error["index"])
+            _fail(report, batch[error["index"]][0], error)
+        return failed
+
+def _patient_document(raw: Any, fhir: bool) -> Optional[Dict[str, Any]]:
+    if fhir:
+        if not isinstance(raw, dict) or raw.get("resourceType") != "Patient":
+            return None
+        raw = fhir_patient_to_record(raw)
+    patient = PatientCreate.model_validate(raw).model_dump()
+    terms = search_terms(patient["first_name"], patient["last_name"], patient["email"])
+    now = datetime.now()
+    return {
+        **patient,
+        "created_at": now,
+        "updated_at": now,
+        "search_terms": terms,
+        "search_keys": edge_ngrams(terms)
+    }
+
+async def import_patients(
+    chunks: AsyncIterator[bytes],
+    format: ImportFormat = ImportFormat.NDJSON,
+    on_conflict: ConflictPolicy = ConflictPolicy.SKIP
+) -> BulkImportReport:
+    """
+    Import patients from NDJSON (PatientCreate objects) or a FHIR Bundle
+    (Patient resources; other resource types are skipped). Existing emails
+    are reported as duplicates, or updated in place with ConflictPolicy.UPDATE.
+    """
+    collection = Patient.get_motor_collection()
+    records = iter_fhir_bundle(chunks) if format == ImportFormat.FHIR else iter_ndjson(chunks)
+
+    async def write(batch: Batch, report: BulkImportReport):
+        if on_conflict == ConflictPolicy.SKIP:
+            await _insert_unordered(collection, batch, report)
+            return
+        operations = []
+        for _, document in batch:
+            created_at = document.pop("created_at")
+            operations.append(UpdateOne(
+                {"email": document["email"]},
+                {"$set": document, "$setOnInsert": {"created_at": created_at}},
+                upsert=True
+            ))
+        try:
+            result = await collection.bulk_write(operations, ordered=False)
+            report.inserted += result.upserted_count
+            report.updated += result.matched_count
+        except BulkWriteError as e:
+            report.inserted += e.details.get("nUpserted", 0)
+            report.updated += e.details.get("nMatched", 0)
+            for error in e.details.get("writeErrors", []):
+                _fail(report, batch[error["index"]][0], error)
+
+    return await _import(records, lambda raw: _patient_document(raw, format == ImportFormat.FHIR), write, BulkImportReport())
+
+async def import_cases(chunks: AsyncIterator[bytes], analyze: bool = False) -> BulkImportReport:
+    """
+    Import clinical cases from NDJSON (ClinicalCaseCreate objects). With
+    `analyze`, an analysis job is queued for every stored case once its batch
+    has been written.
+    """
+    collection = ClinicalCase.get_motor_collection()
+
+    def prepare(raw: Any) -> Dict[str, Any]:
+        case = ClinicalCaseCreate.model_validate(raw)
+        job_id = str(PydanticObjectId()) if analyze else None
+        now = datetime.now()
+        return {
+            "_id": PydanticObjectId(),
+            **build_case_data(case, analysis_job_id=job_id),
+            "created_at": now,
+            "updated_at": now
+        }
+
+    async def write(batch: Batch, report: BulkImportReport):
+        failed = set(await _insert_unordered(collection, batch, report))
+        if analyze:
+            report.enqueued += await analysis_queue.enqueue_many([
+                (str(document["_id"]), PydanticObjectId(document["analysis_job_id"]))
+                for position, (_, document) in enumerate(batch)
+                if position not in failed
+            ])
+
+    return await _import(iter_ndjson(chunks), prepare, write, BulkImportReport())
@@ -0,0 +1,245 @@
+import asyncio
+import hashlib
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+from cachetools import LRUCache
+from app.core.config import get_settings
+
+def normalize_key_part(value: Any) -> Any:
+    """Canonicalize a key component so trivially different queries share an entry"""
+    if isinstance(value, str):
+        return " ".join(value.lower().split())
+    if isinstance(value, dict):
+        return {str(k): normalize_key_part(v) for k, v in sorted(value.items())}
+    if isinstance(value, (list, tuple)):
+        return [normalize_key_part(v) for v in value]
+    return value
+
+def make_cache_key(namespace: str, *parts: Any) -> str:
+    payload = json.dumps(normalize_key_part(list(parts)), sort_keys=True, default=str)
+    digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    return f"iatrikos:{namespace}:{digest}"
+
+class CacheEntry:
+    """A cached value with a freshness deadline and a later hard-expiry deadline"""
+
+    def __init__(self, value: Any, fresh_until: float, stale_until: float):
+        self.value = value
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+
+    def is_fresh(self, now: float) -> bool:
+        return now < self.fresh_until
+
+    def is_usable(self, now: float) -> bool:
+        return now < self.stale_until
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "value": self.value,
+            "fresh_until": self.fresh_until,
+            "stale_until": self.stale_until
+        }, default=str)
+
+    @classmethod
+    def from_json(cls, raw: Any) -> "CacheEntry":
+        data = json.loads(raw)
+        return cls(data["value"], data["fresh_until"], data["stale_until"])
+
+class DiskCacheTier:
+    """Shared tier backed by diskcache; size-bounded with LRU eviction"""
+
+    def __init__(self, directory: str, size_limit_bytes: int):
+        import diskcache
+        self._cache = diskcache.Cache(
+            directory,
+            size_limit=size_limit_bytes,
+            eviction_policy="least-recently-used"
+        )
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        raw = await asyncio.to_thread(self._cache.get, key)
+        return CacheEntry.from_json(raw) if raw is not None else None
+
+    async def set(self, key: str, entry: CacheEntry):
+        expire = max(entry.stale_until - time.time(), 1)
+        await asyncio.to_thread(self._cache.set, key, entry.to_json(), expire)
+
+class RedisCacheTier:
+    """Shared tier backed by Redis; eviction is left to the server's maxmemory policy"""
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+        self._redis = redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        raw = await self._redis.get(key)
+        return CacheEntry.from_json(raw) if raw is not None else None
+
+    async def set(self, key: str, entry: CacheEntry):
+        expire = max(int(entry.stale_until - time.time()), 1)
+        await self._redis.set(key, entry.to_json(), ex=expire)
+
+_shared_tier = None
+_shared_tier_loaded = False
+
+def get_shared_tier():
+    """Build the configured shared tier once; None when CACHE_BACKEND is 'memory'"""
+    global _shared_tier, _shared_tier_loaded
+    if not _shared_tier_loaded:
+        settings = get_settings()
+        if settings.CACHE_BACKEND == "redis":
+            _shared_tier = RedisCacheTier(settings.REDIS_URL)
+        elif settings.CACHE_BACKEND == "disk":
+            _shared_tier = DiskCacheTier(
+                settings.CACHE_DIR,
+                settings.CACHE_DISK_SIZE_LIMIT_MB * 1024 * 1024
+            )
+        _shared_tier_loaded = True
+    return _shared_tier
+
+class TieredCache:
+    """
+    Read-through cache with an in-process LRU tier in front of a shared tier.
+
+    Entries are fresh for `ttl` seconds and may then be served stale for up to
+    `stale_ttl` more seconds while a single background refresh replaces them.
+    Concurrent misses on one key share a single fetch. Failed fetches are
+    never cached.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl: float,
+        stale_ttl: float = 0,
+        max_entries: int = 1024,
+        shared_tier=None
+    ):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.local = LRUCache(maxsize=max_entries)
+        self.shared = shared_tier
+        self._refreshing: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._fetching: Dict[str, asyncio.Future] = {}
+        self.counters = {
+            "local_hits": 0,
+            "shared_hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "coalesced_misses": 0,
+            "refreshes": 0,
+            "errors": 0
+        }
+
+    def key(self, *parts: Any) -> str:
+        return make_cache_key(self.namespace, *parts)
+
+    async def get_or_fetch(self, key_parts: Any, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        entry = await self.lookup(key_parts)
+        if entry is not None:
+            if not entry.is_fresh(time.time()):
+                self._schedule_refresh(self.key(key_parts), fetch)
+            return entry.value
+        return await self._fetch_once(self.key(key_parts), fetch)
+
+    async def _fetch_once(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Fetch and store `key`, joining the fetch already in flight for it if there is one"""
+        future = self._fetching.get(key)
+        if future is not None:
+            self.counters["coalesced_misses"] += 1
+        else:
+            # The lookup awaited the shared tier; a fetch may have finished meanwhile
+            entry = self.local.get(key)
+            if entry is not None and entry.is_fresh(time.time()):
+                return entry.value
+            future = asyncio.ensure_future(self._fetch_and_store(key, fetch))
+            self._fetching[key] = future
+            future.add_done_callback(lambda done: self._fetch_done(key, done))
+        # Shield so one caller being cancelled does not cancel the fetch for the others
+        return await asyncio.shield(future)
+
+    async def _fetch_and_store(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        value = await fetch()
+        await self._store(key, value)
+        return value
+
+    def _fetch_done(self, key: str, future: asyncio.Future):
+        self._fetching.pop(key, None)
+        if not future.cancelled():
+            # Retrieved here so a failure whose callers all went away is not logged as unhandled
+            future.exception()
+
+    async def lookup(self, key_parts: Any) -> Optional[CacheEntry]:
+        """Return a usable (fresh or stale) entry, counting the hit or miss"""
+        key = self.key(key_parts)
+        now = time.time()
+
+        entry = self.local.get(key)
+        tier = "local_hits"
+        if entry is None or not entry.is_usable(now):
+            entry = await self._shared_get(key)
+            tier = "shared_hits"
+            if entry is not None and entry.is_usable(now):
+                self.local[key] = entry
+
+        if entry is not None and entry.is_usable(now):
+            self.counters[tier if entry.is_fresh(now) else "stale_hits"] += 1
+            return entry
+
+        self.counters["misses"] += 1
+        return None
+
+    async def store(self, key_parts: Any, value: Any):
+        await self._store(self.key(key_parts), value)
+
+    async def _store(self, key: str, value: Any):
+        now = time.time()
+        entry = CacheEntry(value, now + self.ttl, now + self.ttl + self.stale_ttl)
+        self.local[key] = entry
+        if self.shared is not None:
+            try:
+                await self.shared.set(key, entry)
+            except Exception as e:
+                self.counters["errors"] += 1
+                print(f"Shared cache write error ({self.namespace}): {str(e)}")
+
+    async def _shared_get(self, key: str) -> Optional[CacheEntry]:
+        if self.shared is None:
+            return None
+        try:
+            return await self.shared.get(key)
+        except Exception as e:
+            self.counters["errors"] += 1
+            print(f"Shared cache read error ({self.namespace}): {str(e)}")
+            return None
+
+    def _schedule_refresh(self, key: str, fetch: Callable[[], Awaitable[Any]]):
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        task = asyncio.create_task(self._refresh(key, fetch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _refresh(self, key: str, fetch: Callable[[], Awaitable[Any]]):
+        try:
+            await self._store(key, await fetch())
+            self.counters["refreshes"] += 1
+        except Exception as e:
+            self.counters["errors"] += 1
+            print(f"Cache refresh error ({self.namespace}): {str(e)}")
+        finally:
+            self._refreshing.discard(key)
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.counters["local_hits"] + self.counters["shared_hits"] + self.counters["stale_hits"]
+        lookups = hits + self.counters["misses"]
+        return {
+            **self.counters,
+            "entries": len(self.local),
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0
+        }
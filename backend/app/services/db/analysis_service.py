@@ -1,32 +1,144 @@
-from typing import Optional
-from backend.app.models.analysis_model import ClinicalAnalysis
-from backend.app.schemas.analysis_schema import ClinicalAnalysis as ClinicalAnalysisSchema
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from beanie import PydanticObjectId, UpdateResponse
+from backend.app.models.case_model import ClinicalCase
+from backend.app.schemas.analysis_schema import ClinicalAnalysisResponseSchema
+
+# ClinicalCase fields written by the analysis pipeline. The case is the single
+# source of truth for analysis results; nothing is copied to clinical_analyses.
+ANALYSIS_RESULT_FIELDS = (
+    "diagnoses",
+    "differential_diagnoses",
+    "key_findings",
+    "risk_factors",
+    "safety_checks",
+    "recommended_actions",
+    "recommendations"
+)
+
+def _current_job_filter(job_id: PydanticObjectId) -> Dict[str, Any]:
+    # Cases analysed before job ids were recorded have none
+    return {"analysis_job_id": {"$in": [str(job_id), None]}}
+
+def _case_filter(case_id: str) -> Optional[Dict[str, Any]]:
+    # Case ids come straight from request paths; a malformed one matches no case
+    if not PydanticObjectId.is_valid(case_id):
+        return None
+    return {"_id": PydanticObjectId(case_id)}
 
 class AnalysisService:
     @staticmethod
-    async def create_analysis(case_id: str, analysis_data: ClinicalAnalysisSchema) -> ClinicalAnalysis:
-        analysis = ClinicalAnalysis(
-            case_id=case_id,
-            progress=analysis_data.progress,
-            time_remaining=analysis_data.time_remaining,
-            diagnoses=analysis_data.diagnoses,
-            key_findings=analysis_data.key_findings,
-            safety_checks=analysis_data.safety_checks,
-            risk_factors=analysis_data.risk_factors,
-            recommendations=analysis_data.recommendations
+    def changed_result_fields(case: ClinicalCase, analysis_result) -> Dict[str, Any]:
+        """Result fields whose value differs from what `case` currently stores"""
+        changes = {}
+        for field in ANALYSIS_RESULT_FIELDS:
+            value = getattr(analysis_result, field)
+            if value != getattr(case, field):
+                changes[field] = value
+        return changes
+
+    @staticmethod
+    async def save_result(
+        case: ClinicalCase,
+        analysis_result,
+        job_id: Optional[PydanticObjectId] = None
+    ) -> Optional[ClinicalCase]:
+        """
+        Persist a completed analysis onto its case in one find_one_and_update,
+        $set-ting only the result fields that changed, and return the updated
+        case so callers never need to read it back.
+
+        With `job_id`, nothing is written (and None is returned) if the case
+        has since been handed to a newer analysis job, e.g. after an edit.
+        """
+        query: Dict[str, Any] = {"_id": case.id}
+        if job_id is not None:
+            query.update(_current_job_filter(job_id))
+        update = {
+            **AnalysisService.changed_result_fields(case, analysis_result),
+            "analysis_progress": 100.0,
+            "analysis_time_remaining": "0",
+            "updated_at": datetime.now()
+        }
+        return await ClinicalCase.find_one(query).update(
+            {"$set": update},
+            response_type=UpdateResponse.NEW_DOCUMENT
+        )
+
+    @staticmethod
+    async def is_current_job(case_id: str, job_id: PydanticObjectId) -> bool:
+        """False once the case has been handed to a newer analysis job (or deleted)"""
+        query = _case_filter(case_id)
+        if query is None:
+            return False
+        return await ClinicalCase.get_motor_collection().count_documents(
+            {**query, **_current_job_filter(job_id)},
+            limit=1
+        ) > 0
+
+    @staticmethod
+    async def get_analysis_by_case_id(case_id: str) -> Optional[ClinicalAnalysisResponseSchema]:
+        """The analysis of a case, projected from the case document by MongoDB"""
+        query = _case_filter(case_id)
+        if query is None:
+            return None
+        return await ClinicalCase.find_one(query).project(
+            ClinicalAnalysisResponseSchema
         )
-        await analysis.insert()
-        return analysis
 
     @staticmethod
-    async def get_analysis_by_case_id(case_id: str) -> Optional[ClinicalAnalysis]:
-        return await ClinicalAnalysis.find_one({"case_id": case_id})
+    async def restart(case_id: str) -> Tuple[Optional[ClinicalCase], Optional[PydanticObjectId]]:
+        """
+        Hand a case to a new analysis job and mark its analysis pending.
+
+        Returns the updated case (None if not found) and the job id, which the
+        caller should enqueue; stages whose inputs match a checkpoint are reused.
+        """
+        query = _case_filter(case_id)
+        if query is None:
+            return None, None
+        job_id = PydanticObjectId()
+        case = await ClinicalCase.find_one(query).update(
+            {"$set": {
+                "analysis_job_id": str(job_id),
+                "analysis_progress": 0.0,
+                "analysis_time_remaining": "pending",
+                "updated_at": datetime.now()
+            }},
+            response_type=UpdateResponse.NEW_DOCUMENT
+        )
+        return (case, job_id) if case else (None, None)
 
     @staticmethod
-    async def update_analysis_progress(analysis_id: str, progress: float, time_remaining: str) -> Optional[ClinicalAnalysis]:
-        analysis = await ClinicalAnalysis.get(analysis_id)
-        if analysis:
-            analysis.progress = progress
-            analysis.time_remaining = time_remaining
-            await analysis.save()
-        return analysis
\ No newline at end of file
+    async def mark_failed(case_id: str, job_id: PydanticObjectId):
+        """Mark the analysis of a case failed, unless it has since moved on to a newer job"""
+        query = _case_filter(case_id)
+        if query is None:
+            return
+        await ClinicalCase.get_motor_collection().update_one(
+            {**query, **_current_job_filter(job_id)},
+            {"$set": {"analysis_time_remaining": "failed"}}
+        )
+
+    @staticmethod
+    async def clear(case_id: str) -> bool:
+        """
+        Empty the analysis result fields of a case; False if it does not exist.
+
+        The case is given a job id that no job carries, so an analysis still
+        running for it cannot write its result back afterwards.
+        """
+        query = _case_filter(case_id)
+        if query is None:
+            return False
+        result = await ClinicalCase.get_motor_collection().update_one(
+            query,
+            {"$set": {
+                **{field: [] for field in ANALYSIS_RESULT_FIELDS},
+                "analysis_job_id": str(PydanticObjectId()),
+                "analysis_progress": 0.0,
+                "analysis_time_remaining": "pending",
+                "updated_at": datetime.now()
+            }}
+        )
+        return result.matched_count > 0
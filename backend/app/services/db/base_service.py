@@ -1,6 +1,7 @@
-from typing import TypeVar, Generic, List
+from typing import TypeVar, Generic, List, Optional, Tuple
 from beanie import Document
 from pydantic import BaseModel
+from app.utils.pagination import paginate
 
 T = TypeVar('T', bound=Document)
 
@@ -16,8 +17,9 @@ class BaseDbService(Generic[T]):
     async def get_by_id(self, id: str) -> T:
         return await self.model.get(id)
     
-    async def get_all(self, skip: int = 0, limit: int = 100) -> List[T]:
-        return await self.model.find_all().skip(skip).limit(limit).to_list()
+    async def get_all(self, limit: int = 100, cursor: Optional[str] = None) -> Tuple[List[T], Optional[str]]:
+        """Page of documents, newest first, and the cursor of the next page"""
+        return await paginate(self.model, limit=limit, cursor=cursor)
     
     async def update(self, id: str, data: BaseModel) -> T:
         document = await self.get_by_id(id)
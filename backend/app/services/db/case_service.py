@@ -1,6 +1,87 @@
 from backend.app.models.case_model import ClinicalCase
+from backend.app.schemas.case_schema import ClinicalCaseCreate, ClinicalCaseSummary, ClinicalCaseUpdate, VitalSigns
 from .base_service import BaseDbService
-from typing import List, Optional
+from beanie import PydanticObjectId, UpdateResponse
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from app.utils.pagination import paginate, paginate_fields
+from app.services.analysis_queue import ANALYSIS_INPUT_FIELDS
+
+CASE_VIEWS = ("full", "summary")
+# Fields a sparse fieldset may select; _id and created_at are always returned
+CASE_FIELDS = frozenset(ClinicalCase.model_fields) - {"id", "revision_id"}
+
+def get_unit_for_vital(vital_name: str) -> str:
+    """Return the appropriate unit for each vital sign"""
+    units = {
+        "blood_pressure": "mmHg",
+        "heart_rate": "bpm",
+        "temperature": "°C",
+        "oxygen_saturation": "%",
+        "respiratory_rate": "breaths/min",
+        "weight": "kg",
+        "height": "cm",
+        "bmi": "kg/m²"
+    }
+    return units.get(vital_name, "")
+
+def transform_vital_signs(vital_signs_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Transform vital signs into the expected list format"""
+    measurements = []
+    for name, value in vital_signs_data.items():
+        if value is not None:
+            measurement = {
+                "name": name,
+                "value": str(value),
+                "unit": get_unit_for_vital(name),
+                "timestamp": datetime.now().isoformat(),
+                "status": "normal"  # You might want to add logic to determine status
+            }
+            measurements.append(measurement)
+    return measurements
+
+def build_vital_signs(vital_signs: VitalSigns) -> Dict[str, Any]:
+    """Stored vital signs structure: the core readings plus every reading as a measurement"""
+    return {
+        "blood_pressure": vital_signs.blood_pressure,
+        "heart_rate": vital_signs.heart_rate,
+        "temperature": vital_signs.temperature,
+        "oxygen_saturation": vital_signs.oxygen_saturation,
+        "respiratory_rate": vital_signs.respiratory_rate,
+        "measurements": transform_vital_signs(vital_signs.model_dump(exclude={"measurements"}))
+    }
+
+def _analysis_input(field: str, value: Any) -> Any:
+    # Measurements are derived from the readings and carry a fresh timestamp each time
+    if field == "vital_signs" and isinstance(value, dict):
+        return {k: v for k, v in value.items() if k != "measurements"}
+    return value
+
+def build_case_data(case: ClinicalCaseCreate, analysis_job_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Transform a validated case into the field layout stored on ClinicalCase,
+    with empty analysis fields. Shared by single-case creation and bulk import.
+    """
+    case_data = case.model_dump()
+    
+    # Create vital signs structure
+    case_data["vital_signs"] = build_vital_signs(case.vital_signs)
+    
+    # Initialize analysis fields
+    case_data.update({
+        "analysis": [],
+        "analysis_progress": 0.0,
+        "analysis_time_remaining": "pending",
+        "analysis_job_id": analysis_job_id,
+        "diagnoses": [],
+        "differential_diagnoses": [],
+        "key_findings": [],
+        "risk_factors": [],
+        "safety_checks": [],
+        "recommended_actions": [],
+        "recommendations": []
+    })
+    return case_data
 
 class CaseService(BaseDbService[ClinicalCase]):
     """
@@ -12,19 +93,100 @@ class CaseService(BaseDbService[ClinicalCase]):
         """Initialize the service with the ClinicalCase model."""
         super().__init__(ClinicalCase)   
     
-    async def get_cases_by_patient(self, patient_id: str) -> List[ClinicalCase]:
+    async def get_cases_by_patient(
+        self,
+        patient_id: str,
+        limit: int = 10,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[ClinicalCase], Optional[str]]:
         """
-        Retrieve all clinical cases for a specific patient.
+        Retrieve a page of clinical cases for a specific patient, newest first.
         
         Args:
             patient_id (str): The unique identifier of the patient
+            limit (int): Maximum number of cases to return
+            cursor (Optional[str]): Cursor returned with the previous page
+            
+        Returns:
+            Tuple[List[ClinicalCase], Optional[str]]: The cases and the cursor of the next page
+        """
+        return await paginate(ClinicalCase, {"patient_id": patient_id}, limit=limit, cursor=cursor)
+    
+    async def update_case(
+        self,
+        case_id: str,
+        data: ClinicalCaseUpdate
+    ) -> Tuple[Optional[ClinicalCase], Optional[PydanticObjectId]]:
+        """
+        Apply the fields set in `data` with a single $set.
+        
+        If any analysis input actually changed, the case is also reset to a
+        pending analysis under a new job id, which the caller should enqueue.
+        
+        Returns:
+            Tuple[Optional[ClinicalCase], Optional[PydanticObjectId]]: The updated case (None if
+            not found) and the new analysis job id (None if no analysis input changed)
+        """
+        case = await self.get_by_id(case_id)
+        if not case:
+            return None, None
+        changes = data.model_dump(exclude_unset=True)
+        if data.vital_signs is not None:
+            changes["vital_signs"] = build_vital_signs(data.vital_signs)
+        current = case.model_dump(include=set(changes))
+        job_id = None
+        if any(
+            _analysis_input(field, value) != _analysis_input(field, current.get(field))
+            for field, value in changes.items()
+            if field in ANALYSIS_INPUT_FIELDS
+        ):
+            job_id = PydanticObjectId()
+            changes.update({
+                "analysis_job_id": str(job_id),
+                "analysis_progress": 0.0,
+                "analysis_time_remaining": "pending"
+            })
+        changes["updated_at"] = datetime.now()
+        updated = await ClinicalCase.find_one({"_id": case.id}).update(
+            {"$set": changes},
+            response_type=UpdateResponse.NEW_DOCUMENT
+        )
+        return updated, job_id
+    
+    async def list_cases(
+        self,
+        patient_id: Optional[str] = None,
+        limit: int = 10,
+        cursor: Optional[str] = None,
+        view: str = "full",
+        fields: Optional[List[str]] = None
+    ) -> Tuple[List[Any], Optional[str]]:
+        """
+        Retrieve a page of clinical cases, newest first, in the requested shape.
+        
+        Args:
+            patient_id (Optional[str]): Restrict the listing to one patient
+            limit (int): Maximum number of cases to return
+            cursor (Optional[str]): Cursor returned with the previous page
+            view (str): "full" for complete ClinicalCase documents or "summary" for ClinicalCaseSummary
+            fields (Optional[List[str]]): Sparse fieldset; overrides `view` and returns raw dicts
             
         Returns:
-            List[ClinicalCase]: List of clinical cases associated with the patient
+            Tuple[List[Any], Optional[str]]: The cases and the cursor of the next page
+            
+        Raises:
+            ValueError: On an unknown view or field, or an invalid cursor
         """
-        return await ClinicalCase.find(
-            {"patient_id": patient_id}
-        ).to_list()
+        query: Dict[str, Any] = {"patient_id": patient_id} if patient_id else {}
+        if fields:
+            unknown = sorted(set(fields) - CASE_FIELDS)
+            if unknown:
+                raise ValueError(f"Unknown case fields: {', '.join(unknown)}")
+            return await paginate_fields(ClinicalCase, fields, query, limit=limit, cursor=cursor)
+        if view not in CASE_VIEWS:
+            raise ValueError(f"Unknown view '{view}', expected one of: {', '.join(CASE_VIEWS)}")
+        projection_model = ClinicalCaseSummary if view == "summary" else None
+        return await paginate(ClinicalCase, query, limit=limit, cursor=cursor, projection_model=projection_model)
     
     async def get_case_with_patient(self, case_id: str) -> Optional[dict]:
         """
@@ -0,0 +1,80 @@
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from beanie import PydanticObjectId
+from backend.app.models.checkpoint_model import AnalysisCheckpoint
+from app.core.agents.pipeline import StageCache
+from app.services.db.analysis_service import AnalysisService
+
+class CheckpointService:
+    @staticmethod
+    async def load(case_id: str) -> Dict[str, Tuple[str, Any]]:
+        """Stage name -> (input hash, output) of the latest checkpoint of each stage of the case"""
+        checkpoints = await AnalysisCheckpoint.get_motor_collection().find(
+            {"case_id": case_id},
+            {"stage": 1, "input_hash": 1, "output": 1}
+        ).to_list(length=None)
+        return {c["stage"]: (c["input_hash"], c.get("output")) for c in checkpoints}
+
+    @staticmethod
+    async def save_stage(case_id: str, stage: str, input_hash: str, output: Any):
+        """Replace the case's checkpoint for `stage` with this output"""
+        await AnalysisCheckpoint.get_motor_collection().update_one(
+            {"case_id": case_id, "stage": stage},
+            # Round-trip through JSON so agent outputs are always BSON-encodable
+            {"$set": {
+                "input_hash": input_hash,
+                "output": json.loads(json.dumps(output, default=str)),
+                "updated_at": datetime.now()
+            }},
+            upsert=True
+        )
+
+    @staticmethod
+    async def delete_for_case(case_id: str):
+        await AnalysisCheckpoint.find({"case_id": case_id}).delete()
+
+class CheckpointStageCache(StageCache):
+    """
+    StageCache backed by the analysis_checkpoints collection.
+
+    Every reusable stage output is written as soon as the stage completes,
+    so a retried or restarted analysis of the same case resumes from the
+    last good stage instead of repeating its LLM and evidence calls.
+
+    With a `job_id`, writes stop as soon as the case has been handed to a
+    newer job (e.g. after an edit), so a superseded run cannot overwrite the
+    newer job's checkpoints with outputs for inputs that no longer apply.
+    """
+
+    def __init__(
+        self,
+        case_id: str,
+        previous: Optional[Dict[str, Tuple[str, Any]]] = None,
+        job_id: Optional[PydanticObjectId] = None
+    ):
+        super().__init__(previous)
+        self.case_id = case_id
+        self.job_id = job_id
+        self.superseded = False
+
+    @classmethod
+    async def for_case(cls, case_id: str, job_id: Optional[PydanticObjectId] = None) -> "CheckpointStageCache":
+        return cls(case_id, await CheckpointService.load(case_id), job_id)
+
+    async def record(self, stage: str, input_hash: str, output: Any):
+        await super().record(stage, input_hash, output)
+        previous = self.previous.get(stage)
+        if previous is not None and previous[0] == input_hash:
+            return  # Reused from this very checkpoint
+        if self.superseded:
+            return
+        try:
+            if self.job_id is not None and not await AnalysisService.is_current_job(self.case_id, self.job_id):
+                self.superseded = True
+                print(f"Analysis job {self.job_id} of case {self.case_id} was superseded; no longer checkpointing")
+                return
+            await CheckpointService.save_stage(self.case_id, stage, input_hash, output)
+        except Exception as e:
+            # A lost checkpoint only costs a re-run later; never fail the stage for it
+            print(f"Checkpointing stage {stage} of case {self.case_id} failed: {str(e)}")
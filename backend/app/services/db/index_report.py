@@ -0,0 +1,76 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple, Type
+from beanie import Document
+from pymongo import ASCENDING, DESCENDING
+from backend.app.models.analysis_model import (
+    DiagnosisAnalysis, KeyFinding, SafetyCheck, RiskFactor,
+    RecommendedAction, DifferentialDiagnosis, VitalSign, Medication, LabResult
+)
+from backend.app.models.audit_model import AuditLog
+from backend.app.models.case_model import ClinicalCase
+from backend.app.models.job_model import AnalysisJob
+from backend.app.models.checkpoint_model import AnalysisCheckpoint
+from backend.app.models.patient_model import Patient
+from backend.app.models.user_model import User
+from app.utils.pagination import KEYSET_SORT
+
+Sort = Optional[List[Tuple[str, int]]]
+
+# The query shapes the API and workers issue, with placeholder values
+APPLICATION_QUERIES: List[Tuple[str, Type[Document], Dict[str, Any], Sort]] = [
+    ("cases by patient", ClinicalCase, {"patient_id": "_"}, KEYSET_SORT),
+    ("recent cases", ClinicalCase, {}, KEYSET_SORT),
+    *[
+        (f"{model.Settings.name} by case", model, {"case_id": "_"}, None)
+        for model in (
+            DiagnosisAnalysis, KeyFinding, SafetyCheck, RiskFactor, RecommendedAction,
+            DifferentialDiagnosis, VitalSign, Medication, LabResult
+        )
+    ],
+    ("latest job for case", AnalysisJob, {"case_id": "_"}, [("created_at", DESCENDING)]),
+    ("queued jobs", AnalysisJob, {"status": "queued"}, [("created_at", ASCENDING)]),
+    ("stale running jobs", AnalysisJob, {"status": "running", "updated_at": {"$lt": datetime.min}}, None),
+    ("checkpoints of case", AnalysisCheckpoint, {"case_id": "_"}, None),
+    ("recent patients", Patient, {}, KEYSET_SORT),
+    ("patient by email", Patient, {"email": "_"}, None),
+    ("patient search", Patient, {"search_keys": {"$all": ["_"]}}, None),
+    ("user by email", User, {"email": "_"}, None),
+    ("user by verification code", User, {"verification_code": "_"}, None),
+    ("user by reset token", User, {"reset_password_token": "_"}, None),
+    ("audit trail of document", AuditLog, {"collection": "_", "document_id": "_"}, None)
+]
+
+def _plan_stages(plan: Dict[str, Any]) -> List[str]:
+    stages = [plan.get("stage", "")]
+    for child in ("inputStage", "queryPlan"):
+        if child in plan:
+            stages.extend(_plan_stages(plan[child]))
+    for branch in plan.get("inputStages", []):
+        stages.extend(_plan_stages(branch))
+    return stages
+
+async def explain_queries() -> List[Dict[str, Any]]:
+    """Explain every application query and flag the ones whose winning plan scans a collection"""
+    report = []
+    for label, model, query, sort in APPLICATION_QUERIES:
+        cursor = model.get_motor_collection().find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        try:
+            explanation = await cursor.explain()
+        except Exception as e:
+            report.append({"query": label, "collection": model.Settings.name, "error": str(e)})
+            continue
+        stages = _plan_stages(explanation.get("queryPlanner", {}).get("winningPlan", {}))
+        report.append({
+            "query": label,
+            "collection": model.Settings.name,
+            "plan": [stage for stage in stages if stage],
+            "collection_scan": "COLLSCAN" in stages
+        })
+    return report
+
+async def log_collection_scans():
+    for entry in await explain_queries():
+        if entry.get("collection_scan"):
+            print(f"⚠️ Query '{entry['query']}' on {entry['collection']} scans the collection ({' <- '.join(entry['plan'])})")
@@ -1,6 +1,11 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+from pymongo import UpdateOne
 from backend.app.models.patient_model import Patient
 from datetime import datetime
+from app.utils.pagination import paginate, encode_ranked_cursor, decode_ranked_cursor
+from app.utils.search import MAX_PREFIX_LENGTH, edge_ngrams, query_tokens, search_terms
+
+SEARCH_BACKFILL_BATCH_SIZE = 500
 
 class PatientService:
     @staticmethod
@@ -14,9 +19,8 @@ class PatientService:
         return await Patient.get(patient_id)
 
     @staticmethod
-    async def get_patients(skip: int = 0, limit: int = 10) -> List[Patient]:
-        patients = await Patient.find_all().skip(skip).limit(limit).to_list()
-        return patients
+    async def get_patients(limit: int = 10, cursor: Optional[str] = None) -> Tuple[List[Patient], Optional[str]]:
+        return await paginate(Patient, limit=limit, cursor=cursor)
 
     @staticmethod
     async def update_patient(patient_id: str, patient_data: dict) -> Optional[Patient]:
@@ -40,14 +44,63 @@ class PatientService:
         return True
 
     @staticmethod
-    async def search_patients(query: str, skip: int = 0, limit: int = 10) -> List[Patient]:
-        # Basic search implementation - you might want to enhance this
-        filter_query = {
-            "$or": [
-                {"first_name": {"$regex": query, "$options": "i"}},
-                {"last_name": {"$regex": query, "$options": "i"}},
-                {"email": {"$regex": query, "$options": "i"}}
-            ]
-        }
-        patients = await Patient.find(filter_query).skip(skip).limit(limit).to_list()
-        return patients
\ No newline at end of file
+    async def search_patients(query: str, limit: int = 10, cursor: Optional[str] = None) -> Tuple[List[Patient], Optional[str]]:
+        """
+        Patients whose name or email words start with every word of `query`.
+        
+        Candidates come from the multikey search_keys index; they are ranked by
+        how many query words match a whole word exactly, newest first on ties.
+        Query words are cut to MAX_PREFIX_LENGTH, so words are compared cut the
+        same way. The score is computed, so ranking is an in-memory top-k sort
+        of the matching candidates (bounded by the $limit that follows it).
+        """
+        tokens = query_tokens(query)
+        if not tokens:
+            return [], None
+        truncated_terms = {"$map": {
+            "input": "$search_terms",
+            "as": "term",
+            "in": {"$substrCP": ["$$term", 0, MAX_PREFIX_LENGTH]}
+        }}
+        pipeline: List[Dict[str, Any]] = [
+            {"$match": {"search_keys": {"$all": tokens}}},
+            {"$addFields": {"search_score": {"$size": {"$setIntersection": [truncated_terms, tokens]}}}}
+        ]
+        if cursor:
+            score, document_id = decode_ranked_cursor(cursor)
+            pipeline.append({"$match": {"$or": [
+                {"search_score": {"$lt": score}},
+                {"search_score": score, "_id": {"$lt": document_id}}
+            ]}})
+        pipeline += [
+            {"$sort": {"search_score": -1, "_id": -1}},
+            {"$limit": limit + 1}
+        ]
+        results = await Patient.get_motor_collection().aggregate(pipeline).to_list(length=limit + 1)
+        next_cursor = None
+        if len(results) > limit:
+            last = results[limit - 1]
+            next_cursor = encode_ranked_cursor(last["search_score"], last["_id"])
+        return [Patient.model_validate(result) for result in results[:limit]], next_cursor
+
+    @staticmethod
+    async def backfill_search_fields() -> int:
+        """Populate search fields on patients stored before search was indexed"""
+        collection = Patient.get_motor_collection()
+        updated = 0
+        batch: List[UpdateOne] = []
+        async for raw in collection.find(
+            {"search_keys": {"$exists": False}},
+            {"first_name": 1, "last_name": 1, "email": 1}
+        ):
+            terms = search_terms(raw.get("first_name"), raw.get("last_name"), raw.get("email"))
+            batch.append(UpdateOne(
+                {"_id": raw["_id"]},
+                {"$set": {"search_terms": terms, "search_keys": edge_ngrams(terms)}}
+            ))
+            if len(batch) >= SEARCH_BACKFILL_BATCH_SIZE:
+                updated += (await collection.bulk_write(batch, ordered=False)).modified_count
+                batch = []
+        if batch:
+            updated += (await collection.bulk_write(batch, ordered=False)).modified_count
+        return updated
\ No newline at end of file
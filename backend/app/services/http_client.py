@@ -0,0 +1,76 @@
+import asyncio
+import importlib.util
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+import httpx
+from app.core.config import get_settings
+
+class SharedHttpClient:
+    """
+    Process-wide pooled async HTTP client for external knowledge sources.
+
+    A single httpx.AsyncClient keeps connections alive across requests
+    (HTTP/2 when the optional `h2` package is installed), and a semaphore
+    per host keeps any one upstream API from taking the whole pool.
+    """
+
+    def __init__(self):
+        self.client: Optional[httpx.AsyncClient] = None
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._max_connections_per_host = 1
+
+    async def start(self) -> httpx.AsyncClient:
+        if self.client is not None and not self.client.is_closed:
+            return self.client
+
+        settings = get_settings()
+        self._max_connections_per_host = settings.HTTP_MAX_CONNECTIONS_PER_HOST
+        self._host_semaphores = {}
+        self.client = httpx.AsyncClient(
+            http2=settings.HTTP2_ENABLED and importlib.util.find_spec("h2") is not None,
+            timeout=httpx.Timeout(
+                settings.HTTP_TIMEOUT_SECONDS,
+                connect=settings.HTTP_CONNECT_TIMEOUT_SECONDS
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS
+            ),
+            follow_redirects=True
+        )
+        return self.client
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.aclose()
+        self.client = None
+        self._host_semaphores = {}
+
+    def _semaphore_for(self, url: str) -> asyncio.Semaphore:
+        host = httpx.URL(url).host
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self._max_connections_per_host)
+        return self._host_semaphores[host]
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        """GET through the shared pool, bounded by the per-host connection limit"""
+        client = await self.start()
+        async with self._semaphore_for(url):
+            return await client.get(url, **kwargs)
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs) -> AsyncIterator[httpx.Response]:
+        """Stream a response body through the shared pool without buffering it"""
+        client = await self.start()
+        async with self._semaphore_for(url):
+            async with client.stream(method, url, **kwargs) as response:
+                yield response
+
+http_client = SharedHttpClient()
+
+async def init_http_client():
+    await http_client.start()
+
+async def close_http_client():
+    await http_client.close()
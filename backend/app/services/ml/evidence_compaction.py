@@ -0,0 +1,112 @@
+from typing import Any, Dict, List
+from app.core.config import get_settings
+
+# Label sections worth showing a clinician-facing model, in order of importance
+DRUG_LABEL_FIELDS = (
+    "boxed_warning",
+    "indications_and_usage",
+    "contraindications",
+    "dosage_and_administration",
+    "warnings_and_cautions",
+    "warnings",
+    "drug_interactions",
+    "adverse_reactions"
+)
+
+def _clip(value: Any, max_chars: int) -> str:
+    if isinstance(value, list):
+        value = " ".join(str(v) for v in value)
+    text = " ".join(str(value).split())
+    return text if len(text) <= max_chars else text[:max_chars].rstrip() + "..."
+
+def compact_drug_label(response: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Reduce an OpenFDA label.json response to the clinically relevant label sections"""
+    settings = get_settings()
+    labels = []
+    for result in (response or {}).get("results", [])[:settings.EVIDENCE_MAX_ITEMS_PER_SOURCE]:
+        openfda = result.get("openfda", {})
+        label = {
+            "brand_name": _clip(openfda.get("brand_name", []), 100),
+            "generic_name": _clip(openfda.get("generic_name", []), 100)
+        }
+        for field in DRUG_LABEL_FIELDS:
+            if result.get(field):
+                label[field] = _clip(result[field], settings.EVIDENCE_FIELD_MAX_CHARS)
+        labels.append(label)
+    return labels
+
+def compact_trial(study: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce a ClinicalTrials.gov v2 study to identity, status, design and interventions"""
+    protocol = study.get("protocolSection", {})
+    identification = protocol.get("identificationModule", {})
+    status = protocol.get("statusModule", {})
+    design = protocol.get("designModule", {})
+    interventions = protocol.get("armsInterventionsModule", {}).get("interventions", [])
+    outcomes = protocol.get("outcomesModule", {}).get("primaryOutcomes", [])
+    return {
+        "nct_id": identification.get("nctId"),
+        "title": identification.get("briefTitle"),
+        "status": status.get("overallStatus"),
+        "phases": design.get("phases", []),
+        "conditions": protocol.get("conditionsModule", {}).get("conditions", []),
+        "interventions": [i.get("name") for i in interventions if i.get("name")],
+        "primary_outcomes": [o.get("measure") for o in outcomes if o.get("measure")],
+        "has_results": study.get("hasResults", False)
+    }
+
+def compact_article(article: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "pmid": article.get("id"),
+        "title": article.get("title"),
+        "journal": article.get("journal"),
+        "year": article.get("year"),
+        "abstract": _clip(article.get("abstract", ""), get_settings().EVIDENCE_FIELD_MAX_CHARS)
+    }
+
+def compact_lab_reference(bundle: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Reduce a LOINC FHIR bundle to test names and reference ranges"""
+    references = []
+    for entry in (bundle or {}).get("entry", [])[:get_settings().EVIDENCE_MAX_ITEMS_PER_SOURCE]:
+        resource = entry.get("resource", {})
+        codings = resource.get("code", {}).get("coding", [])
+        references.append({
+            "test": codings[0].get("display") if codings else None,
+            "reference_range": [r.get("text") or {k: r.get(k) for k in ("low", "high")} for r in resource.get("referenceRange", [])]
+        })
+    return references
+
+def compact_evidence(evidence: Dict[str, List[Any]]) -> Dict[str, List[Any]]:
+    """Compact every record gathered by MedicalAgent._gather_evidence"""
+    compacted: Dict[str, List[Any]] = {}
+    for source, records in (evidence or {}).items():
+        items: List[Any] = []
+        for record in records:
+            if not isinstance(record, dict):
+                items.append(_clip(record, get_settings().EVIDENCE_FIELD_MAX_CHARS))
+            elif source == "literature":
+                items.append(compact_article(record))
+            elif source == "clinical_trials":
+                items.append(compact_trial(record))
+            elif source == "drug_information":
+                items.extend(compact_drug_label(record))
+            else:
+                items.append(record)
+        compacted[source] = items
+    return compacted
+
+def interleave_evidence(evidence: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """
+    Flatten compacted evidence round-robin across sources, so that trimming
+    the list from the end for a token budget keeps every source represented.
+    """
+    queues = [
+        [item if isinstance(item, dict) else {"text": item} for item in items]
+        for items in evidence.values()
+    ]
+    sources = list(evidence.keys())
+    flattened: List[Dict[str, Any]] = []
+    for position in range(max((len(q) for q in queues), default=0)):
+        for source, queue in zip(sources, queues):
+            if position < len(queue):
+                flattened.append({"source": source, **queue[position]})
+    return flattened
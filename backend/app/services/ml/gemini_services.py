@@ -1,5 +1,7 @@
 import google.generativeai as genai
 from app.core.config import get_settings
+from app.services.ml.llm_cache import llm_cache
+from app.services.ml.llm_limiter import llm_limiter
 
 class GeminiService:
     def __init__(self):
@@ -15,14 +17,23 @@ class GeminiService:
             # }
         )  
     
-    async def generate_response(self, prompt: str) -> str:
+    async def generate_response(self, prompt: str, cacheable: bool = True) -> str:
         try:
-            response = await self.model.generate_content_async(prompt)
-            return response.text
+            return await llm_cache.get_or_generate(
+                model=self.model.model_name,
+                params={},
+                prompt=prompt,
+                generate=lambda: self._generate(prompt),
+                cacheable=cacheable
+            )
         except Exception as e:
             # Log the error appropriately
             raise Exception(f"Error generating response: {str(e)}")
     
+    async def _generate(self, prompt: str) -> str:
+        response = await llm_limiter.run(lambda: self.model.generate_content_async(prompt))
+        return response.text
+    
     async def analyze_medical_case(self, patient_data: dict) -> dict:
         """
         Analyze a medical case using Gemini
@@ -53,6 +64,3 @@ class GeminiService:
             "raw_response": response,
             # Add more structured fields as needed
         }
-
-# Create a singleton instance
-gemini_service = GeminiService()
\ No newline at end of file
@@ -0,0 +1,31 @@
+from typing import Dict
+from app.core.config import get_settings
+from app.services.cache import TieredCache, get_shared_tier
+
+_knowledge_caches: Dict[str, TieredCache] = {}
+
+def _source_ttls() -> Dict[str, int]:
+    settings = get_settings()
+    return {
+        "pubmed": settings.KNOWLEDGE_CACHE_TTL_PUBMED,
+        "openfda": settings.KNOWLEDGE_CACHE_TTL_OPENFDA,
+        "clinicaltrials": settings.KNOWLEDGE_CACHE_TTL_CLINICALTRIALS,
+        "loinc": settings.KNOWLEDGE_CACHE_TTL_LOINC
+    }
+
+def get_knowledge_cache(source: str) -> TieredCache:
+    """Process-wide cache for one external knowledge source"""
+    if source not in _knowledge_caches:
+        settings = get_settings()
+        ttl = _source_ttls()[source]
+        _knowledge_caches[source] = TieredCache(
+            namespace=f"knowledge:{source}",
+            ttl=ttl,
+            stale_ttl=ttl * settings.KNOWLEDGE_CACHE_STALE_FACTOR,
+            max_entries=settings.KNOWLEDGE_CACHE_MAX_ENTRIES,
+            shared_tier=get_shared_tier()
+        )
+    return _knowledge_caches[source]
+
+def knowledge_cache_stats() -> Dict[str, Dict]:
+    return {source: cache.stats() for source, cache in _knowledge_caches.items()}
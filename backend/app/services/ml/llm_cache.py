@@ -0,0 +1,107 @@
+import hashlib
+import json
+import re
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+from app.core.config import get_settings
+from app.services.cache import TieredCache, get_shared_tier
+
+def canonicalize_prompt(prompt: str) -> str:
+    """Normalize whitespace-only differences (indentation, line endings, blank runs)"""
+    lines = [line.strip() for line in prompt.replace("\r\n", "\n").split("\n")]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+class LLMResponseCache:
+    """
+    Content-addressed cache of LLM completions.
+
+    Entries are keyed by a hash of the model name, generation parameters and
+    canonicalized prompt, so identical requests from any agent share a single
+    completion. Calls whose output should vary between runs pass
+    `cacheable=False`; calls that parse the completion pass a `store_if`
+    check, so an unusable completion is neither stored nor served from the
+    cache, and the next identical request asks the model again.
+    """
+
+    def __init__(self):
+        self._cache: Optional[TieredCache] = None
+
+    @property
+    def cache(self) -> TieredCache:
+        if self._cache is None:
+            settings = get_settings()
+            self._cache = TieredCache(
+                namespace="llm",
+                ttl=settings.LLM_CACHE_TTL_SECONDS,
+                max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+                shared_tier=get_shared_tier() if settings.LLM_CACHE_SHARED else None
+            )
+        return self._cache
+
+    def key(self, model: str, params: Dict[str, Any], prompt: str) -> str:
+        payload = json.dumps(
+            {"model": model, "params": params, "prompt": canonicalize_prompt(prompt)},
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get_or_generate(
+        self,
+        model: str,
+        params: Dict[str, Any],
+        prompt: str,
+        generate: Callable[[], Awaitable[str]],
+        cacheable: bool = True,
+        store_if: Optional[Callable[[str], bool]] = None
+    ) -> str:
+        if not cacheable or not get_settings().LLM_CACHE_ENABLED:
+            return await generate()
+        if store_if is None:
+            return await self.cache.get_or_fetch(self.key(model, params, prompt), generate)
+
+        key = self.key(model, params, prompt)
+        entry = await self.cache.lookup(key)
+        if entry is not None and store_if(entry.value):
+            return entry.value
+        completion = await generate()
+        if store_if(completion):
+            await self.cache.store(key, completion)
+        return completion
+
+    async def stream_or_generate(
+        self,
+        model: str,
+        params: Dict[str, Any],
+        prompt: str,
+        stream: Callable[[], AsyncIterator[str]],
+        cacheable: bool = True,
+        store_if: Optional[Callable[[str], bool]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Yield completion chunks as the model produces them. A cached completion
+        is yielded as a single chunk; a streamed one is stored only once it has
+        been received in full.
+        """
+        if not cacheable or not get_settings().LLM_CACHE_ENABLED:
+            async for chunk in stream():
+                yield chunk
+            return
+
+        key = self.key(model, params, prompt)
+        entry = await self.cache.lookup(key)
+        if entry is not None and (store_if is None or store_if(entry.value)):
+            yield entry.value
+            return
+
+        chunks = []
+        async for chunk in stream():
+            chunks.append(chunk)
+            yield chunk
+        completion = "".join(chunks)
+        if store_if is None or store_if(completion):
+            await self.cache.store(key, completion)
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats() if self._cache is not None else {}
+
+llm_cache = LLMResponseCache()
@@ -0,0 +1,181 @@
+import asyncio
+import random
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+from app.core.config import get_settings
+from app.utils.rate_limit import AsyncRateLimiter
+
+T = TypeVar("T")
+
+def is_rate_limited(error: BaseException) -> bool:
+    """True for Gemini quota errors (HTTP 429 / ResourceExhausted) from any client library"""
+    return type(error).__name__ == "ResourceExhausted" or "429" in str(error)
+
+class AdaptiveLLMLimiter:
+    """
+    Process-wide gate for every Gemini call.
+
+    Calls start no faster than LLM_RATE_LIMIT_PER_MINUTE and at most `limit`
+    run at once; callers beyond that wait in a FIFO queue. The limit adapts
+    AIMD-style: it grows by roughly one slot per window of successful calls,
+    is halved on a 429 and shrinks slightly when latency exceeds the target.
+    Rate-limited calls are retried here with exponential backoff, so load
+    spikes turn into queueing rather than failed analyses.
+    """
+
+    def __init__(self):
+        settings = get_settings()
+        self.min_limit = settings.LLM_MIN_CONCURRENCY
+        self.max_limit = settings.LLM_MAX_CONCURRENCY
+        self.limit = float(min(max(settings.LLM_INITIAL_CONCURRENCY, self.min_limit), self.max_limit))
+        self.latency_target = settings.LLM_LATENCY_TARGET_SECONDS
+        self.max_attempts = settings.LLM_MAX_ATTEMPTS
+        self.backoff = settings.LLM_RETRY_BACKOFF_SECONDS
+        self._rate = AsyncRateLimiter(settings.LLM_RATE_LIMIT_PER_MINUTE, period=60.0)
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._in_flight = 0
+        self.counters = {
+            "calls": 0,
+            "succeeded": 0,
+            "throttled": 0,
+            "retries": 0,
+            "slow_calls": 0,
+            "total_wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+            "total_latency_seconds": 0.0
+        }
+
+    async def run(self, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run one LLM call through the limiter.
+
+        Gate each model call on its own, never a multi-call operation such as
+        a whole group chat: that would hold one slot throughout and hide its
+        calls from the rate gate and the latency adjustment.
+        """
+        attempt = 0
+        while True:
+            started = await self._enter()
+            try:
+                result = await call()
+            except BaseException as e:
+                self._exit(started, error=e)
+                if self._should_retry(e, attempt):
+                    await self._wait_before_retry(attempt)
+                    attempt += 1
+                    continue
+                raise
+            self._exit(started)
+            return result
+
+    async def stream(self, make_stream: Callable[[], AsyncIterator[T]]) -> AsyncIterator[T]:
+        """Like `run` for streamed completions; retried only if nothing has been yielded yet"""
+        attempt = 0
+        while True:
+            started = await self._enter()
+            yielded = False
+            try:
+                async for item in make_stream():
+                    yielded = True
+                    yield item
+            except BaseException as e:
+                self._exit(started, error=e)
+                if not yielded and self._should_retry(e, attempt):
+                    await self._wait_before_retry(attempt)
+                    attempt += 1
+                    continue
+                raise
+            self._exit(started)
+            return
+
+    async def _enter(self) -> float:
+        loop = asyncio.get_running_loop()
+        queued_at = loop.time()
+        await self._acquire_slot()
+        try:
+            await self._rate.acquire()
+        except BaseException:
+            self._release_slot()
+            raise
+        now = loop.time()
+        waited = now - queued_at
+        self.counters["calls"] += 1
+        self.counters["total_wait_seconds"] += waited
+        self.counters["max_wait_seconds"] = max(self.counters["max_wait_seconds"], waited)
+        return now
+
+    def _exit(self, started: float, error: Optional[BaseException] = None):
+        self._release_slot()
+        if error is not None:
+            if is_rate_limited(error):
+                self.counters["throttled"] += 1
+                self._set_limit(self.limit / 2)
+            return
+
+        latency = asyncio.get_running_loop().time() - started
+        self.counters["succeeded"] += 1
+        self.counters["total_latency_seconds"] += latency
+        if latency > self.latency_target:
+            self.counters["slow_calls"] += 1
+            self._set_limit(self.limit * 0.9)
+        else:
+            self._set_limit(self.limit + 1 / self.limit)
+
+    def _should_retry(self, error: BaseException, attempt: int) -> bool:
+        return isinstance(error, Exception) and is_rate_limited(error) and attempt < self.max_attempts - 1
+
+    async def _wait_before_retry(self, attempt: int):
+        self.counters["retries"] += 1
+        delay = self.backoff * 2 ** attempt
+        await asyncio.sleep(delay + random.uniform(0, self.backoff))
+
+    async def _acquire_slot(self):
+        if not self._waiters and self._in_flight < int(self.limit):
+            self._in_flight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just before the cancellation
+                self._release_slot()
+            else:
+                self._waiters.remove(waiter)
+            raise
+
+    def _release_slot(self):
+        self._in_flight -= 1
+        self._wake_waiters()
+
+    def _wake_waiters(self):
+        while self._waiters and self._in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self._in_flight += 1
+            waiter.set_result(None)
+
+    def _set_limit(self, limit: float):
+        self.limit = min(max(limit, float(self.min_limit)), float(self.max_limit))
+        self._wake_waiters()
+
+    def stats(self) -> Dict[str, Any]:
+        calls = self.counters["calls"]
+        succeeded = self.counters["succeeded"]
+        return {
+            "limit": int(self.limit),
+            "in_flight": self._in_flight,
+            "queue_depth": len(self._waiters),
+            "calls": calls,
+            "succeeded": succeeded,
+            "throttled": self.counters["throttled"],
+            "retries": self.counters["retries"],
+            "slow_calls": self.counters["slow_calls"],
+            "avg_wait_ms": round(self.counters["total_wait_seconds"] / calls * 1000, 1) if calls else 0.0,
+            "max_wait_ms": round(self.counters["max_wait_seconds"] * 1000, 1),
+            "avg_latency_ms": round(self.counters["total_latency_seconds"] / succeeded * 1000, 1) if succeeded else 0.0
+        }
+
+llm_limiter = AdaptiveLLMLimiter()
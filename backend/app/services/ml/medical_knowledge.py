@@ -1,15 +1,16 @@
 from typing import Dict, List
-import requests
-from Bio import Entrez
-import xml.etree.ElementTree as ET
+import httpx
+from app.core.analysis_context import memoized_tool
+from app.core.degradation import report_degraded
+from app.services.http_client import http_client
+from app.services.ml.knowledge_cache import get_knowledge_cache
+from app.services.ml.pubmed_client import PubMedClient
 
 class MedicalKnowledgeService:
     def __init__(self):
-        # Configure Entrez for PubMed access
-        # Entrez.email = "your-email@example.com"
-        Entrez.email = "solomoneshun373@gmail.com" 
-        # TODO: Add email to .env
-        
+        # PubMed access via batched E-utilities (contact email and API key come from settings)
+        self.pubmed = PubMedClient()
+
         # Free API endpoints
         self.endpoints = {
             "openfda": "https://api.fda.gov/drug",
@@ -17,68 +18,92 @@ class MedicalKnowledgeService:
             "loinc": "https://fhir.loinc.org"
         }
 
+    @memoized_tool("pubmed")
     async def search_pubmed(self, query: str, max_results: int = 5) -> List[Dict]:
         """Search PubMed for medical literature"""
         try:
-            handle = Entrez.esearch(db="pubmed", term=query, retmax=max_results)
-            records = Entrez.read(handle)
-            
-            results = []
-            for id in records["IdList"]:
-                summary = Entrez.esummary(db="pubmed", id=id)
-                summary_records = Entrez.read(summary)
-                results.append({
-                    "id": id,
-                    "title": summary_records[0]["Title"],
-                    "abstract": summary_records[0].get("Abstract", ""),
-                    "authors": summary_records[0].get("AuthorList", [])
-                })
-            return results
+            return await get_knowledge_cache("pubmed").get_or_fetch(
+                {"query": query, "max_results": max_results},
+                lambda: self.pubmed.search(query, max_results)
+            )
         except Exception as e:
             print(f"PubMed search error: {str(e)}")
+            report_degraded(f"PubMed search failed: {str(e)}")
             return []
 
+    @memoized_tool("openfda")
     async def search_drug_info(self, drug_name: str) -> Dict:
         """Search OpenFDA for drug information"""
         try:
-            url = f"{self.endpoints['openfda']}/label.json?search={drug_name}"
-            response = requests.get(url)
-            return response.json()
+            return await get_knowledge_cache("openfda").get_or_fetch(
+                {"drug_name": drug_name},
+                lambda: self._fetch_drug_info(drug_name)
+            )
         except Exception as e:
             print(f"OpenFDA search error: {str(e)}")
+            report_degraded(f"OpenFDA search failed: {str(e)}")
             return {}
 
+    @memoized_tool("clinicaltrials")
     async def search_clinical_trials(self, condition: str) -> List[Dict]:
         """Search ClinicalTrials.gov for relevant studies"""
         try:
-            # Updated endpoint and parameters
-            url = f"{self.endpoints['clinicaltrials']}/v2/studies"
-            params = {
-                "query.term": condition,
-                "pageSize": 5,
-                "format": "json"
-            }
-            response = requests.get(url, params=params)
-            if response.status_code == 200:
-                return response.json().get("studies", [])
-            return []
+            return await get_knowledge_cache("clinicaltrials").get_or_fetch(
+                {"condition": condition},
+                lambda: self._fetch_clinical_trials(condition)
+            )
         except Exception as e:
             print(f"ClinicalTrials.gov search error: {str(e)}")
+            report_degraded(f"ClinicalTrials.gov search failed: {str(e)}")
             return []
 
+    @memoized_tool("loinc")
     async def get_lab_reference(self, loinc_code: str) -> Dict:
         """Get LOINC lab test information"""
         try:
-            # Updated to use public FHIR endpoint
-            url = f"{self.endpoints['loinc']}/fhir/v2/Observation"
-            params = {
-                "code": loinc_code,
-                "_format": "json"
-            }
-            response = requests.get(url, params=params)
-            if response.status_code == 200:
-                return response.json()
-            return {}
+            return await get_knowledge_cache("loinc").get_or_fetch(
+                {"loinc_code": loinc_code},
+                lambda: self._fetch_lab_reference(loinc_code)
+            )
         except Exception as e:
             print(f"LOINC search error: {str(e)}")
+            report_degraded(f"LOINC search failed: {str(e)}")
             return {}
+
+    def _raise_for_transient_error(self, response: httpx.Response):
+        # Throttling and server errors must not be cached as "no results"
+        if response.status_code == 429 or response.status_code >= 500:
+            response.raise_for_status()
+
+    async def _fetch_drug_info(self, drug_name: str) -> Dict:
+        url = f"{self.endpoints['openfda']}/label.json"
+        response = await http_client.get(url, params={"search": drug_name})
+        self._raise_for_transient_error(response)
+        return response.json()
+
+    async def _fetch_clinical_trials(self, condition: str) -> List[Dict]:
+        # Updated endpoint and parameters
+        url = f"{self.endpoints['clinicaltrials']}/v2/studies"
+        params = {
+            "query.term": condition,
+            "pageSize": 5,
+            "format": "json"
+        }
+        response = await http_client.get(url, params=params)
+        self._raise_for_transient_error(response)
+        if response.status_code == 200:
+            return response.json().get("studies", [])
+        return []
+
+    async def _fetch_lab_reference(self, loinc_code: str) -> Dict:
+        # Updated to use public FHIR endpoint
+        url = f"{self.endpoints['loinc']}/fhir/v2/Observation"
+        params = {
+            "code": loinc_code,
+            "_format": "json"
+        }
+        response = await http_client.get(url, params=params)
+        self._raise_for_transient_error(response)
+        if response.status_code == 200:
+            return response.json()
+        return {}
@@ -0,0 +1,135 @@
+from typing import Any, Dict, List, Optional
+import xml.etree.ElementTree as ET
+from app.core.config import get_settings
+from app.services.http_client import http_client
+from app.utils.rate_limit import AsyncRateLimiter
+
+EUTILS_BASE = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
+
+# NCBI allows 3 requests/second per process without an API key and 10 with one.
+# The limiter is module-level so every analysis in the process shares the budget.
+_rate_limiter: Optional[AsyncRateLimiter] = None
+
+def get_ncbi_rate_limiter() -> AsyncRateLimiter:
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = AsyncRateLimiter(10 if get_settings().NCBI_API_KEY else 3)
+    return _rate_limiter
+
+class PubMedClient:
+    """
+    Batched PubMed retrieval over NCBI E-utilities.
+
+    One ESearch stores the hit list on the NCBI history server and one EFetch
+    pulls every matching record (with abstracts) in a single response, which
+    is parsed incrementally as it streams in.
+    """
+
+    def __init__(self):
+        settings = get_settings()
+        self.api_key = settings.NCBI_API_KEY
+        self.email = settings.NCBI_EMAIL
+        self.tool = settings.NCBI_TOOL
+
+    def _params(self, **params) -> Dict[str, Any]:
+        params["tool"] = self.tool
+        if self.email:
+            params["email"] = self.email
+        if self.api_key:
+            params["api_key"] = self.api_key
+        return params
+
+    async def search(self, query: str, max_results: int = 5) -> List[Dict]:
+        """Search PubMed and return title, abstract and authors for each hit"""
+        history = await self._esearch(query, max_results)
+        if history is None:
+            return []
+        return await self._efetch(history["webenv"], history["querykey"], max_results)
+
+    async def _esearch(self, query: str, max_results: int) -> Optional[Dict[str, str]]:
+        await get_ncbi_rate_limiter().acquire()
+        response = await http_client.get(
+            f"{EUTILS_BASE}/esearch.fcgi",
+            params=self._params(
+                db="pubmed",
+                term=query,
+                retmax=max_results,
+                usehistory="y",
+                retmode="json"
+            )
+        )
+        response.raise_for_status()
+        result = response.json().get("esearchresult", {})
+        if not result.get("idlist"):
+            return None
+        return {"webenv": result["webenv"], "querykey": result["querykey"]}
+
+    async def _efetch(self, webenv: str, query_key: str, max_results: int) -> List[Dict]:
+        await get_ncbi_rate_limiter().acquire()
+        params = self._params(
+            db="pubmed",
+            WebEnv=webenv,
+            query_key=query_key,
+            retstart=0,
+            retmax=max_results,
+            rettype="abstract",
+            retmode="xml"
+        )
+        parser = ET.XMLPullParser(events=("end",))
+        articles = []
+        async with http_client.stream("GET", f"{EUTILS_BASE}/efetch.fcgi", params=params) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes():
+                parser.feed(chunk)
+                articles.extend(self._drain(parser))
+        parser.close()
+        articles.extend(self._drain(parser))
+        return articles
+
+    def _drain(self, parser: ET.XMLPullParser) -> List[Dict]:
+        articles = []
+        for _, element in parser.read_events():
+            if element.tag == "PubmedArticle":
+                articles.append(self._parse_article(element))
+                # Free the finished subtree so memory stays flat for large batches
+                element.clear()
+        return articles
+
+    def _parse_article(self, article: ET.Element) -> Dict:
+        citation = article.find("MedlineCitation")
+        details = citation.find("Article") if citation is not None else None
+        if details is None:
+            return {"id": "", "title": "", "abstract": "", "authors": []}
+
+        abstract_parts = []
+        for section in details.findall("Abstract/AbstractText"):
+            text = "".join(section.itertext()).strip()
+            label = section.get("Label")
+            abstract_parts.append(f"{label}: {text}" if label else text)
+
+        authors = []
+        for author in details.findall("AuthorList/Author"):
+            collective = author.findtext("CollectiveName")
+            if collective:
+                authors.append(collective)
+                continue
+            name = " ".join(
+                part for part in (author.findtext("LastName"), author.findtext("Initials")) if part
+            )
+            if name:
+                authors.append(name)
+
+        pub_date = details.find("Journal/JournalIssue/PubDate")
+        year = None
+        if pub_date is not None:
+            year = pub_date.findtext("Year") or pub_date.findtext("MedlineDate")
+
+        title = details.find("ArticleTitle")
+        return {
+            "id": citation.findtext("PMID", default=""),
+            "title": "".join(title.itertext()).strip() if title is not None else "",
+            "abstract": "\n".join(abstract_parts),
+            "authors": authors,
+            "journal": details.findtext("Journal/Title", default=""),
+            "year": year
+        }
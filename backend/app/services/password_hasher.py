@@ -0,0 +1,63 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple, TypeVar
+from passlib.context import CryptContext
+from app.core.config import get_settings
+
+T = TypeVar("T")
+
+def available_cores() -> int:
+    """CPU cores this process may run on (the container's share, where the OS reports it)"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+class PasswordHasher:
+    """
+    bcrypt hashing and verification off the event loop.
+
+    bcrypt releases the GIL while it works, so hashes run in parallel on a
+    bounded thread pool (PASSWORD_HASH_WORKERS, default one per available
+    core) while the loop keeps serving other requests; calls beyond the
+    pool size wait their turn in the executor queue instead of adding CPU
+    contention. New hashes use BCRYPT_ROUNDS, and verify_and_update reports
+    a replacement hash for any stored hash below that cost.
+    """
+
+    def __init__(self, workers: Optional[int] = None, rounds: Optional[int] = None):
+        settings = get_settings() if workers is None or rounds is None else None
+        self.workers = workers or settings.PASSWORD_HASH_WORKERS or available_cores()
+        self.rounds = rounds or settings.BCRYPT_ROUNDS
+        self.context = CryptContext(
+            schemes=["bcrypt"],
+            deprecated="auto",
+            bcrypt__default_rounds=self.rounds,
+            bcrypt__min_rounds=self.rounds
+        )
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    async def _run(self, func: Callable[..., T], *args) -> T:
+        return await asyncio.get_running_loop().run_in_executor(self._pool(), func, *args)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.context.hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run(self.context.verify, password, hashed_password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """(valid, new hash); the new hash is None unless the password is valid and the stored hash is below BCRYPT_ROUNDS"""
+        return await self._run(self.context.verify_and_update, password, hashed_password)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        self._executor = None
+
+password_hasher = PasswordHasher()
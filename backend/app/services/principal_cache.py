@@ -0,0 +1,50 @@
+from typing import Awaitable, Callable, Optional
+from cachetools import TTLCache
+from backend.app.models.user_model import User
+from app.core.config import get_settings
+
+class PrincipalCache:
+    """
+    Short-lived, size-bounded cache of the users resolved from access tokens.
+
+    Saves get_current_user a MongoDB round trip on every authenticated
+    request. Anything that changes a user's standing (deactivation, password
+    reset, 2FA changes) calls invalidate; the TTL bounds how long other API
+    processes, which keep their own cache, can serve the old record.
+    PRINCIPAL_CACHE_TTL_SECONDS=0 disables caching.
+    """
+
+    def __init__(self):
+        settings = get_settings()
+        self.enabled = settings.PRINCIPAL_CACHE_TTL_SECONDS > 0
+        self._users: TTLCache = TTLCache(
+            maxsize=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+            ttl=max(settings.PRINCIPAL_CACHE_TTL_SECONDS, 1)
+        )
+        # Bumped by every invalidation, so a lookup that was already in flight
+        # cannot put back the record it was invalidating
+        self._generation = 0
+
+    async def get(self, user_id: str, load: Callable[[str], Awaitable[Optional[User]]]) -> Optional[User]:
+        """The cached user, or load(user_id) cached on success; callers get their own copy"""
+        if not self.enabled:
+            return await load(user_id)
+        user = self._users.get(user_id)
+        if user is None:
+            generation = self._generation
+            user = await load(user_id)
+            if user is None:
+                return None
+            if generation == self._generation:
+                self._users[user_id] = user
+        return user.model_copy()
+
+    def invalidate(self, user_id: str):
+        self._generation += 1
+        self._users.pop(str(user_id), None)
+
+    def clear(self):
+        self._generation += 1
+        self._users.clear()
+
+principal_cache = PrincipalCache()
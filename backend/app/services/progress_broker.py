@@ -0,0 +1,62 @@
+import asyncio
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator, Deque, Dict, Set
+from cachetools import LRUCache
+from app.core.config import get_settings
+
+TERMINAL_EVENTS = {"analysis_completed", "analysis_failed"}
+
+class ProgressBroker:
+    """
+    In-memory pub/sub fan-out of analysis progress events per case.
+
+    Workers publish once and every watcher of the case receives the event
+    from its own bounded queue, so watchers never poll MongoDB. Events of
+    the latest run are kept so late subscribers can catch up.
+    """
+
+    def __init__(self):
+        settings = get_settings()
+        self._queue_size = settings.PROGRESS_EVENTS_PER_CASE
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+        self._history: LRUCache = LRUCache(maxsize=settings.PROGRESS_HISTORY_CASES)
+
+    def publish(self, case_id: str, event_type: str, **payload: Any):
+        event = {
+            "event": event_type,
+            "case_id": case_id,
+            "timestamp": datetime.now().isoformat(),
+            **payload
+        }
+        history: Deque[Dict[str, Any]] = self._history.get(case_id)
+        if history is None or event_type == "analysis_started":
+            history = deque(maxlen=self._queue_size)
+            self._history[case_id] = history
+        history.append(event)
+
+        for queue in self._subscribers.get(case_id, ()):
+            if queue.full():
+                # Slow watcher: drop its oldest event rather than block the worker
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    def has_history(self, case_id: str) -> bool:
+        return case_id in self._history
+
+    @asynccontextmanager
+    async def subscribe(self, case_id: str) -> AsyncIterator[asyncio.Queue]:
+        """Yield a queue of events for `case_id`, pre-filled with the current run's events"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self._queue_size)
+        for event in self._history.get(case_id, ()):
+            queue.put_nowait(event)
+        self._subscribers[case_id].add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers[case_id].discard(queue)
+            if not self._subscribers[case_id]:
+                del self._subscribers[case_id]
+
+progress_broker = ProgressBroker()
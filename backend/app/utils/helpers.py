@@ -5,7 +5,15 @@ from backend.app.core.config import get_settings
 from backend.app.models.patient_model import Patient
 from backend.app.models.case_model import ClinicalCase
 from backend.app.models.audit_model import AuditLog
-from backend.app.models.analysis_model import ClinicalAnalysis
+from backend.app.models.analysis_model import (
+    ClinicalAnalysis, DiagnosisAnalysis, KeyFinding, SafetyCheck, RiskFactor,
+    RecommendedAction, DifferentialDiagnosis, VitalSign, Medication, LabResult
+)
+from backend.app.models.job_model import AnalysisJob
+from backend.app.models.checkpoint_model import AnalysisCheckpoint
+from backend.app.models.user_model import User
+from backend.app.services.db.index_report import log_collection_scans
+from backend.app.services.db.patient_service import PatientService
 import asyncio
 
 class Database:
@@ -17,6 +25,39 @@ class Database:
 
 db = Database()
 
+DOCUMENT_MODELS = [
+    Patient,
+    ClinicalCase,
+    AuditLog,
+    ClinicalAnalysis,
+    DiagnosisAnalysis,
+    KeyFinding,
+    SafetyCheck,
+    RiskFactor,
+    RecommendedAction,
+    DifferentialDiagnosis,
+    VitalSign,
+    Medication,
+    LabResult,
+    AnalysisJob,
+    AnalysisCheckpoint,
+    User
+]
+
+async def report_undeclared_indexes():
+    """Log indexes present in MongoDB that no model declares (dropped only if configured)"""
+    for model in DOCUMENT_MODELS:
+        existing = await model.get_motor_collection().index_information()
+        declared = {index.document["name"] for index in getattr(model.Settings, "indexes", [])}
+        # Single-field Indexed() annotations get MongoDB's default "<field>_1" name
+        declared.update(
+            f"{name}_1" for name, field in model.model_fields.items()
+            if getattr(field.annotation, "_indexed", None)
+        )
+        for name in existing:
+            if name != "_id_" and name not in declared:
+                print(f"Undeclared index {name} on {model.Settings.name}")
+
 async def connect_to_mongodb():
     settings = get_settings()
     db.client = AsyncIOMotorClient(settings.MONGODB_URL)
@@ -41,17 +82,22 @@ async def init_mongodb():
             w="majority"
         )
         
-        # Initialize Beanie with all document models
+        db.client = client
+        
+        # Initialize Beanie with all document models; this also creates every
+        # index the models declare in Settings.indexes
         await init_beanie(
             database=client[settings.MONGODB_DB_NAME],
-            document_models=[
-                Patient,
-                ClinicalCase,
-                AuditLog,
-                ClinicalAnalysis
-            ]
+            document_models=DOCUMENT_MODELS,
+            allow_index_dropping=settings.MONGODB_DROP_UNDECLARED_INDEXES
         )
         print("🛜🛜🛜 Successfully connected to MongoDB Atlas 🛜🛜🛜")
+        await report_undeclared_indexes()
+        backfilled = await PatientService.backfill_search_fields()
+        if backfilled:
+            print(f"Indexed {backfilled} patients for search")
+        if settings.MONGODB_INDEX_REPORT:
+            await log_collection_scans()
     except Exception as e:
         print(f"⚠️⚠️⚠️ Failed to connect to MongoDB: {str(e)}")
         # Add a small delay before retrying
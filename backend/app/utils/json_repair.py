@@ -0,0 +1,142 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+def parse_json_lenient(text: str) -> Any:
+    """
+    Parse model output that is meant to be JSON but may not be strictly valid.
+
+    Handles surrounding prose or Markdown fences, trailing commas, raw newlines
+    inside strings, Python literals and output truncated mid-value (the last
+    incomplete member is dropped). Raises ValueError if nothing is recoverable.
+    """
+    try:
+        return json.loads(text)
+    except (json.JSONDecodeError, TypeError):
+        pass
+
+    for candidate in _repair_candidates(text or ""):
+        try:
+            return json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+    raise ValueError("No JSON value could be recovered from the model output")
+
+def parse_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """`text` as a JSON object if it is exactly one, without any repair; None otherwise"""
+    try:
+        value = json.loads(text)
+    except (json.JSONDecodeError, TypeError):
+        return None
+    return value if isinstance(value, dict) else None
+
+def is_json_object(text: str) -> bool:
+    """True if `text` is a well-formed JSON object, e.g. schema-constrained model output"""
+    return parse_json_object(text) is not None
+
+def extract_json_object(
+    text: str,
+    required_key: Optional[str] = None,
+    repair: bool = True
+) -> Optional[Dict[str, Any]]:
+    """
+    Return the last JSON object embedded in free text (e.g. a chat transcript)
+    that contains `required_key`, repairing it if it was cut off (unless
+    `repair` is False).
+    """
+    decoder = json.JSONDecoder()
+    found = None
+    i = text.find("{")
+    while i != -1:
+        try:
+            value, end = decoder.raw_decode(text, i)
+        except json.JSONDecodeError:
+            i = text.find("{", i + 1)
+            continue
+        if isinstance(value, dict) and (required_key is None or required_key in value):
+            found = value
+        i = text.find("{", end)
+    if found is not None or required_key is None or not repair:
+        return found
+
+    # The object may be malformed or truncated: repair from its opening brace
+    marker = text.rfind(f'"{required_key}"')
+    start = text.rfind("{", 0, marker) if marker != -1 else -1
+    if start == -1:
+        return None
+    try:
+        value = parse_json_lenient(text[start:])
+    except ValueError:
+        return None
+    return value if isinstance(value, dict) else None
+
+def _repair_candidates(text: str) -> List[str]:
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    if not starts:
+        return []
+
+    out: List[str] = []
+    stack: List[str] = []
+    # (output length, open containers) after which the document can be closed
+    checkpoints: List[Tuple[int, Tuple[str, ...]]] = []
+    in_string = False
+    escaped = False
+    i = min(starts)
+    while i < len(text):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            elif ch == "\n":
+                ch = "\\n"
+            out.append(ch)
+        elif ch == '"':
+            in_string = True
+            out.append(ch)
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+            out.append(ch)
+            checkpoints.append((len(out), tuple(stack)))
+        elif ch in "}]":
+            if not stack:
+                break
+            _drop_trailing_comma(out)
+            out.append(stack.pop())
+            if not stack:
+                return ["".join(out)]
+        elif ch == ",":
+            checkpoints.append((len(out), tuple(stack)))
+            out.append(ch)
+        elif ch.isalpha():
+            end = i
+            while end < len(text) and text[end].isalnum():
+                end += 1
+            word = text[i:end]
+            out.append(_LITERALS.get(word, word))
+            i = end
+            continue
+        else:
+            out.append(ch)
+        i += 1
+
+    # Truncated output: close what is open, or fall back to the last complete member
+    candidates = []
+    naive = out + (['"'] if in_string else [])
+    _drop_trailing_comma(naive)
+    candidates.append("".join(naive) + "".join(reversed(stack)))
+    for length, open_stack in reversed(checkpoints[-64:]):
+        truncated = out[:length]
+        _drop_trailing_comma(truncated)
+        candidates.append("".join(truncated) + "".join(reversed(open_stack)))
+    return candidates
+
+def _drop_trailing_comma(out: List[str]):
+    while out and out[-1].isspace():
+        out.pop()
+    if out and out[-1] == ",":
+        out.pop()
@@ -0,0 +1,157 @@
+import json
+from typing import Any, Dict, List, Optional
+
+def _decode_string(raw: str) -> str:
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        return raw[1:-1]
+
+class JSONArrayStreamParser:
+    """
+    Incremental scanner for a JSON object that arrives in chunks.
+
+    Each element of the array stored under `key` in the top-level object is
+    decoded and returned from `feed` as soon as its closing bracket arrives,
+    without waiting for the rest of the document. Text around the top-level
+    object, such as Markdown code fences, is ignored. Object, array and
+    string elements are supported.
+
+    With `retain_text=False` text is discarded once scanned, so arbitrarily
+    large documents (e.g. FHIR Bundles) are parsed in bounded memory; `text`
+    then only holds the unfinished tail and `document()` is unavailable.
+
+    `complete` tells whether the top-level object has been closed,
+    `array_found` whether `key` held an array, and `top_level_strings` holds
+    the object's string members (e.g. a FHIR resourceType) as they arrive.
+    """
+
+    def __init__(self, key: str, retain_text: bool = True):
+        self.key = key
+        self.retain_text = retain_text
+        self.text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._string_start = 0
+        self._candidate_key: Optional[str] = None
+        self._value_key: Optional[str] = None
+        self._awaiting_array = False
+        self._in_array = False
+        self._element_start: Optional[int] = None
+        self._object_start: Optional[int] = None
+        self._object_end: Optional[int] = None
+        self.array_found = False
+        self.top_level_strings: Dict[str, str] = {}
+
+    def feed(self, chunk: str) -> List[Any]:
+        """Consume the next chunk and return the array elements it completed"""
+        self.text += chunk
+        completed = []
+        text = self.text
+        for i in range(self._pos, len(text)):
+            if self._object_end is not None:
+                break
+            ch = text[i]
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                    self._close_string(text, i, completed)
+                continue
+
+            if ch == '"':
+                if self._depth > 0:
+                    self._in_string = True
+                    self._string_start = i
+            elif ch in "{[":
+                self._open(ch, i)
+            elif ch in "}]":
+                self._close(ch, text, i, completed)
+            elif self._depth == 1 and not ch.isspace():
+                if ch == ":":
+                    self._awaiting_array = self._candidate_key == self.key
+                    self._value_key = self._candidate_key
+                else:
+                    self._awaiting_array = False
+                    self._value_key = None
+                self._candidate_key = None
+
+        self._pos = len(text)
+        if not self.retain_text:
+            self._discard_scanned()
+        return completed
+
+    @property
+    def complete(self) -> bool:
+        return self._object_end is not None
+
+    def document(self) -> Optional[str]:
+        """Text of the top-level object once it has been fully received"""
+        if not self.retain_text or self._object_start is None or self._object_end is None:
+            return None
+        return self.text[self._object_start:self._object_end + 1]
+
+    def _discard_scanned(self):
+        # Keep only what an open string or array element still needs
+        keep_from = self._pos
+        if self._in_string:
+            keep_from = min(keep_from, self._string_start)
+        if self._element_start is not None:
+            keep_from = min(keep_from, self._element_start)
+        if keep_from == 0:
+            return
+        self.text = self.text[keep_from:]
+        self._pos -= keep_from
+        self._string_start -= keep_from
+        if self._element_start is not None:
+            self._element_start -= keep_from
+
+    def _open(self, ch: str, i: int):
+        if self._depth == 0:
+            if ch != "{":
+                return
+            self._object_start = i
+        elif self._depth == 1:
+            self._in_array = ch == "[" and self._awaiting_array
+            self.array_found = self.array_found or self._in_array
+            self._awaiting_array = False
+            self._candidate_key = None
+            self._value_key = None
+        elif self._in_array and self._depth == 2:
+            self._element_start = i
+        self._depth += 1
+
+    def _close(self, ch: str, text: str, i: int, completed: List[Any]):
+        if self._depth == 0:
+            return
+        self._depth -= 1
+        if self._depth == 0:
+            self._object_end = i
+        elif self._depth == 1:
+            self._in_array = False
+        elif self._in_array and self._depth == 2 and self._element_start is not None:
+            self._emit(text[self._element_start:i + 1], completed)
+            self._element_start = None
+
+    def _close_string(self, text: str, i: int, completed: List[Any]):
+        if self._depth == 1:
+            value = _decode_string(text[self._string_start:i + 1])
+            if self._value_key is not None:
+                self.top_level_strings[self._value_key] = value
+                self._value_key = None
+            else:
+                self._candidate_key = value
+        elif self._in_array and self._depth == 2:
+            self._emit(text[self._string_start:i + 1], completed)
+
+    def _emit(self, raw: str, completed: List[Any]):
+        try:
+            completed.append(json.loads(raw))
+        except json.JSONDecodeError as e:
+            print(f"Skipping malformed streamed '{self.key}' element: {str(e)}")
@@ -0,0 +1,104 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+from beanie import Document
+from pydantic import BaseModel
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import DESCENDING
+
+# Newest first; _id breaks ties between documents created in the same millisecond
+KEYSET_SORT = [("created_at", DESCENDING), ("_id", DESCENDING)]
+
+def _encode(payload: Dict[str, Any]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode("ascii").rstrip("=")
+
+def _decode(cursor: str) -> Dict[str, Any]:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+
+def encode_cursor(created_at: datetime, document_id: ObjectId) -> str:
+    """Opaque cursor pointing just past the given document in KEYSET_SORT order"""
+    return _encode({"t": created_at.isoformat(), "id": str(document_id)})
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    try:
+        payload = _decode(cursor)
+        return datetime.fromisoformat(payload["t"]), ObjectId(payload["id"])
+    except (ValueError, KeyError, TypeError, InvalidId) as e:
+        raise ValueError("Invalid pagination cursor") from e
+
+def encode_ranked_cursor(score: int, document_id: ObjectId) -> str:
+    """Opaque cursor pointing just past the given document in (score, _id) descending order"""
+    return _encode({"s": score, "id": str(document_id)})
+
+def decode_ranked_cursor(cursor: str) -> Tuple[int, ObjectId]:
+    try:
+        payload = _decode(cursor)
+        return int(payload["s"]), ObjectId(payload["id"])
+    except (ValueError, KeyError, TypeError, InvalidId) as e:
+        raise ValueError("Invalid pagination cursor") from e
+
+def after_cursor(cursor: str) -> Dict[str, Any]:
+    created_at, document_id = decode_cursor(cursor)
+    return {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "_id": {"$lt": document_id}}
+    ]}
+
+def _page_query(query: Optional[Dict[str, Any]], cursor: Optional[str]) -> Dict[str, Any]:
+    query = query or {}
+    if cursor:
+        query = {"$and": [query, after_cursor(cursor)]} if query else after_cursor(cursor)
+    return query
+
+async def paginate(
+    model: Type[Document],
+    query: Optional[Dict[str, Any]] = None,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    projection_model: Optional[Type[BaseModel]] = None
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    One page of `model` documents matching `query`, plus the cursor of the
+    next page (None on the last page).
+
+    Seeks directly to the cursor position through the created_at/_id index,
+    so every page costs the same regardless of depth. With `projection_model`
+    only that model's fields are fetched and validated; it must carry `id`
+    and `created_at` for the cursor.
+    """
+    find = model.find(_page_query(query, cursor)).sort(KEYSET_SORT).limit(limit + 1)
+    if projection_model is not None:
+        find = find.project(projection_model)
+    documents = await find.to_list()
+    next_cursor = None
+    if len(documents) > limit:
+        last = documents[limit - 1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return documents[:limit], next_cursor
+
+async def paginate_fields(
+    model: Type[Document],
+    fields: Iterable[str],
+    query: Optional[Dict[str, Any]] = None,
+    limit: int = 10,
+    cursor: Optional[str] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Like `paginate`, but returns raw documents holding only `fields` (plus
+    `_id` and `created_at`), skipping model validation entirely.
+    """
+    projection = {field: 1 for field in fields}
+    projection["created_at"] = 1
+    documents = await model.get_motor_collection().find(
+        _page_query(query, cursor), projection
+    ).sort(KEYSET_SORT).limit(limit + 1).to_list(length=limit + 1)
+    next_cursor = None
+    if len(documents) > limit:
+        last = documents[limit - 1]
+        next_cursor = encode_cursor(last["created_at"], last["_id"])
+    for document in documents:
+        document["_id"] = str(document["_id"])
+    return documents[:limit], next_cursor
@@ -0,0 +1,30 @@
+import asyncio
+
+class AsyncRateLimiter:
+    """
+    Spaces calls evenly so that at most `rate` of them start per `period` seconds.
+
+    Callers reserve the next free slot in arrival order, so concurrent
+    coroutines are released first-come first-served without bursting.
+    """
+
+    def __init__(self, rate: float, period: float = 1.0):
+        self.rate = rate
+        self.period = period
+        self._interval = period / rate
+        self._next_slot = 0.0
+
+    async def acquire(self):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self._interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
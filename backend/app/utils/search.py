@@ -0,0 +1,46 @@
+import re
+import unicodedata
+from typing import List, Optional
+
+# Longest prefix stored per term; longer query tokens are cut to this length
+MAX_PREFIX_LENGTH = 20
+
+_SEPARATORS = re.compile(r"[\W_]+")
+
+def normalize(text: Optional[str]) -> str:
+    """Lowercase and strip accents, so "Zoë" and "zoe" share search keys"""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Split normalized text on anything that is not a letter or digit, keeping first-seen order"""
+    tokens: List[str] = []
+    for token in _SEPARATORS.split(normalize(text)):
+        if token and token not in tokens:
+            tokens.append(token)
+    return tokens
+
+def search_terms(*values: Optional[str]) -> List[str]:
+    """Whole normalized words of `values`; exact matches on these rank first"""
+    terms: List[str] = []
+    for value in values:
+        terms.extend(token for token in tokenize(value) if token not in terms)
+    return terms
+
+def edge_ngrams(terms: List[str]) -> List[str]:
+    """Every prefix of every term, up to MAX_PREFIX_LENGTH characters"""
+    keys = {
+        term[:length]
+        for term in terms
+        for length in range(1, min(len(term), MAX_PREFIX_LENGTH) + 1)
+    }
+    return sorted(keys)
+
+def query_tokens(query: Optional[str]) -> List[str]:
+    """Tokens of a search box query, each matched as a prefix against the stored keys"""
+    tokens: List[str] = []
+    for token in tokenize(query):
+        token = token[:MAX_PREFIX_LENGTH]
+        if token not in tokens:
+            tokens.append(token)
+    return tokens
@@ -0,0 +1,38 @@
+from typing import Optional
+
+# Gemini does not ship a local tokenizer; cl100k_base is a close enough
+# approximation for budgeting, and len/4 is used if tiktoken is unavailable.
+_ENCODING_NAME = "cl100k_base"
+_encoding = None
+_encoding_loaded = False
+
+def _get_encoding():
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding(_ENCODING_NAME)
+        except Exception as e:
+            print(f"tiktoken unavailable, estimating tokens from length: {str(e)}")
+            _encoding = None
+        _encoding_loaded = True
+    return _encoding
+
+def count_tokens(text: str) -> int:
+    encoding = _get_encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+def truncate_to_tokens(text: str, max_tokens: int, marker: Optional[str] = " ...[truncated]") -> str:
+    """Cut `text` to at most `max_tokens` tokens, ending with `marker` when shortened"""
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    marker = marker or ""
+    keep = max(max_tokens - count_tokens(marker), 0)
+    encoding = _get_encoding()
+    if encoding is None:
+        return text[:keep * 4] + marker
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:keep]) + marker
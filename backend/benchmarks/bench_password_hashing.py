@@ -0,0 +1,85 @@
+"""
+Login throughput and event-loop latency during a burst of password checks.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_password_hashing
+    python -m benchmarks.bench_password_hashing --logins 200 --rounds 12 --workers 1 2 4 8
+
+Each scenario verifies `--logins` passwords concurrently, as a burst of
+/auth/login requests would, while a probe coroutine stands in for every
+other endpoint: it asks to wake every PROBE_INTERVAL seconds and records
+how late it actually woke. The "inline" row is bcrypt on the event loop
+(the old AuthService behaviour); the other rows use PasswordHasher with
+the given number of worker threads. Logins/s should grow with workers up
+to the number of cores while probe p99 stays in the low milliseconds.
+"""
+import argparse
+import asyncio
+import time
+from typing import Awaitable, Callable, List
+from app.services.password_hasher import PasswordHasher, available_cores
+
+PASSWORD = "correct horse battery staple"
+PROBE_INTERVAL = 0.005
+
+async def probe(stop: asyncio.Event, delays: List[float]):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        started = loop.time()
+        await asyncio.sleep(PROBE_INTERVAL)
+        delays.append(loop.time() - started - PROBE_INTERVAL)
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))]
+
+async def run_scenario(name: str, verify: Callable[[], Awaitable[bool]], logins: int):
+    stop = asyncio.Event()
+    delays: List[float] = []
+    prober = asyncio.create_task(probe(stop, delays))
+    await asyncio.sleep(PROBE_INTERVAL)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(verify() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await prober
+    assert all(results), "password did not verify"
+
+    print(
+        f"{name:>8} {logins / elapsed:>10.1f} "
+        f"{percentile(delays, 0.5) * 1000:>10.1f} {percentile(delays, 0.99) * 1000:>10.1f} "
+        f"{max(delays) * 1000:>10.1f}"
+    )
+
+async def main(args: argparse.Namespace):
+    cores = available_cores()
+    workers = args.workers or sorted({2 ** i for i in range(cores.bit_length())} | {cores})
+    print(f"bcrypt rounds={args.rounds} logins per scenario={args.logins} available cores={cores}")
+    print(f"{'workers':>8} {'logins/s':>10} {'probe p50':>10} {'probe p99':>10} {'probe max':>10}  (ms)")
+
+    inline = PasswordHasher(workers=1, rounds=args.rounds)
+    hashed = inline.context.hash(PASSWORD)
+
+    async def verify_inline() -> bool:
+        return inline.context.verify(PASSWORD, hashed)
+
+    await run_scenario("inline", verify_inline, args.logins)
+
+    for count in workers:
+        hasher = PasswordHasher(workers=count, rounds=args.rounds)
+        try:
+            await run_scenario(str(count), lambda: hasher.verify(PASSWORD, hashed), args.logins)
+        finally:
+            hasher.shutdown()
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_password_hashing", description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--logins", type=int, default=100, help="Concurrent password checks per scenario")
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost factor")
+    parser.add_argument("--workers", type=int, nargs="+", help="Worker counts to try (default: powers of two up to the core count)")
+    return parser
+
+if __name__ == "__main__":
+    asyncio.run(main(build_parser().parse_args()))
@@ -3,6 +3,10 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from backend.app.core.config import get_settings
 from backend.app.utils.db import init_mongodb, close_mongodb_connection
+from app.services.http_client import init_http_client, close_http_client
+from app.services.analysis_queue import start_analysis_queue, stop_analysis_queue
+from app.services.password_hasher import password_hasher
+from app.core.registry import components
 from backend.app.api.v1.routes import api_router
 
 # Get settings
@@ -12,9 +16,24 @@ settings = get_settings()
 async def lifespan(app: FastAPI):
     # Startup: Initialize MongoDB connection
     await init_mongodb()
+    # Startup: Open the shared pooled HTTP client for external knowledge APIs
+    await init_http_client()
+    # Startup: Start background analysis workers and resume persisted jobs
+    await start_analysis_queue()
+    # Startup: Build agents and LLM clients in the background; requests do not wait for it
+    if settings.PREWARM_COMPONENTS:
+        components.start_prewarm(settings.PREWARM_COMPONENTS)
     yield
+    # Shutdown: Stop any prewarm still in progress
+    await components.stop_prewarm()
+    # Shutdown: Stop analysis workers, returning in-flight jobs to the queue
+    await stop_analysis_queue()
     # Shutdown: Close MongoDB connection
     await close_mongodb_connection()
+    # Shutdown: Drain and close pooled HTTP connections
+    await close_http_client()
+    # Shutdown: Let in-flight password hashes finish and stop the hashing threads
+    password_hasher.shutdown()
 
 # Initialize FastAPI app
 app = FastAPI(
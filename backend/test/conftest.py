@@ -0,0 +1,13 @@
+import os
+import sys
+from pathlib import Path
+
+# Models and schemas are imported as backend.app.*, services as app.*
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+# Settings without a default; the tests never reach the services they configure
+for name in (
+    "MONGODB_URL", "MONGODB_DB_NAME", "GEMINI_API_KEY", "OPENFDA_API_KEY",
+    "LANGCHAIN_API_KEY", "GOOGLE_API_BASE", "SECRET_KEY"
+):
+    os.environ.setdefault(name, "test")
@@ -0,0 +1,17 @@
+import asyncio
+import pytest
+from beanie import PydanticObjectId
+from app.services.db.analysis_service import AnalysisService, _case_filter
+
+@pytest.mark.parametrize("case_id", ["not-an-id", "123", "", "65f1c0ffee0ddba11ad0beefz"])
+def test_malformed_case_ids_match_no_case(case_id):
+    assert _case_filter(case_id) is None
+    # Answered without a database round trip, so the endpoints return 404
+    assert asyncio.run(AnalysisService.get_analysis_by_case_id(case_id)) is None
+    assert asyncio.run(AnalysisService.restart(case_id)) == (None, None)
+    assert asyncio.run(AnalysisService.clear(case_id)) is False
+    assert asyncio.run(AnalysisService.is_current_job(case_id, PydanticObjectId())) is False
+
+def test_case_filter_matches_on_object_id():
+    case_id = PydanticObjectId()
+    assert _case_filter(str(case_id)) == {"_id": case_id}
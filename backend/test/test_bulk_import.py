@@ -0,0 +1,80 @@
+import asyncio
+import json
+from app.services.bulk_import import fhir_patient_to_record, iter_fhir_bundle, iter_ndjson
+
+def byte_chunks(data: bytes, size: int):
+    async def chunks():
+        for i in range(0, len(data), size):
+            yield data[i:i + size]
+    return chunks()
+
+def collect(records):
+    async def main():
+        return [record async for record in records]
+    return asyncio.run(main())
+
+PATIENT = {
+    "resourceType": "Patient",
+    "name": [{"use": "nickname", "given": ["Zo"]}, {"use": "official", "family": "Müller", "given": ["Zoë", "Anne"]}],
+    "telecom": [{"system": "phone", "value": "+44 20 7946 0000"}, {"system": "email", "value": "zoe@example.org"}],
+    "birthDate": "1990-04-01",
+    "gender": "female",
+    "address": [{"line": ["1 High St"], "city": "Leeds", "postalCode": "LS1"}]
+}
+
+def test_bundle_entries_split_across_chunks_are_yielded_in_order():
+    bundle = json.dumps({
+        "resourceType": "Bundle",
+        "type": "collection",
+        "entry": [{"resource": {**PATIENT, "id": str(i)}} for i in range(3)] + [{"fullUrl": "no resource"}]
+    }, ensure_ascii=False).encode("utf-8")
+    # Small chunks split multi-byte characters as well as entries
+    for size in (1, 5, 64):
+        records = collect(iter_fhir_bundle(byte_chunks(bundle, size)))
+        assert [number for number, _ in records] == [1, 2, 3, 4]
+        assert [resource["id"] for _, resource in records[:3]] == ["0", "1", "2"]
+        assert records[0][1]["name"][1]["family"] == "Müller"
+        assert records[3][1] is None
+
+def failures(body: bytes):
+    return [(number, str(error)) for number, error in collect(iter_fhir_bundle(byte_chunks(body, 8)))
+            if isinstance(error, ValueError)]
+
+def test_non_bundle_resources_are_rejected():
+    result = failures(json.dumps({"resourceType": "Patient", "entry": []}).encode())
+    assert len(result) == 1 and result[0][0] == 0
+    assert "Patient" in result[0][1]
+
+def test_truncated_or_non_json_bodies_are_rejected():
+    for body in (b'{"resourceType": "Bundle", "entry": [{"resource": {}}', b"not json", b"", b"[1, 2]"):
+        result = failures(body)
+        assert len(result) == 1 and result[0][0] == 0
+        assert "not a complete FHIR Bundle" in result[0][1]
+
+def test_bundles_without_resource_type_or_entries_are_rejected():
+    assert "resourceType is missing" in failures(b'{"entry": []}')[0][1]
+    assert "no entry array" in failures(b'{"resourceType": "Bundle", "type": "collection"}')[0][1]
+
+def test_empty_entry_array_is_a_valid_empty_import():
+    assert collect(iter_fhir_bundle(byte_chunks(b'{"resourceType": "Bundle", "entry": []}', 4))) == []
+
+def test_ndjson_lines_split_across_chunks():
+    data = '{"first_name": "Zoë"}\n\n{"first_name": "Ann"\nnot json\n{"first_name": "Bo"}'.encode("utf-8")
+    records = collect(iter_ndjson(byte_chunks(data, 3)))
+    assert [number for number, _ in records] == [1, 3, 4, 5]
+    assert records[0][1] == {"first_name": "Zoë"}
+    assert isinstance(records[1][1], ValueError)
+    assert isinstance(records[2][1], ValueError)
+    assert records[3][1] == {"first_name": "Bo"}
+
+def test_fhir_patient_mapping():
+    assert fhir_patient_to_record(PATIENT) == {
+        "first_name": "Zoë Anne",
+        "last_name": "Müller",
+        "email": "zoe@example.org",
+        "date_of_birth": "1990-04-01",
+        "gender": "female",
+        "phone_number": "+44 20 7946 0000",
+        "address": "1 High St, Leeds, LS1"
+    }
+    assert fhir_patient_to_record({"resourceType": "Patient"})["first_name"] is None
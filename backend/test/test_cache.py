@@ -0,0 +1,105 @@
+import asyncio
+from app.services.cache import TieredCache
+
+class MemoryTier:
+    """Shared tier kept in a dict, standing in for the Redis/disk tier of another process"""
+
+    def __init__(self):
+        self.entries = {}
+
+    async def get(self, key):
+        return self.entries.get(key)
+
+    async def set(self, key, entry):
+        self.entries[key] = entry
+
+class Upstream:
+    def __init__(self, values=None, error=None):
+        self.values = list(values or ["v1", "v2", "v3"])
+        self.error = error
+        self.calls = 0
+
+    async def fetch(self):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        if self.error is not None:
+            raise self.error
+        return self.values[self.calls - 1]
+
+def test_fresh_entries_are_served_without_fetching():
+    cache, upstream = TieredCache("test", ttl=60), Upstream()
+
+    async def main():
+        return [await cache.get_or_fetch("q", upstream.fetch) for _ in range(3)]
+
+    assert asyncio.run(main()) == ["v1", "v1", "v1"]
+    assert upstream.calls == 1
+    assert cache.counters["misses"] == 1
+    assert cache.counters["local_hits"] == 2
+
+def test_concurrent_misses_share_one_fetch():
+    cache, upstream = TieredCache("test", ttl=60), Upstream()
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_fetch("q", upstream.fetch) for _ in range(10)))
+
+    assert asyncio.run(main()) == ["v1"] * 10
+    assert upstream.calls == 1
+    assert cache.counters["coalesced_misses"] == 9
+
+def test_failed_fetch_reaches_every_waiter_and_is_not_cached():
+    cache = TieredCache("test", ttl=60)
+    failing = Upstream(error=RuntimeError("upstream down"))
+
+    async def main():
+        results = await asyncio.gather(
+            *(cache.get_or_fetch("q", failing.fetch) for _ in range(3)),
+            return_exceptions=True
+        )
+        return results, await cache.get_or_fetch("q", Upstream(["recovered"]).fetch)
+
+    results, retried = asyncio.run(main())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert failing.calls == 1
+    assert retried == "recovered"
+
+def test_stale_entry_is_served_while_one_background_refresh_replaces_it():
+    cache, upstream = TieredCache("test", ttl=60, stale_ttl=60), Upstream()
+
+    async def main():
+        await cache.get_or_fetch("q", upstream.fetch)
+        cache.local[cache.key("q")].fresh_until = 0
+        stale = await asyncio.gather(*(cache.get_or_fetch("q", upstream.fetch) for _ in range(3)))
+        await asyncio.gather(*cache._tasks)
+        return stale, await cache.get_or_fetch("q", upstream.fetch)
+
+    stale, refreshed = asyncio.run(main())
+    assert stale == ["v1", "v1", "v1"]
+    assert refreshed == "v2"
+    assert upstream.calls == 2
+    assert cache.counters["stale_hits"] == 3
+    assert cache.counters["refreshes"] == 1
+
+def test_expired_entry_is_fetched_again():
+    cache, upstream = TieredCache("test", ttl=60, stale_ttl=60), Upstream()
+
+    async def main():
+        await cache.get_or_fetch("q", upstream.fetch)
+        entry = cache.local[cache.key("q")]
+        entry.fresh_until = entry.stale_until = 0
+        return await cache.get_or_fetch("q", upstream.fetch)
+
+    assert asyncio.run(main()) == "v2"
+    assert cache.counters["misses"] == 2
+
+def test_other_processes_are_served_from_the_shared_tier():
+    shared, upstream = MemoryTier(), Upstream()
+    first = TieredCache("test", ttl=60, shared_tier=shared)
+    second = TieredCache("test", ttl=60, shared_tier=shared)
+
+    async def main():
+        return await first.get_or_fetch("q", upstream.fetch), await second.get_or_fetch("q", upstream.fetch)
+
+    assert asyncio.run(main()) == ("v1", "v1")
+    assert upstream.calls == 1
+    assert second.counters["shared_hits"] == 1
@@ -0,0 +1,62 @@
+import pytest
+from app.utils.json_repair import extract_json_object, is_json_object, parse_json_lenient, parse_json_object
+
+def test_valid_json_is_parsed_unchanged():
+    assert parse_json_lenient('{"a": [1, 2.5, "x"], "b": null}') == {"a": [1, 2.5, "x"], "b": None}
+    assert parse_json_lenient("[1, 2]") == [1, 2]
+
+def test_markdown_fences_and_surrounding_prose_are_ignored():
+    text = 'Here is the analysis:\n```json\n{"diagnoses": [{"name": "Asthma"}]}\n```\nLet me know.'
+    assert parse_json_lenient(text) == {"diagnoses": [{"name": "Asthma"}]}
+
+def test_trailing_commas_are_dropped():
+    assert parse_json_lenient('{"a": [1, 2,], "b": {"c": 3,},}') == {"a": [1, 2], "b": {"c": 3}}
+
+def test_python_literals_are_translated():
+    assert parse_json_lenient('{"urgent": True, "stable": False, "notes": None}') == {
+        "urgent": True, "stable": False, "notes": None
+    }
+
+def test_literals_inside_strings_are_left_alone():
+    assert parse_json_lenient('{"note": "None reported, True story",}') == {"note": "None reported, True story"}
+
+def test_raw_newlines_inside_strings_are_escaped():
+    assert parse_json_lenient('{"note": "line one\nline two"}') == {"note": "line one\nline two"}
+
+def test_truncated_output_is_closed():
+    assert parse_json_lenient('{"diagnoses": [{"name": "Asthma", "confidence": 0.8}, {"name": "Bronch') == {
+        "diagnoses": [{"name": "Asthma", "confidence": 0.8}, {"name": "Bronch"}]
+    }
+
+def test_truncated_member_is_dropped_when_it_cannot_be_closed():
+    assert parse_json_lenient('{"a": 1, "b": {"c": [1, 2], "d":') == {"a": 1, "b": {"c": [1, 2]}}
+    assert parse_json_lenient('```json\n{"a": [1, 2], "b": tr') == {"a": [1, 2]}
+
+@pytest.mark.parametrize("text", ["", "I could not produce an analysis.", None, "]"])
+def test_unrecoverable_output_raises_value_error(text):
+    with pytest.raises(ValueError):
+        parse_json_lenient(text)
+
+def test_strict_parsing_accepts_only_well_formed_objects():
+    assert parse_json_object('{"a": [1, 2]}') == {"a": [1, 2]}
+    assert is_json_object(' {"a": 1}\n')
+    for text in ['```json\n{"a": 1}\n```', '{"a": 1,}', '{"a": [1, 2', "[1, 2]", "no json here", "", None]:
+        assert parse_json_object(text) is None
+        assert not is_json_object(text)
+
+def test_extract_json_object_returns_the_last_object_with_the_required_key():
+    transcript = (
+        'diagnostician: {"diagnoses": ["flu"]}\n'
+        'safety_expert: {"warnings": []}\n'
+        'treatment_planner: {"diagnoses": ["flu", "covid"], "plan": "rest"}\n'
+        'researcher: {"references": [1]}'
+    )
+    assert extract_json_object(transcript, "diagnoses") == {"diagnoses": ["flu", "covid"], "plan": "rest"}
+    assert extract_json_object(transcript) == {"references": [1]}
+    assert extract_json_object(transcript, "missing") is None
+    assert extract_json_object("no objects at all", "diagnoses") is None
+
+def test_extract_json_object_repairs_a_truncated_final_object():
+    transcript = 'diagnostician: {"notes": "draft"}\ntreatment_planner: {"diagnoses": ["flu"], "plan": "re'
+    assert extract_json_object(transcript, "diagnoses") == {"diagnoses": ["flu"], "plan": "re"}
+    assert extract_json_object(transcript, "diagnoses", repair=False) is None
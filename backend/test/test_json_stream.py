@@ -0,0 +1,80 @@
+import json
+from app.utils.json_stream import JSONArrayStreamParser
+
+ANALYSIS = {
+    "summary": "a [bracket] and a \"quoted\" {brace}",
+    "diagnoses": [
+        {"name": "Asthma", "confidence": 0.8, "evidence": ["wheeze", "[night] cough"]},
+        {"name": "Café \"au lait\" spots", "nested": {"diagnoses": [1, 2]}},
+        "free text diagnosis"
+    ],
+    "key_findings": ["x"]
+}
+
+def feed_all(parser, chunks):
+    completed = []
+    for chunk in chunks:
+        completed.extend(parser.feed(chunk))
+    return completed
+
+def test_elements_split_across_chunks_are_emitted_once_complete():
+    text = json.dumps(ANALYSIS)
+    parser = JSONArrayStreamParser("diagnoses")
+    emitted_at = []
+    for i, ch in enumerate(text):
+        for element in parser.feed(ch):
+            emitted_at.append((i, element))
+    assert [element for _, element in emitted_at] == ANALYSIS["diagnoses"]
+    # Each element is available as soon as it closes, before the document ends
+    first_end = text.index("}", text.index("Asthma"))
+    assert emitted_at[0][0] == first_end
+    assert emitted_at[-1][0] < text.index("key_findings")
+    assert parser.complete
+
+def test_chunk_boundaries_do_not_change_the_result():
+    text = json.dumps(ANALYSIS)
+    expected = JSONArrayStreamParser("diagnoses").feed(text)
+    for size in (1, 2, 3, 7, 64):
+        chunks = [text[i:i + size] for i in range(0, len(text), size)]
+        assert feed_all(JSONArrayStreamParser("diagnoses"), chunks) == expected
+
+def test_surrounding_code_fences_are_ignored():
+    body = json.dumps({"diagnoses": [{"name": "Flu"}]})
+    parser = JSONArrayStreamParser("diagnoses")
+    completed = feed_all(parser, ["```json\n", body[:10], body[10:], "\n```"])
+    assert completed == [{"name": "Flu"}]
+    assert parser.document() == body
+
+def test_only_the_top_level_key_is_streamed():
+    parser = JSONArrayStreamParser("diagnoses")
+    completed = parser.feed(json.dumps({"other": {"diagnoses": [{"name": "no"}]}, "diagnoses": [{"name": "yes"}]}))
+    assert completed == [{"name": "yes"}]
+
+def test_document_is_unavailable_until_the_object_closes():
+    parser = JSONArrayStreamParser("diagnoses")
+    parser.feed('{"diagnoses": [{"name": "Flu"}')
+    assert parser.document() is None
+    assert not parser.complete
+    assert parser.array_found
+
+def test_top_level_strings_and_missing_array_are_reported():
+    parser = JSONArrayStreamParser("entry")
+    parser.feed('{"resourceType": "Bund')
+    assert parser.top_level_strings == {}
+    parser.feed('le", "type": "collection", "entry": {"not": "an array"}}')
+    assert parser.top_level_strings == {"resourceType": "Bundle", "type": "collection"}
+    assert parser.complete
+    assert not parser.array_found
+
+def test_discarding_scanned_text_keeps_memory_bounded():
+    entries = [{"resource": {"id": str(i), "note": "x" * 100}} for i in range(500)]
+    text = json.dumps({"resourceType": "Bundle", "entry": entries})
+    parser = JSONArrayStreamParser("entry", retain_text=False)
+    completed, longest = [], 0
+    for i in range(0, len(text), 37):
+        completed.extend(parser.feed(text[i:i + 37]))
+        longest = max(longest, len(parser.text))
+    assert completed == entries
+    # Never more than one element plus a chunk is held
+    assert longest < 200 + 37
+    assert parser.document() is None
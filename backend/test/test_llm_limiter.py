@@ -0,0 +1,148 @@
+import asyncio
+import pytest
+from app.services.ml.llm_limiter import AdaptiveLLMLimiter, is_rate_limited
+from app.utils.rate_limit import AsyncRateLimiter
+
+class ResourceExhausted(Exception):
+    """Named like the Gemini client's quota error"""
+
+def make_limiter(limit=4, min_limit=1, max_limit=16, max_attempts=4, latency_target=30.0):
+    limiter = AdaptiveLLMLimiter()
+    limiter.limit = float(limit)
+    limiter.min_limit, limiter.max_limit = min_limit, max_limit
+    limiter.max_attempts = max_attempts
+    limiter.latency_target = latency_target
+    limiter.backoff = 0.001
+    limiter._rate = AsyncRateLimiter(100000, period=1.0)
+    return limiter
+
+def flaky(failures, error=None):
+    """A call that is rate limited `failures` times, then succeeds"""
+    state = {"calls": 0}
+
+    async def call():
+        state["calls"] += 1
+        if state["calls"] <= failures:
+            raise error or ResourceExhausted("429 Resource has been exhausted")
+        return "ok"
+
+    return call, state
+
+def test_rate_limit_errors_are_recognised():
+    assert is_rate_limited(ResourceExhausted("quota"))
+    assert is_rate_limited(RuntimeError("HTTP 429 Too Many Requests"))
+    assert not is_rate_limited(RuntimeError("HTTP 500"))
+
+def test_throttled_call_halves_the_limit_and_is_retried():
+    limiter = make_limiter(limit=8)
+    call, state = flaky(2)
+    assert asyncio.run(limiter.run(call)) == "ok"
+    assert state["calls"] == 3
+    # Halved twice, then one additive step for the success
+    assert limiter.limit == pytest.approx(2 + 1 / 2)
+    assert limiter.counters["throttled"] == 2
+    assert limiter.counters["retries"] == 2
+    assert limiter.stats()["in_flight"] == 0
+
+def test_limit_recovers_additively_after_backoff():
+    limiter = make_limiter(limit=8)
+    call, _ = flaky(1)
+    asyncio.run(limiter.run(call))
+    assert int(limiter.limit) == 4
+
+    async def succeed():
+        return "ok"
+
+    async def main():
+        for _ in range(20):
+            await limiter.run(succeed)
+
+    asyncio.run(main())
+    # Roughly one slot per window of `limit` successes
+    assert 7 <= int(limiter.limit) < 8
+
+def test_limit_stays_within_bounds():
+    limiter = make_limiter(limit=2, min_limit=2, max_limit=3)
+    call, _ = flaky(3)
+    asyncio.run(limiter.run(call))
+    assert limiter.limit >= 2
+
+    async def succeed():
+        return "ok"
+
+    async def main():
+        for _ in range(50):
+            await limiter.run(succeed)
+
+    asyncio.run(main())
+    assert limiter.limit == 3
+
+def test_slow_calls_shrink_the_limit():
+    limiter = make_limiter(limit=10, latency_target=0.001)
+
+    async def slow():
+        await asyncio.sleep(0.01)
+        return "ok"
+
+    asyncio.run(limiter.run(slow))
+    assert limiter.limit == pytest.approx(9.0)
+    assert limiter.counters["slow_calls"] == 1
+
+def test_gives_up_after_max_attempts():
+    limiter = make_limiter(max_attempts=3)
+    call, state = flaky(10)
+    with pytest.raises(ResourceExhausted):
+        asyncio.run(limiter.run(call))
+    assert state["calls"] == 3
+    assert limiter.stats()["in_flight"] == 0
+
+def test_other_errors_are_not_retried():
+    limiter = make_limiter(limit=4)
+    call, state = flaky(1, error=ValueError("bad request"))
+    with pytest.raises(ValueError):
+        asyncio.run(limiter.run(call))
+    assert state["calls"] == 1
+    assert limiter.limit == 4
+
+def test_calls_beyond_the_limit_queue_in_arrival_order():
+    limiter = make_limiter(limit=2)
+    running, peak, started = [0], [0], []
+
+    async def call(index):
+        started.append(index)
+        running[0] += 1
+        peak[0] = max(peak[0], running[0])
+        await asyncio.sleep(0.01)
+        running[0] -= 1
+        return index
+
+    async def main():
+        return await asyncio.gather(*(limiter.run(lambda i=i: call(i)) for i in range(6)))
+
+    assert asyncio.run(main()) == list(range(6))
+    assert peak[0] == 2
+    assert started == list(range(6))
+
+def test_stream_is_retried_only_before_the_first_chunk():
+    limiter = make_limiter()
+    attempts = []
+
+    def make_stream(fail_after):
+        async def stream():
+            attempts.append(fail_after)
+            for i in range(3):
+                if i == fail_after and len(attempts) == 1:
+                    raise ResourceExhausted("429")
+                yield i
+        return stream
+
+    async def collect(stream):
+        return [chunk async for chunk in limiter.stream(stream)]
+
+    assert asyncio.run(collect(make_stream(0))) == [0, 1, 2]
+    assert len(attempts) == 2
+
+    attempts.clear()
+    with pytest.raises(ResourceExhausted):
+        asyncio.run(collect(make_stream(1)))
+    assert len(attempts) == 1
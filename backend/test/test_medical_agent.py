@@ -0,0 +1,80 @@
+import asyncio
+from app.core.agents.medical_agent import MedicalAgent
+from app.core.analysis_context import analysis_scope, memoized_tool
+from app.core.degradation import collect_degradations
+
+class FakeKnowledge:
+    def __init__(self):
+        self.calls = []
+
+    async def _lookup(self, source, query):
+        self.calls.append((source, query))
+        await asyncio.sleep(0.01)
+        return [f"{source}: {query}"]
+
+    @memoized_tool("pubmed")
+    async def search_pubmed(self, query):
+        return await self._lookup("pubmed", query)
+
+    @memoized_tool("clinicaltrials")
+    async def search_clinical_trials(self, query):
+        return await self._lookup("clinicaltrials", query)
+
+    @memoized_tool("openfda")
+    async def search_drug_info(self, query):
+        return await self._lookup("openfda", query)
+
+def make_agent(knowledge, timeout=1.0):
+    # Skips the LLM clients; only the evidence helpers are exercised
+    agent = MedicalAgent.__new__(MedicalAgent)
+    agent._evidence_sources = lambda: [
+        ("literature", knowledge.search_pubmed, timeout),
+        ("clinical_trials", knowledge.search_clinical_trials, timeout),
+        ("drug_information", knowledge.search_drug_info, timeout)
+    ]
+    return agent
+
+def test_prefetched_lookups_are_joined_and_counted_once():
+    knowledge = FakeKnowledge()
+    agent = make_agent(knowledge)
+
+    async def main():
+        with analysis_scope() as context:
+            agent._prefetch_evidence({"name": "Asthma"})
+            evidence = await agent._gather_evidence([{"name": "Asthma"}])
+        return context, evidence
+
+    context, evidence = asyncio.run(main())
+    assert sorted(knowledge.calls) == [("clinicaltrials", "Asthma"), ("openfda", "Asthma"), ("pubmed", "Asthma")]
+    assert evidence == {
+        "literature": ["pubmed: Asthma"],
+        "clinical_trials": ["clinicaltrials: Asthma"],
+        "drug_information": ["openfda: Asthma"]
+    }
+    # One prefetch and one join per source: three calls saved, not six
+    assert context.report() == {"tool_calls": 6, "unique_calls": 3, "saved_calls": 3}
+
+def test_duplicate_diagnoses_share_lookups():
+    knowledge = FakeKnowledge()
+    agent = make_agent(knowledge)
+
+    async def main():
+        with analysis_scope() as context:
+            await agent._gather_evidence([{"name": "Asthma"}, {"name": "Asthma"}])
+        return context
+
+    assert asyncio.run(main()).report() == {"tool_calls": 6, "unique_calls": 3, "saved_calls": 3}
+    assert len(knowledge.calls) == 3
+
+def test_timed_out_lookup_is_dropped_and_reported():
+    knowledge = FakeKnowledge()
+    agent = make_agent(knowledge, timeout=0.001)
+
+    async def main():
+        with collect_degradations() as reasons:
+            evidence = await agent._gather_evidence([{"name": "Asthma"}])
+        return evidence, reasons
+
+    evidence, reasons = asyncio.run(main())
+    assert evidence == {"literature": [], "clinical_trials": [], "drug_information": []}
+    assert len(reasons) == 3
@@ -0,0 +1,113 @@
+import base64
+from datetime import datetime, timedelta
+import pytest
+from bson import ObjectId
+from app.utils.pagination import (
+    KEYSET_SORT, _page_query, after_cursor, decode_cursor, decode_ranked_cursor,
+    encode_cursor, encode_ranked_cursor
+)
+
+def matches(document, query):
+    """Evaluate the subset of MongoDB query syntax that the cursor filters use"""
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(matches(document, q) for q in condition):
+                return False
+        elif key == "$and":
+            if not all(matches(document, q) for q in condition):
+                return False
+        elif isinstance(condition, dict):
+            if not document[key] < condition["$lt"]:
+                return False
+        elif document[key] != condition:
+            return False
+    return True
+
+def keyset_pages(documents, limit):
+    """Page through `documents` the way paginate does, following next cursors"""
+    ordered = sorted(documents, key=lambda d: tuple(d[field] for field, _ in KEYSET_SORT), reverse=True)
+    pages, cursor = [], None
+    while True:
+        found = [d for d in ordered if matches(d, _page_query(None, cursor))][:limit + 1]
+        pages.append(found[:limit])
+        if len(found) <= limit:
+            return pages
+        cursor = encode_cursor(found[limit - 1]["created_at"], found[limit - 1]["_id"])
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 3, 1, 12, 30, 15, 123456)
+    document_id = ObjectId()
+    cursor = encode_cursor(created_at, document_id)
+    assert decode_cursor(cursor) == (created_at, document_id)
+
+def test_cursor_is_url_safe_and_unpadded():
+    for _ in range(20):
+        cursor = encode_cursor(datetime.utcnow(), ObjectId())
+        assert "=" not in cursor
+        assert not set(cursor) & set("+/")
+
+def test_ranked_cursor_round_trip():
+    document_id = ObjectId()
+    assert decode_ranked_cursor(encode_ranked_cursor(7, document_id)) == (7, document_id)
+
+def _raw(payload: bytes) -> str:
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "not a cursor!",
+    "é",
+    _raw(b"\xff\xfe"),
+    _raw(b"not json"),
+    _raw(b"[1, 2]"),
+    _raw(b'{"id": "65f1c0ffee0ddba11ad0beef"}'),
+    _raw(b'{"t": "2024-03-01T12:30:15"}'),
+    _raw(b'{"t": "yesterday", "id": "65f1c0ffee0ddba11ad0beef"}'),
+    _raw(b'{"t": "2024-03-01T12:30:15", "id": "not-an-object-id"}'),
+    _raw(b'{"t": 5, "id": "65f1c0ffee0ddba11ad0beef"}')
+])
+def test_malformed_cursors_are_rejected(cursor):
+    with pytest.raises(ValueError, match="Invalid pagination cursor"):
+        decode_cursor(cursor)
+    with pytest.raises(ValueError):
+        after_cursor(cursor)
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor!",
+    _raw(b'{"s": "high", "id": "65f1c0ffee0ddba11ad0beef"}'),
+    _raw(b'{"s": 3}'),
+    encode_cursor(datetime(2024, 1, 1), ObjectId())
+])
+def test_malformed_ranked_cursors_are_rejected(cursor):
+    with pytest.raises(ValueError, match="Invalid pagination cursor"):
+        decode_ranked_cursor(cursor)
+
+def test_after_cursor_breaks_created_at_ties_on_id():
+    created_at = datetime(2024, 3, 1)
+    document_id = ObjectId()
+    assert after_cursor(encode_cursor(created_at, document_id)) == {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "_id": {"$lt": document_id}}
+    ]}
+
+def test_page_query_combines_the_caller_query_with_the_cursor():
+    cursor = encode_cursor(datetime(2024, 3, 1), ObjectId())
+    assert _page_query(None, None) == {}
+    assert _page_query({"status": "active"}, None) == {"status": "active"}
+    assert _page_query(None, cursor) == after_cursor(cursor)
+    assert _page_query({"status": "active"}, cursor) == {"$and": [{"status": "active"}, after_cursor(cursor)]}
+
+def test_paging_visits_documents_sharing_a_timestamp_exactly_once():
+    start = datetime(2024, 3, 1)
+    # Bursts of documents created in the same millisecond, straddling page boundaries
+    documents = [
+        {"_id": ObjectId(), "created_at": start + timedelta(milliseconds=i // 4)}
+        for i in range(23)
+    ]
+    pages = keyset_pages(documents, limit=5)
+    seen = [d["_id"] for page in pages for d in page]
+    assert len(seen) == len(documents)
+    assert set(seen) == {d["_id"] for d in documents}
+    assert all(len(page) == 5 for page in pages[:-1])
+    ordered = [(d["created_at"], d["_id"]) for page in pages for d in page]
+    assert ordered == sorted(ordered, reverse=True)
@@ -0,0 +1,88 @@
+import asyncio
+import threading
+import time
+import types
+from app.services.password_hasher import PasswordHasher, available_cores
+
+# The minimum bcrypt cost keeps the tests fast
+ROUNDS = 4
+
+def test_available_cores_is_positive():
+    assert available_cores() >= 1
+
+def test_hash_and_verify_round_trip():
+    hasher = PasswordHasher(workers=2, rounds=ROUNDS)
+
+    async def main():
+        hashed = await hasher.hash("s3cret")
+        return hashed, await hasher.verify("s3cret", hashed), await hasher.verify("wrong", hashed)
+
+    try:
+        hashed, valid, invalid = asyncio.run(main())
+    finally:
+        hasher.shutdown()
+    assert hashed.startswith("$2b$04$")
+    assert valid and not invalid
+
+def test_hashes_below_the_configured_cost_are_replaced_on_verify():
+    weak = PasswordHasher(workers=1, rounds=ROUNDS)
+    strong = PasswordHasher(workers=1, rounds=ROUNDS + 1)
+
+    async def main():
+        old_hash = await weak.hash("s3cret")
+        upgraded = await strong.verify_and_update("s3cret", old_hash)
+        wrong = await strong.verify_and_update("wrong", old_hash)
+        current = await strong.verify_and_update("s3cret", upgraded[1])
+        return upgraded, wrong, current
+
+    try:
+        (valid, new_hash), wrong, current = asyncio.run(main())
+    finally:
+        weak.shutdown()
+        strong.shutdown()
+    assert valid and new_hash.startswith("$2b$05$")
+    assert wrong == (False, None)
+    assert current == (True, None)
+
+def test_hashing_runs_on_a_bounded_worker_pool_off_the_event_loop():
+    hasher = PasswordHasher(workers=2, rounds=ROUNDS)
+    threads, running, peak = set(), [0], [0]
+    lock = threading.Lock()
+
+    def slow_verify(password, hashed):
+        with lock:
+            threads.add(threading.current_thread().name)
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+        return True
+
+    hasher.context = types.SimpleNamespace(verify=slow_verify)
+
+    async def main():
+        loop_thread = threading.current_thread().name
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.005)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        results = await asyncio.gather(*(hasher.verify("p", "h") for _ in range(6)))
+        task.cancel()
+        return loop_thread, results, ticks
+
+    try:
+        loop_thread, results, ticks = asyncio.run(main())
+    finally:
+        hasher.shutdown()
+    assert all(results)
+    assert loop_thread not in threads
+    assert all(name.startswith("password-hash") for name in threads)
+    assert peak[0] == 2
+    # The loop kept running while the checks were in progress
+    assert ticks >= 5
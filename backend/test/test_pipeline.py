@@ -0,0 +1,220 @@
+import asyncio
+import pytest
+from app.core.agents.pipeline import Stage, StageCache, StageFailedError, StagePipeline
+from app.core.degradation import report_degraded
+
+def run(pipeline, inputs, **kwargs):
+    return asyncio.run(pipeline.run(inputs, **kwargs))
+
+def counting(func):
+    """Wrap a stage function, counting how often it runs"""
+    def wrapper(**kwargs):
+        wrapper.calls += 1
+        return func(**kwargs)
+    wrapper.calls = 0
+    return wrapper
+
+def test_stages_receive_their_dependencies_and_publish_under_their_name():
+    pipeline = StagePipeline([
+        Stage("total", lambda doubled, tripled: doubled + tripled, requires=("doubled", "tripled")),
+        Stage("doubled", lambda x: x * 2, requires=("x",)),
+        Stage("tripled", lambda x: x * 3, requires=("x",))
+    ])
+    result = run(pipeline, {"x": 2})
+    assert result.outputs == {"x": 2, "doubled": 4, "tripled": 6, "total": 10}
+    assert {name: t["status"] for name, t in result.timings.items()} == {
+        "doubled": "completed", "tripled": "completed", "total": "completed"
+    }
+    assert all("duration_ms" in t for t in result.timings.values())
+
+def test_independent_stages_run_concurrently():
+    async def main():
+        a_started, b_started = asyncio.Event(), asyncio.Event()
+
+        async def a(x):
+            a_started.set()
+            await b_started.wait()
+            return "a"
+
+        async def b(x):
+            b_started.set()
+            await a_started.wait()
+            return "b"
+
+        # Each branch waits for the other to start, so running them one after
+        # the other would never finish
+        pipeline = StagePipeline([Stage("a", a, requires=("x",)), Stage("b", b, requires=("x",))])
+        return await asyncio.wait_for(pipeline.run({"x": 1}), timeout=1)
+
+    assert asyncio.run(main()).outputs["a"] == "a"
+
+def test_on_stage_complete_is_called_and_awaited_for_each_stage():
+    seen = []
+
+    async def on_stage_complete(name, output, completed, total):
+        await asyncio.sleep(0)
+        seen.append((name, output, completed, total))
+
+    pipeline = StagePipeline([
+        Stage("one", lambda x: x + 1, requires=("x",)),
+        Stage("two", lambda one: one + 1, requires=("one",))
+    ])
+    run(pipeline, {"x": 0}, on_stage_complete=on_stage_complete)
+    assert seen == [("one", 1, 1, 2), ("two", 2, 2, 2)]
+
+def test_failing_stage_with_fallback_passes_the_fallback_downstream():
+    def broken(x):
+        raise RuntimeError("upstream down")
+
+    pipeline = StagePipeline([
+        Stage("lookup", broken, requires=("x",), fallback=list),
+        Stage("count", lambda lookup: len(lookup), requires=("lookup",))
+    ])
+    result = run(pipeline, {"x": 1})
+    assert result.outputs["lookup"] == []
+    assert result.outputs["count"] == 0
+    assert result.timings["lookup"]["status"] == "fallback"
+
+def test_failing_stage_without_fallback_raises_and_cancels_running_stages():
+    cancelled = []
+
+    async def slow(x):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    def broken(x):
+        raise KeyError("diagnoses")
+
+    pipeline = StagePipeline([
+        Stage("slow", slow, requires=("x",)),
+        Stage("broken", broken, requires=("x",)),
+        Stage("after", lambda broken: broken, requires=("broken",))
+    ])
+
+    async def main():
+        with pytest.raises(StageFailedError) as raised:
+            await pipeline.run({"x": 1})
+        # Let the cancellation reach the sibling
+        await asyncio.sleep(0)
+        return raised.value
+
+    error = asyncio.run(main())
+    assert error.stage == "broken"
+    assert isinstance(error.error, KeyError)
+    assert cancelled == [True]
+
+def test_duplicate_stage_names_are_rejected():
+    with pytest.raises(ValueError):
+        StagePipeline([Stage("a", lambda: 1), Stage("a", lambda: 2)])
+
+def test_unsatisfiable_dependencies_are_reported():
+    pipeline = StagePipeline([Stage("a", lambda missing: missing, requires=("missing",))])
+    with pytest.raises(ValueError, match="missing"):
+        run(pipeline, {})
+
+def test_input_hash_ignores_key_order_and_changes_with_version():
+    stage = Stage("s", lambda **kwargs: None)
+    assert stage.input_hash({"a": 1, "b": [1, 2]}) == stage.input_hash({"b": [1, 2], "a": 1})
+    assert stage.input_hash({"a": 1}) != stage.input_hash({"a": 2})
+    assert stage.input_hash({"a": 1}) != Stage("s", lambda **kwargs: None, version=2).input_hash({"a": 1})
+    assert stage.input_hash({"a": 1}) != Stage("t", lambda **kwargs: None).input_hash({"a": 1})
+
+def test_reusable_stage_is_skipped_when_its_inputs_are_unchanged():
+    diagnose = counting(lambda case: {"diagnosis": case["complaint"]})
+    stages = [Stage("diagnose", diagnose, requires=("case",), reusable=True)]
+    first_cache = StageCache()
+    first = run(StagePipeline(stages), {"case": {"complaint": "cough"}}, cache=first_cache)
+
+    second_cache = StageCache(first_cache.completed)
+    second = run(StagePipeline(stages), {"case": {"complaint": "cough"}}, cache=second_cache)
+    assert diagnose.calls == 1
+    assert second.outputs["diagnose"] == first.outputs["diagnose"]
+    assert second.timings["diagnose"]["status"] == "reused"
+    assert second_cache.completed == first_cache.completed
+
+    run(StagePipeline(stages), {"case": {"complaint": "fever"}}, cache=StageCache(first_cache.completed))
+    assert diagnose.calls == 2
+
+def test_fingerprint_limits_what_invalidates_a_stage():
+    safety = counting(lambda case: case["medications"])
+    stages = [Stage(
+        "safety", safety, requires=("case",), reusable=True,
+        fingerprint=lambda case: case["medications"]
+    )]
+    cache = StageCache()
+    run(StagePipeline(stages), {"case": {"medications": ["aspirin"], "notes": "a"}}, cache=cache)
+    run(StagePipeline(stages), {"case": {"medications": ["aspirin"], "notes": "b"}}, cache=StageCache(cache.completed))
+    assert safety.calls == 1
+    run(StagePipeline(stages), {"case": {"medications": ["warfarin"], "notes": "b"}}, cache=StageCache(cache.completed))
+    assert safety.calls == 2
+
+def test_non_reusable_stages_always_run_and_are_not_recorded():
+    join = counting(lambda x: x)
+    stages = [Stage("join", join, requires=("x",))]
+    cache = StageCache()
+    run(StagePipeline(stages), {"x": 1}, cache=cache)
+    run(StagePipeline(stages), {"x": 1}, cache=StageCache(cache.completed))
+    assert join.calls == 2
+    assert cache.completed == {}
+
+def test_fallback_outputs_are_not_recorded():
+    def broken(x):
+        raise RuntimeError("timeout")
+
+    cache = StageCache()
+    run(StagePipeline([Stage("evidence", broken, requires=("x",), fallback=dict, reusable=True)]), {"x": 1}, cache=cache)
+    assert cache.completed == {}
+
+def test_degraded_outputs_are_passed_on_but_not_recorded():
+    async def partial_evidence(x):
+        async def lookup():
+            report_degraded("PubMed search failed")
+            return None
+        # Reported from a child task of the stage
+        await asyncio.gather(lookup())
+        return {"literature": []}
+
+    cache = StageCache()
+    result = run(StagePipeline([
+        Stage("evidence", partial_evidence, requires=("x",), reusable=True),
+        Stage("summary", lambda evidence: sorted(evidence), requires=("evidence",))
+    ]), {"x": 1}, cache=cache)
+    assert result.outputs["summary"] == ["literature"]
+    assert result.timings["evidence"]["status"] == "degraded"
+    assert cache.completed == {}
+
+def test_degradation_reports_stay_with_their_stage():
+    def clean(x):
+        return "clean"
+
+    def degraded(x):
+        report_degraded("no consensus")
+        return "partial"
+
+    cache = StageCache()
+    run(StagePipeline([
+        Stage("clean", clean, requires=("x",), reusable=True),
+        Stage("degraded", degraded, requires=("x",), reusable=True)
+    ]), {"x": 1}, cache=cache)
+    assert set(cache.completed) == {"clean"}
+
+def test_record_is_awaited_for_computed_and_reused_outputs():
+    class RecordingCache(StageCache):
+        def __init__(self, previous=None):
+            super().__init__(previous)
+            self.recorded = []
+
+        async def record(self, stage, input_hash, output):
+            await super().record(stage, input_hash, output)
+            self.recorded.append((stage, output))
+
+    stages = [Stage("s", lambda x: x * 10, requires=("x",), reusable=True)]
+    first = RecordingCache()
+    run(StagePipeline(stages), {"x": 1}, cache=first)
+    second = RecordingCache(first.completed)
+    run(StagePipeline(stages), {"x": 1}, cache=second)
+    assert first.recorded == [("s", 10)]
+    assert second.recorded == [("s", 10)]
@@ -0,0 +1,144 @@
+import asyncio
+import copy
+from app.services import auth_service as auth_module
+from app.services.auth_service import AuthService
+from app.services.principal_cache import PrincipalCache, principal_cache
+
+class FakeUser:
+    """Just enough of the User document for the cache and AuthService"""
+
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+        self.saves = 0
+
+    def model_copy(self):
+        return copy.copy(self)
+
+    async def save(self):
+        self.saves += 1
+
+class Store:
+    """Users as the database holds them, counting loads"""
+
+    def __init__(self, *users):
+        self.users = {user.id: user for user in users}
+        self.loads = 0
+
+    async def load(self, user_id):
+        self.loads += 1
+        await asyncio.sleep(0)
+        user = self.users.get(user_id)
+        return copy.copy(user) if user else None
+
+def make_user(**fields):
+    return FakeUser(**{
+        "id": "u1", "hashed_password": "old-hash", "is_active": True,
+        "reset_password_token": "token", "two_factor_enabled": False, **fields
+    })
+
+def test_users_are_loaded_once_and_handed_out_as_copies():
+    cache, store = PrincipalCache(), Store(make_user())
+
+    async def main():
+        first = await cache.get("u1", store.load)
+        first.is_active = False
+        return await cache.get("u1", store.load)
+
+    assert asyncio.run(main()).is_active
+    assert store.loads == 1
+
+def test_missing_users_are_not_cached():
+    cache, store = PrincipalCache(), Store()
+
+    async def main():
+        return [await cache.get("u1", store.load) for _ in range(2)]
+
+    assert asyncio.run(main()) == [None, None]
+    assert store.loads == 2
+
+def test_invalidate_forces_a_reload():
+    cache, store = PrincipalCache(), Store(make_user())
+
+    async def main():
+        await cache.get("u1", store.load)
+        store.users["u1"].is_active = False
+        cache.invalidate("u1")
+        return await cache.get("u1", store.load)
+
+    assert not asyncio.run(main()).is_active
+    assert store.loads == 2
+
+def test_load_in_flight_during_invalidation_is_not_cached():
+    cache, store = PrincipalCache(), Store(make_user())
+
+    async def main():
+        lookup = asyncio.ensure_future(cache.get("u1", store.load))
+        await asyncio.sleep(0)
+        # The user changes while the lookup is still reading the old record
+        cache.invalidate("u1")
+        await lookup
+        await cache.get("u1", store.load)
+
+    asyncio.run(main())
+    assert store.loads == 2
+
+def test_zero_ttl_disables_caching():
+    cache, store = PrincipalCache(), Store(make_user())
+    cache.enabled = False
+
+    async def main():
+        for _ in range(3):
+            await cache.get("u1", store.load)
+
+    asyncio.run(main())
+    assert store.loads == 3
+
+def test_password_reset_invalidates_the_cached_user(monkeypatch):
+    user = make_user()
+    store = Store(user)
+
+    async def find_one(query):
+        return user if query.get("reset_password_token") == user.reset_password_token else None
+
+    async def fast_hash(password):
+        return f"hashed:{password}"
+
+    monkeypatch.setattr(auth_module.User, "find_one", find_one, raising=False)
+    monkeypatch.setattr(auth_module.password_hasher, "hash", fast_hash)
+    principal_cache.clear()
+
+    async def main():
+        before = await principal_cache.get("u1", store.load)
+        assert await AuthService().reset_password("token", "new password")
+        return before, await principal_cache.get("u1", store.load)
+
+    try:
+        before, after = asyncio.run(main())
+    finally:
+        principal_cache.clear()
+    assert before.hashed_password == "old-hash"
+    assert after.hashed_password == "hashed:new password"
+    assert store.loads == 2
+    assert user.saves == 1
+
+def test_deactivation_invalidates_the_cached_user(monkeypatch):
+    user = make_user()
+    store = Store(user)
+
+    async def get(user_id):
+        return user
+
+    monkeypatch.setattr(auth_module.User, "get", get, raising=False)
+    principal_cache.clear()
+
+    async def main():
+        await principal_cache.get("u1", store.load)
+        await AuthService().deactivate_user("u1")
+        return await principal_cache.get("u1", store.load)
+
+    try:
+        after = asyncio.run(main())
+    finally:
+        principal_cache.clear()
+    assert not after.is_active
+    assert store.loads == 2
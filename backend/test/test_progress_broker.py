@@ -0,0 +1,83 @@
+import asyncio
+from cachetools import LRUCache
+from app.services.progress_broker import ProgressBroker
+
+def drain(queue):
+    events = []
+    while not queue.empty():
+        events.append(queue.get_nowait())
+    return [(event["event"], event.get("stage")) for event in events]
+
+def test_subscribers_receive_only_their_case_events():
+    broker = ProgressBroker()
+
+    async def main():
+        async with broker.subscribe("a") as first, broker.subscribe("a") as second, broker.subscribe("b") as other:
+            broker.publish("a", "stage_completed", stage="evidence", progress=50.0)
+            return drain(first), drain(second), drain(other)
+
+    first, second, other = asyncio.run(main())
+    assert first == second == [("stage_completed", "evidence")]
+    assert other == []
+
+def test_unsubscribe_removes_the_queue():
+    broker = ProgressBroker()
+
+    async def main():
+        async with broker.subscribe("a") as queue:
+            assert broker._subscribers["a"] == {queue}
+        assert "a" not in broker._subscribers
+        # Publishing with no watchers left is fine and still recorded
+        broker.publish("a", "stage_completed", stage="evidence")
+        return queue
+
+    queue = asyncio.run(main())
+    assert queue.empty()
+    assert broker.has_history("a")
+
+def test_unsubscribe_happens_when_the_watcher_errors():
+    broker = ProgressBroker()
+
+    async def main():
+        try:
+            async with broker.subscribe("a"):
+                raise ConnectionResetError()
+        except ConnectionResetError:
+            pass
+
+    asyncio.run(main())
+    assert "a" not in broker._subscribers
+
+def test_late_subscribers_catch_up_on_the_current_run_only():
+    broker = ProgressBroker()
+    broker.publish("a", "analysis_started")
+    broker.publish("a", "stage_completed", stage="initial_analysis")
+    broker.publish("a", "analysis_completed")
+    broker.publish("a", "analysis_started")
+    broker.publish("a", "stage_completed", stage="evidence")
+
+    async def main():
+        async with broker.subscribe("a") as queue:
+            return drain(queue)
+
+    assert asyncio.run(main()) == [("analysis_started", None), ("stage_completed", "evidence")]
+
+def test_slow_watchers_drop_their_oldest_events():
+    broker = ProgressBroker()
+    broker._queue_size = 3
+
+    async def main():
+        async with broker.subscribe("a") as queue:
+            for stage in ("one", "two", "three", "four", "five"):
+                broker.publish("a", "stage_completed", stage=stage)
+            return drain(queue)
+
+    assert [stage for _, stage in asyncio.run(main())] == ["three", "four", "five"]
+
+def test_history_is_kept_for_a_bounded_number_of_cases():
+    broker = ProgressBroker()
+    broker._history = LRUCache(maxsize=2)
+    for case_id in ("a", "b", "c"):
+        broker.publish(case_id, "analysis_started")
+    assert not broker.has_history("a")
+    assert broker.has_history("b") and broker.has_history("c")
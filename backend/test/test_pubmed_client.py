@@ -0,0 +1,15 @@
+from app.services.ml.pubmed_client import PubMedClient
+
+def make_client(email=None, api_key=None):
+    client = PubMedClient.__new__(PubMedClient)
+    client.email, client.api_key, client.tool = email, api_key, "iatrikos"
+    return client
+
+def test_contact_email_is_omitted_when_unset():
+    for email in (None, ""):
+        assert make_client(email=email)._params(db="pubmed") == {"db": "pubmed", "tool": "iatrikos"}
+
+def test_contact_email_and_api_key_are_sent_when_configured():
+    assert make_client(email="ops@example.org", api_key="key")._params(db="pubmed") == {
+        "db": "pubmed", "tool": "iatrikos", "email": "ops@example.org", "api_key": "key"
+    }
@@ -0,0 +1,32 @@
+from app.utils.search import MAX_PREFIX_LENGTH, edge_ngrams, normalize, query_tokens, search_terms, tokenize
+
+def test_normalize_strips_accents_and_case():
+    assert normalize("Zoë Ångström") == "zoe angstrom"
+    assert normalize(None) == ""
+
+def test_tokenize_splits_on_punctuation_and_deduplicates_in_order():
+    assert tokenize("O'Brien-Smith, o'brien_jr 42") == ["o", "brien", "smith", "jr", "42"]
+    assert tokenize("") == []
+    assert tokenize("  --  ") == []
+
+def test_search_terms_merges_values_without_duplicates():
+    assert search_terms("José García", None, "jose@example.com") == ["jose", "garcia", "example", "com"]
+
+def test_edge_ngrams_are_every_prefix():
+    assert edge_ngrams(["ann", "an"]) == ["a", "an", "ann"]
+    assert edge_ngrams([]) == []
+
+def test_edge_ngrams_are_capped_at_max_prefix_length():
+    term = "pneumonoultramicroscopicsilicovolcanoconiosis"
+    keys = edge_ngrams([term])
+    assert len(keys) == MAX_PREFIX_LENGTH
+    assert max(keys, key=len) == term[:MAX_PREFIX_LENGTH]
+
+def test_query_tokens_match_the_stored_prefixes():
+    term = "pneumonoultramicroscopicsilicovolcanoconiosis"
+    keys = set(edge_ngrams(search_terms("Zoë", term)))
+    tokens = query_tokens(f"ZOE {term} zoe")
+    assert tokens == ["zoe", term[:MAX_PREFIX_LENGTH]]
+    assert set(tokens) <= keys
+    assert query_tokens("zo") == ["zo"]
+    assert query_tokens(None) == []